@@ -0,0 +1,154 @@
+"""
+Cache invalidation during concurrent reads
+
+A read must never see a missing value while one exists: a menu read as
+None breaks keyboard building, and an open session read as None tells the
+cashier there is no active session. Two checks, on a bare CachedValue and
+through Database.get_active_session() with a real session delete:
+
+- interleaved: the invalidation runs right after get() has checked the
+  expiry, the exact point where a thread switch used to expose a cleared
+  value (forced with a stand-in clock, since real threads rarely hit it)
+- threaded: readers call get() from several threads while another thread
+  keeps invalidating
+
+Exits non-zero if any read returned None.
+
+Run from the project root:
+    python -m benchmarks.cache_invalidation [--seconds 1]
+"""
+import sys
+import time
+import argparse
+import threading
+from typing import Callable, List, Optional
+
+from benchmarks.fakes import FakeSupabaseClient, install, seed
+
+READERS = 4
+
+
+class SwitchingClock:
+    """
+    Stands in for the cache module's clock: once a reading has been compared
+    with an expiry, it runs a callback, as if another thread ran right after
+    the cache decided its value was fresh
+    """
+
+    def __init__(self):
+        self.callback: Optional[Callable] = None
+
+    def monotonic(self) -> float:
+        return _Reading(time.monotonic(), self)
+
+    def switch(self):
+        callback, self.callback = self.callback, None
+        if callback is not None:
+            callback()
+
+
+class _Reading(float):
+    def __new__(cls, value: float, clock: SwitchingClock):
+        reading = super().__new__(cls, value)
+        reading.clock = clock
+        return reading
+
+    def __lt__(self, other):
+        result = float(self) < other
+        self.clock.switch()
+        return result
+
+
+def interleaved(read: Callable, write: Callable) -> bool:
+    """Read once with write() running inside the read; True if the read still saw a value"""
+    from src.database import cache
+
+    clock = SwitchingClock()
+    cache.time, original = clock, cache.time
+    try:
+        read()  # fill the cache
+        clock.callback = write
+        return read() is not None
+    finally:
+        cache.time = original
+
+
+def threaded(read: Callable, write: Callable, seconds: float) -> List[int]:
+    """
+    Read from several threads while one thread writes
+
+    Returns:
+        List[int]: [reads, reads that returned None]
+    """
+    stop = threading.Event()
+    counts = [0, 0]
+    lock = threading.Lock()
+
+    def reader():
+        reads = misses = 0
+        while not stop.is_set():
+            reads += 1
+            if read() is None:
+                misses += 1
+        with lock:
+            counts[0] += reads
+            counts[1] += misses
+
+    def writer():
+        while not stop.is_set():
+            write()
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main(seconds: float) -> int:
+    from src.database.cache import CachedValue
+    from src.database.models import get_database
+
+    client = install(FakeSupabaseClient())
+    seeded = seed(client, orders=0)
+    # An ended session: deleting it invalidates the active session cache, the open session stays
+    ended = client.insert_row("sale_sessions", {"started_by": seeded["telegram_id"], "status": "ended"})
+    db = get_database()
+
+    cache = CachedValue(ttl=60)
+    value = {"id": "menu"}
+
+    checks = [
+        ("CachedValue get vs invalidate", lambda: cache.get(lambda: value), cache.invalidate),
+        ("get_active_session vs delete_session", db.get_active_session, lambda: db.delete_session(ended["id"]))
+    ]
+
+    # Switch threads as often as possible
+    sys.setswitchinterval(1e-6)
+    failures = []
+
+    print(f"{'check':<40} {'interleaved':>11} {'threaded reads':>15} {'None':>6}")
+    for name, read, write in checks:
+        ok = interleaved(read, write)
+        reads, misses = threaded(read, write, seconds)
+        print(f"{name:<40} {'ok' if ok else 'None':>11} {reads:>15} {misses:>6}")
+
+        if not ok:
+            failures.append(f"{name}: read returned None when invalidated right after the expiry check")
+        if misses:
+            failures.append(f"{name}: {misses} of {reads} threaded reads returned None")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1, help="how long each threaded check runs")
+    sys.exit(main(parser.parse_args().seconds))
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: callback data size and decode cost with short IDs
+
+Builds the ordering keyboard for a generated menu and compares the size of
+its JSON with full UUIDs vs. 22-character short IDs, then times decoding.
+
+Run from the project root:
+    python -m benchmarks.callback_data
+"""
+import json
+import uuid
+import timeit
+
+from telegram import InlineKeyboardMarkup
+from src.bot.keyboards import get_menu_items_keyboard
+from src.bot.callback_data import SEPARATOR, decode_id, encode_id
+
+
+def generate_menu(names: int = 40, sizes=("S", "M", "L")):
+    return [
+        {"id": str(uuid.uuid4()), "name": f"Drink {n}", "size": size, "price": 3.0 + i}
+        for n in range(names)
+        for i, size in enumerate(sizes)
+    ]
+
+
+def with_full_ids(markup: InlineKeyboardMarkup, short_to_full) -> dict:
+    """Keyboard JSON as it looked with the full UUIDs in callback data"""
+    data = markup.to_dict()
+    for row in data["inline_keyboard"]:
+        for button in row:
+            if not button.get("callback_data"):
+                continue  # e.g., the inline search button
+            action, _, token = button["callback_data"].partition(SEPARATOR)
+            if token in short_to_full:
+                button["callback_data"] = f"{action}{SEPARATOR}{short_to_full[token]}"
+    return data
+
+
+def main(number: int = 100000):
+    menu_items = generate_menu()
+    short_to_full = {encode_id(item["id"]): item["id"] for item in menu_items}
+
+    markup = get_menu_items_keyboard(menu_items)
+    short_size = len(json.dumps(markup.to_dict()))
+    full_size = len(json.dumps(with_full_ids(markup, short_to_full)))
+
+    print(f"{len(menu_items)} menu items")
+    print(f"keyboard JSON with full UUIDs: {full_size} bytes")
+    print(f"keyboard JSON with short IDs:  {short_size} bytes ({100 * (1 - short_size / full_size):.1f}% smaller)")
+
+    token = encode_id(menu_items[0]["id"])
+    decode_id.cache_clear()
+    uncached = timeit.timeit(lambda: (decode_id.cache_clear(), decode_id(token)), number=number) / number * 1e6
+    cached = timeit.timeit(lambda: decode_id(token), number=number) / number * 1e6
+    print(f"decode_id: {uncached:.2f} us uncached, {cached:.2f} us cached")
+
+
+if __name__ == "__main__":
+    main()
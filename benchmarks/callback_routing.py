@@ -0,0 +1,117 @@
+"""
+Micro-benchmark: cost of routing one callback query
+
+Compares the old setup (one regex CallbackQueryHandler per action, tried in
+registration order) with the dict-based CallbackRouter.
+
+Run from the project root:
+    python -m benchmarks.callback_routing
+"""
+import re
+import timeit
+
+from src.bot.router import CallbackRouter
+
+# (pattern used by the old regex handlers, action, argument types)
+ROUTES = [
+    ("^add_menu_item$", "add_menu_item", ()),
+    ("^cancel_menu_setup$", "cancel_menu_setup", ()),
+    ("^start_session$", "start_session", ()),
+    ("^start_adding_inventory$", "start_adding_inventory", ()),
+    ("^skip_inventory$", "skip_inventory", ()),
+    ("^cancel_session_start$", "cancel_session_start", ()),
+    ("^add_another_inventory:", "add_another_inventory", (str,)),
+    ("^skip_inventory_price$", "skip_inventory_price", ()),
+    ("^control_panel$", "control_panel", ()),
+    ("^view_sales", "view_sales", (int,)),
+    ("^view_inventory$", "view_inventory", (int,)),
+    ("^manage_menu$", "manage_menu", ()),
+    ("^edit_menu_item:", "edit_menu_item", (str,)),
+    ("^edit_name:", "edit_name", (str,)),
+    ("^edit_size:", "edit_size", (str,)),
+    ("^edit_price:", "edit_price", (str,)),
+    ("^confirm_delete_menu_item:", "confirm_delete_menu_item", (str,)),
+    ("^delete_menu_item:", "delete_menu_item", (str,)),
+    ("^has_multiple_sizes:", "has_multiple_sizes", (str,)),
+    ("^add_more_sizes:", "add_more_sizes", (str,)),
+    ("^join_session$", "join_session", ()),
+    ("^refresh_dashboard$", "refresh_dashboard", ()),
+    ("^new_order$", "new_order", ()),
+    ("^add_item:", "add_item", (str,)),
+    ("^clear_cart$", "clear_cart", ()),
+    ("^confirm_cart$", "confirm_cart", ()),
+    ("^payment:", "payment", (str,)),
+    ("^cancel_order$", "cancel_order", ()),
+    ("^cancel_payment$", "cancel_payment", ()),
+    ("^end_session$", "end_session", ()),
+    ("^confirm_end_session$", "confirm_end_session", ()),
+    ("^back_to_dashboard$", "back_to_dashboard", ()),
+    ("^view_orders$", "view_orders", ()),
+    ("^orders_page:", "orders_page", (int,)),
+    ("^view_order:", "view_order", (str,)),
+    ("^delete_order:", "delete_order", (str,)),
+    ("^confirm_delete:", "confirm_delete", (str,)),
+    ("^manage_users$", "manage_users", ()),
+    ("^add_user$", "add_user", ()),
+    ("^cancel_user_mgmt$", "cancel_user_mgmt", ()),
+    ("^confirm_add_user:", "confirm_add_user", (int,)),
+    ("^delete_user:", "delete_user", (int,)),
+    ("^confirm_delete_user:", "confirm_delete_user", (int,)),
+    ("^cleanup_menu$", "cleanup_menu", ()),
+    ("^cleanup_sales", "cleanup_sales", (int,)),
+    ("^cleanup_inventory", "cleanup_inventory", (int,)),
+    ("^confirm_delete_session:", "confirm_delete_session", (str,)),
+    ("^delete_session:", "delete_session", (str,)),
+    ("^cancel_cleanup$", "cancel_cleanup", ()),
+    ("^confirm_purge_all$", "confirm_purge_all", ()),
+    ("^purge_all_confirmed$", "purge_all_confirmed", ()),
+]
+
+# A typical mix of taps during a busy session
+SAMPLE_DATA = [
+    "add_item:0f8fad5b-d9cb-469f-a165-70867728950e",
+    "add_item:7c9e6679-7425-40de-944b-e07fc1f90ae7",
+    "confirm_cart",
+    "payment:cash",
+    "refresh_dashboard",
+    "orders_page:3",
+    "view_order:0f8fad5b-d9cb-469f-a165-70867728950e",
+    "purge_all_confirmed",
+]
+
+
+def handler(update, context):
+    return None
+
+
+def route_with_regex(patterns, data):
+    for pattern in patterns:
+        match = pattern.match(data)
+        if match:
+            return match
+    return None
+
+
+def main(number: int = 20000):
+    patterns = [re.compile(pattern) for pattern, _, _ in ROUTES]
+
+    router = CallbackRouter()
+    for _, action, arg_types in ROUTES:
+        router.register(action, handler, *arg_types, required=0)
+
+    print(f"{len(ROUTES)} callback actions, {len(SAMPLE_DATA)} sample taps x {number}")
+    print(f"{'callback data':<52} {'regex (us)':>12} {'router (us)':>12}")
+
+    total_regex = total_router = 0.0
+    for data in SAMPLE_DATA:
+        regex_time = timeit.timeit(lambda: route_with_regex(patterns, data), number=number) / number * 1e6
+        router_time = timeit.timeit(lambda: router.parse(data), number=number) / number * 1e6
+        total_regex += regex_time
+        total_router += router_time
+        print(f"{data:<52} {regex_time:>12.2f} {router_time:>12.2f}")
+
+    print(f"{'mean':<52} {total_regex / len(SAMPLE_DATA):>12.2f} {total_router / len(SAMPLE_DATA):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
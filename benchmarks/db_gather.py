@@ -0,0 +1,87 @@
+"""
+Benchmark: handlers that issue independent reads, sequential vs. gathered
+
+Runs view_orders, confirm_end_session (up to the write) and
+confirm_delete_session against an in-memory backend with a simulated
+round-trip time, and compares the reads run back to back with the same
+reads run through Database.gather.
+
+Run from the project root:
+    python -m benchmarks.db_gather
+"""
+import time
+import asyncio
+from functools import partial
+from types import SimpleNamespace
+
+from benchmarks.fakes import FakeSupabaseClient, FakeCallbackQuery, install, seed
+
+RTT_SECONDS = 0.08
+
+
+def read_sets(db, session_id):
+    """The independent reads each handler makes (as they are now gathered)"""
+    return {
+        "view_orders": [
+            partial(db.get_orders_by_session, session_id, limit=5, offset=0),
+            partial(db.get_order_count_by_session, session_id)
+        ],
+        "confirm_end_session": [
+            partial(db.get_order_count_by_session, session_id),
+            partial(db.get_orders_by_session, session_id, limit=1000)
+        ],
+        "confirm_delete_session": [
+            partial(db.get_session_by_id, session_id),
+            partial(db.get_order_count_by_session, session_id),
+            partial(db.get_inventory_by_session, session_id)
+        ]
+    }
+
+
+async def run_handler(handler, data: str, args):
+    query = FakeCallbackQuery(data)
+    update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=1000))
+    context = SimpleNamespace(args=args, user_data={}, bot=None)
+
+    start = time.perf_counter()
+    await handler.__wrapped__(update, context)
+    return (time.perf_counter() - start) * 1e3
+
+
+async def main():
+    client = install(FakeSupabaseClient(latency=RTT_SECONDS))
+    data = seed(client)
+    session_id = data["session"]["id"]
+
+    from src.database.models import get_database
+    from src.bot.handlers.orders import view_orders_callback
+    from src.bot.handlers.cleanup import confirm_delete_session_callback
+
+    db = get_database()
+    db.get_active_session()  # warm the active session cache, as in steady state
+
+    print(f"Simulated round trip: {RTT_SECONDS * 1e3:.0f} ms")
+    print(f"{'handler reads':<26} {'queries':>8} {'sequential (ms)':>16} {'gathered (ms)':>14}")
+
+    for name, calls in read_sets(db, session_id).items():
+        start = time.perf_counter()
+        for call in calls:
+            call()
+        sequential = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        await db.gather(*calls)
+        gathered = (time.perf_counter() - start) * 1e3
+
+        print(f"{name:<26} {len(calls):>8} {sequential:>16.1f} {gathered:>14.1f}")
+
+    print()
+    print("End-to-end handler runs (auth middleware skipped):")
+    elapsed = await run_handler(view_orders_callback, "view_orders", [])
+    print(f"  view_orders_callback:             {elapsed:.1f} ms")
+    elapsed = await run_handler(confirm_delete_session_callback, "confirm_delete_session", [session_id])
+    print(f"  confirm_delete_session_callback:  {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,428 @@
+"""
+In-memory stand-ins for the Supabase client and the Telegram Bot API, for
+benchmarks only
+
+FakeSupabaseClient implements the subset of the supabase-py query builder
+that src/database/models.py uses (select/insert/update/delete with eq, gte,
+order, range, limit and exact counts, plus the order RPCs). Every execute()
+sleeps for a configurable round-trip time and is counted, so benchmarks can
+measure latency and round trips without a network.
+
+FakeBotRequest answers Bot API calls locally, so a real Application can
+process updates end to end; the *_update() helpers build those updates.
+"""
+import copy
+import json
+import time
+import uuid
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from telegram.request import BaseRequest
+
+from src.database.round_trips import record_round_trip
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Chainable query against one in-memory table"""
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.payload: Any = None
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.filters = []
+        self.order_by = []
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+
+    # Builders
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self.action, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) is not None and str(row.get(column)) >= str(value))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self.start, self.end = start, end
+        return self
+
+    def limit(self, n: int):
+        self.start, self.end = 0, n - 1
+        return self
+
+    # Execution
+    def _project(self, row: Dict) -> Dict:
+        if self.columns.strip() == "*":
+            return copy.deepcopy(row)
+        return {column.strip(): copy.deepcopy(row.get(column.strip())) for column in self.columns.split(",")}
+
+    def execute(self) -> FakeResponse:
+        self.client.round_trip(f"{self.action} {self.table}")
+
+        with self.client.lock:
+            rows = self.client.tables.setdefault(self.table, [])
+
+            if self.action == "insert":
+                payloads = self.payload if isinstance(self.payload, list) else [self.payload]
+                inserted = [self.client.insert_row(self.table, payload) for payload in payloads]
+                return FakeResponse(copy.deepcopy(inserted))
+
+            matched = [row for row in rows if all(check(row) for check in self.filters)]
+
+            if self.action == "update":
+                for row in matched:
+                    row.update(copy.deepcopy(self.payload))
+                self.client.refresh_session_totals()
+                return FakeResponse([copy.deepcopy(row) for row in matched])
+
+            if self.action == "delete":
+                for row in matched:
+                    rows.remove(row)
+                self.client.refresh_session_totals()
+                return FakeResponse([copy.deepcopy(row) for row in matched])
+
+            for column, desc in reversed(self.order_by):
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+
+            total = len(matched)
+            if self.start is not None:
+                matched = matched[self.start:self.end + 1]
+
+            return FakeResponse([self._project(row) for row in matched], total if self.count else None)
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabaseClient", name: str, params: Dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        self.client.round_trip(f"rpc {self.name}")
+
+        with self.client.lock:
+            if self.name == "get_next_order_number":
+                return FakeResponse(self.client.next_order_number(self.params["p_session_id"]))
+
+            if self.name == "create_order_idempotent":
+                p = self.params
+                for order in self.client.tables.setdefault("orders", []):
+                    if order.get("idempotency_key") == p["p_idempotency_key"]:
+                        return FakeResponse([copy.deepcopy(order)])
+
+                order = self.client.insert_row("orders", {
+                    "session_id": p["p_session_id"],
+                    "order_number": self.client.next_order_number(p["p_session_id"]),
+                    "items": p["p_items"],
+                    "total_amount": p["p_total_amount"],
+                    "payment_method": p["p_payment_method"],
+                    "created_by": p["p_created_by"],
+                    "idempotency_key": p["p_idempotency_key"]
+                })
+                return FakeResponse([copy.deepcopy(order)])
+
+        raise NotImplementedError(f"Fake RPC {self.name}")
+
+
+class FakeSupabaseClient:
+    """
+    In-memory Supabase client with a simulated round-trip time
+
+    Args:
+        latency: Seconds each execute() sleeps (one simulated round trip)
+    """
+
+    DEFAULTS = {
+        "authorized_users": {"username": None, "full_name": None},
+        "menu_items": {"active": True, "display_order": 0},
+        "sale_sessions": {"status": "active", "total_sales": 0, "ended_at": None},
+        "inventory_logs": {"cost_price": None},
+        "orders": {"idempotency_key": None}
+    }
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict]] = {}
+        self.lock = threading.RLock()
+        self.calls: List[str] = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def round_trip(self, label: str):
+        # Report to the same per-update counters as the real client's request hook
+        record_round_trip(label)
+        with self.lock:
+            self.calls.append(label)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_calls(self) -> List[str]:
+        """Return and clear the recorded round trips"""
+        with self.lock:
+            calls, self.calls = self.calls, []
+        return calls
+
+    def insert_row(self, table: str, payload: Dict) -> Dict:
+        row = dict(self.DEFAULTS.get(table, {}))
+        row.update(copy.deepcopy(payload))
+        row.setdefault("id", str(uuid.uuid4()))
+        now = datetime.now(timezone.utc).isoformat()
+        row.setdefault("created_at", now)
+        if table == "sale_sessions":
+            row.setdefault("started_at", now)
+        self.tables.setdefault(table, []).append(row)
+        self.refresh_session_totals()
+        return row
+
+    def next_order_number(self, session_id: str) -> int:
+        numbers = [o["order_number"] for o in self.tables.get("orders", []) if o["session_id"] == session_id]
+        return max(numbers, default=0) + 1
+
+    def refresh_session_totals(self):
+        """Mirror the trigger that keeps sale_sessions.total_sales up to date"""
+        totals: Dict[str, float] = {}
+        for order in self.tables.get("orders", []):
+            totals[order["session_id"]] = totals.get(order["session_id"], 0) + float(order["total_amount"])
+        for session in self.tables.get("sale_sessions", []):
+            session["total_sales"] = totals.get(session["id"], 0)
+
+
+def seed(client: FakeSupabaseClient, menu_names: int = 10, sizes=("S", "M", "L"), orders: int = 30,
+         telegram_id: int = 1000) -> Dict:
+    """
+    Fill a fake backend with a user, a menu, an active session and some orders
+
+    Returns:
+        Dict: {'telegram_id', 'session', 'menu_items'}
+    """
+    latency, client.latency = client.latency, 0
+
+    client.insert_row("authorized_users", {"telegram_id": telegram_id, "username": "cashier", "full_name": "Cashier"})
+
+    menu_items = []
+    for n in range(menu_names):
+        for i, size in enumerate(sizes):
+            menu_items.append(client.insert_row("menu_items", {
+                "name": f"Drink {n}",
+                "size": size,
+                "price": 3.0 + i,
+                "display_order": len(menu_items)
+            }))
+
+    session = client.insert_row("sale_sessions", {"started_by": telegram_id, "status": "active"})
+
+    for n in range(orders):
+        item = menu_items[n % len(menu_items)]
+        client.insert_row("orders", {
+            "session_id": session["id"],
+            "order_number": n + 1,
+            "items": [{
+                "menu_item_id": item["id"],
+                "name": item["name"],
+                "size": item["size"],
+                "price": item["price"],
+                "quantity": 1 + n % 3
+            }],
+            "total_amount": item["price"] * (1 + n % 3),
+            "payment_method": "cash",
+            "created_by": telegram_id
+        })
+
+    client.latency = latency
+    client.reset_calls()
+    return {"telegram_id": telegram_id, "session": session, "menu_items": menu_items}
+
+
+def install(client: FakeSupabaseClient) -> FakeSupabaseClient:
+    """
+    Make the shared Database use the fake client
+
+    The real client is only created on the first query, so this can be
+    called before or after importing handler modules, as long as it runs
+    before anything touches the database.
+    """
+    import os
+    os.environ.setdefault("SUPABASE_URL", "https://fake.supabase.co")
+    os.environ.setdefault("SUPABASE_KEY", "fake.fake.fake")
+
+    from src.database import supabase_client
+    supabase_client.supabase = client
+    return client
+
+
+class FakeMessage:
+    """Message a callback query is attached to"""
+
+    def __init__(self, chat_id: int = 1, message_id: int = 1):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.edit_date = None
+        self.text = None
+
+
+class FakeCallbackQuery:
+    """Callback query whose answer/edit calls succeed without a network"""
+
+    def __init__(self, data: str, message: Optional[FakeMessage] = None):
+        self.id = str(uuid.uuid4())
+        self.data = data
+        self.message = message or FakeMessage()
+        self.edits = 0
+
+    async def answer(self, *args, **kwargs):
+        return True
+
+    async def edit_message_text(self, text, *args, **kwargs):
+        self.edits += 1
+        self.message.text = text
+        return self.message
+
+
+class FakeBotRequest(BaseRequest):
+    """
+    Bot API stand-in: every method succeeds locally with a plausible result
+
+    Args:
+        latency: Seconds each call sleeps (one simulated Bot API round trip)
+    """
+
+    BOT_USER = {"id": 1, "is_bot": True, "first_name": "Kori POS", "username": "kori_pos_bot"}
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: List[str] = []
+        self._next_message_id = 1000
+        self._updates: List[Dict] = []
+
+    def queue_updates(self, updates: List[Dict]):
+        """Queue updates to be served by getUpdates (the polling path)"""
+        self._updates.extend(updates)
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return 5.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _message(self, params: Dict, message_id: Optional[int] = None, edited: bool = False) -> Dict:
+        if message_id is None:
+            self._next_message_id += 1
+            message_id = self._next_message_id
+
+        message = {
+            "message_id": int(message_id),
+            "date": int(time.time()),
+            "chat": {"id": int(params.get("chat_id") or 1), "type": "private"},
+            "from": self.BOT_USER,
+            "text": params.get("text", "")
+        }
+        if edited:
+            message["edit_date"] = int(time.time())
+        return message
+
+    def result(self, api_method: str, params: Dict) -> Any:
+        if api_method == "getMe":
+            return self.BOT_USER
+        if api_method == "sendMessage":
+            return self._message(params)
+        if api_method == "editMessageText":
+            return self._message(params, params.get("message_id"), edited=True)
+        if api_method == "getWebhookInfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+        if api_method == "getUpdates":
+            limit = int(params.get("limit") or 100)
+            batch, self._updates = self._updates[:limit], self._updates[limit:]
+            return batch
+        return True
+
+    async def do_request(self, url: str, method: str, request_data=None, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        self.calls.append(api_method)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if api_method == "getUpdates" and not self._updates:
+            # Stand-in for long polling: wait briefly instead of returning in a tight loop
+            await asyncio.sleep(0.01)
+
+        params = request_data.parameters if request_data else {}
+        return 200, json.dumps({"ok": True, "result": self.result(api_method, params)}).encode()
+
+
+def user_dict(telegram_id: int = 1000) -> Dict:
+    """Telegram user matching the authorized user created by seed()"""
+    return {"id": telegram_id, "is_bot": False, "first_name": "Cashier", "username": "cashier"}
+
+
+def callback_update(update_id: int, data: str, telegram_id: int = 1000, message_id: int = 500) -> Dict:
+    """Update for a tap on an inline button of a bot message"""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": f"cq-{update_id}",
+            "from": user_dict(telegram_id),
+            "chat_instance": "1",
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": telegram_id, "type": "private"},
+                "from": FakeBotRequest.BOT_USER,
+                "text": "..."
+            }
+        }
+    }
+
+
+def message_update(update_id: int, text: str, telegram_id: int = 1000) -> Dict:
+    """Update for a text message (a command if it starts with "/")"""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": telegram_id, "type": "private"},
+        "from": user_dict(telegram_id),
+        "text": text
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
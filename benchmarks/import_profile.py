@@ -0,0 +1,87 @@
+"""
+Import-time profile of the bot entry point
+
+Runs `python -X importtime -c "import src.main"` in a fresh interpreter and
+reports where cold-start time goes: the slowest modules by cumulative time
+and the total per top-level package.
+
+Run from the project root:
+    python -m benchmarks.import_profile [module] [--top N]
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Importing src.main only needs these to be set, nothing is contacted
+DUMMY_ENV = {
+    "SUPABASE_URL": "https://profile.supabase.co",
+    "SUPABASE_KEY": "profile.profile.profile",
+    "TELEGRAM_BOT_TOKEN": "1:profile",
+    "ENVIRONMENT": "development"
+}
+
+
+def profile_imports(module: str = "src.main") -> List[Tuple[str, int, int, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (module, self_us, cumulative_us, depth) per imported module
+    """
+    env = {**DUMMY_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def package_totals(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Sum the self time of every module per top-level package"""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", nargs="?", default="src.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total_us = next(cumulative for name, _, cumulative, _ in reversed(rows) if name == args.module)
+    print(f"import {args.module}: {total_us / 1e3:.1f} ms, {len(rows)} modules")
+
+    print(f"\nSlowest modules (cumulative)")
+    print(f"{'module':<48} {'self (ms)':>10} {'total (ms)':>11}")
+    ranked = sorted((row for row in rows if row[0] != args.module), key=lambda row: row[2], reverse=True)
+    for name, self_us, cumulative_us, depth in ranked[:args.top]:
+        print(f"{'  ' * min(depth - 1, 3) + name:<48} {self_us / 1e3:>10.1f} {cumulative_us / 1e3:>11.1f}")
+
+    print(f"\nTop-level packages (sum of self time)")
+    totals = sorted(package_totals(rows).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in totals[:args.top]:
+        print(f"{package:<48} {self_us / 1e3:>10.1f} {self_us / total_us:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
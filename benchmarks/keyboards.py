@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: building the ordering keyboard for a large menu
+
+Compares rebuilding the grouped grid on every tap (the old
+get_menu_items_keyboard, which put the whole menu in one keyboard) with the
+cached, paged layout plus quantity badges.
+
+Run from the project root:
+    python -m benchmarks.keyboards
+"""
+import uuid
+import timeit
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from src.bot.callback_data import build, encode_id
+from src.bot.keyboards import (
+    get_menu_items_keyboard,
+    get_control_panel_keyboard,
+    get_payment_method_keyboard
+)
+
+
+def generate_menu(items: int = 200, sizes=("S", "M", "L", "XL")):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Drink {n // len(sizes)}",
+            "size": sizes[n % len(sizes)],
+            "price": 3.0 + (n % len(sizes)) * 0.5
+        }
+        for n in range(items)
+    ]
+
+
+def rebuild_menu_keyboard(menu_items, cart=None) -> InlineKeyboardMarkup:
+    """The ordering keyboard built from scratch (previous implementation)"""
+    keyboard = []
+
+    items_by_name = {}
+    for item in menu_items:
+        items_by_name.setdefault(item['name'], []).append(item)
+
+    for item_name, variants in items_by_name.items():
+        row = [InlineKeyboardButton(f"📦 {item_name}", callback_data="noop")]
+        for variant in sorted(variants, key=lambda x: x['price']):
+            qty_indicator = ""
+            if cart and variant['id'] in cart:
+                qty_indicator = f" ({cart[variant['id']]['quantity']})"
+            button_text = f"{variant['size']} ${variant['price']:.2f}{qty_indicator}"
+            row.append(InlineKeyboardButton(button_text, callback_data=build("add_item", encode_id(variant['id']))))
+        keyboard.append(row)
+
+    keyboard.append([
+        InlineKeyboardButton("🗑 Clear Cart", callback_data="clear_cart"),
+        InlineKeyboardButton("✅ Confirm", callback_data="confirm_cart")
+    ])
+    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
+    return InlineKeyboardMarkup(keyboard)
+
+
+def main(number: int = 500):
+    menu_items = generate_menu()
+    cart = {item["id"]: {"quantity": 2} for item in menu_items[:5]}
+
+    def button_count(markup):
+        return sum(len(row) for row in markup.inline_keyboard)
+
+    print(f"{len(menu_items)} menu items, {len(cart)} in cart, {number} builds")
+    print(
+        f"buttons per keyboard: {button_count(rebuild_menu_keyboard(menu_items, cart))} single keyboard, "
+        f"{button_count(get_menu_items_keyboard(menu_items, cart))} per page (Telegram allows 100)"
+    )
+
+    rebuilt = timeit.timeit(lambda: rebuild_menu_keyboard(menu_items, cart), number=number) / number * 1e3
+    cached = timeit.timeit(lambda: get_menu_items_keyboard(menu_items, cart), number=number) / number * 1e3
+    print(f"ordering keyboard: {rebuilt:.3f} ms rebuilt, {cached:.3f} ms cached page ({rebuilt / cached:.1f}x)")
+
+    get_control_panel_keyboard(), get_payment_method_keyboard()  # built once, then shared
+    static = timeit.timeit(lambda: (get_control_panel_keyboard(), get_payment_method_keyboard()), number=number)
+    print(f"static keyboards: {static / number * 1e6:.2f} us per control panel + payment keyboard")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Handler occupancy of delayed screen transitions
+
+After a sale the bot shows the confirmation and returns to the sales
+dashboard 2 seconds later. Two ways of doing that are compared, through a
+real Application with in-memory Supabase and Bot API fakes:
+
+- inline: the handler sleeps, then redraws (the old code), so it holds the
+  user's queue for the whole delay
+- scheduled: the redraw is a run_later() job (the current code)
+
+For each it reports how long the payment handler runs and how long a tap
+sent right after the payment waits for it. Then it checks that the delayed
+dashboard never overwrites what the user did in the meantime: a tap on
+another screen, /start, or a repeated tap on the payment buttons (which must
+leave exactly one dashboard redraw). Exits non-zero if a check fails.
+
+Run from the project root:
+    python -m benchmarks.occupancy [--bot-latency 0.05]
+"""
+import sys
+import time
+import asyncio
+import argparse
+import itertools
+import contextvars
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.fakes import FakeSupabaseClient, FakeBotRequest, install, seed, callback_update, message_update
+
+DASHBOARD = "💰 *Sales Dashboard*"
+PAYMENT_MESSAGE_ID = 500
+
+# Update and callback query IDs must stay unique across runs (dedupe)
+_update_ids = itertools.count(1)
+
+_inline_jobs: contextvars.ContextVar[Optional[List]] = contextvars.ContextVar("inline_jobs", default=None)
+
+
+class RecordingBotRequest(FakeBotRequest):
+    """Bot API fake that also records the text of every message edit"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.edits: List[Tuple[int, str]] = []
+
+    def result(self, api_method: str, params: Dict):
+        if api_method == "editMessageText":
+            self.edits.append((int(params.get("message_id") or 0), params.get("text", "")))
+        return super().result(api_method, params)
+
+
+def run_inline(handler):
+    """
+    The old behavior: run_later() calls made by the handler are awaited
+    inline at its end, inside the user's turn
+    """
+    @wraps(handler)
+    async def wrapper(update, context):
+        jobs = []
+        token = _inline_jobs.set(jobs)
+        try:
+            result = await handler(update, context)
+            for delay, callback, args in jobs:
+                await asyncio.sleep(delay)
+                await callback(*args)
+            return result
+        finally:
+            _inline_jobs.reset(token)
+
+    return wrapper
+
+
+def inline_run_later(delay, callback, *args, query=None):
+    _inline_jobs.get().append((delay, callback, args))
+
+
+class Bot:
+    """A fresh application per run, on the shared fake database"""
+
+    def __init__(self, client: FakeSupabaseClient, bot_latency: float, inline: bool):
+        self.client = client
+        self.bot_latency = bot_latency
+        self.inline = inline
+
+    async def __aenter__(self):
+        from telegram.ext import Application, CallbackQueryHandler
+        from src.main import setup_handlers
+        from src.bot import jobs, middleware
+        from src.bot.handlers import sales
+        from src.bot.instrumentation import InstrumentedApplication
+        from src.bot.router import CallbackRouter
+
+        self.request = RecordingBotRequest(self.bot_latency)
+        self.application = (
+            Application.builder()
+            .token("1:fake")
+            .application_class(InstrumentedApplication)
+            .request(self.request)
+            .get_updates_request(FakeBotRequest())
+            .build()
+        )
+        setup_handlers(self.application)
+
+        self.restore = []
+        if self.inline:
+            sales.run_later = inline_run_later
+            self.restore.append(lambda: setattr(sales, "run_later", jobs.run_later))
+            for handler in self.application.handlers[0]:
+                if isinstance(handler, CallbackQueryHandler) and isinstance(handler.callback, CallbackRouter):
+                    route = handler.callback._routes["payment"]
+                    route.handler = middleware.require_auth_callback(run_inline(route.handler.__wrapped__))
+
+        await self.application.initialize()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.settle()
+        await self.application.shutdown()
+        for restore in self.restore:
+            restore()
+
+    async def send(self, update: Dict) -> float:
+        """Process an update; returns how long it took in seconds"""
+        from telegram import Update
+
+        started = time.perf_counter()
+        await self.application.process_update(Update.de_json(update, self.application.bot))
+        return time.perf_counter() - started
+
+    async def tap(self, data: str) -> float:
+        return await self.send(callback_update(next(_update_ids), data, message_id=PAYMENT_MESSAGE_ID))
+
+    async def command(self, text: str) -> float:
+        return await self.send(message_update(next(_update_ids), text))
+
+    async def fill_cart(self):
+        from src.bot.callback_data import build, encode_id
+
+        await self.tap("new_order")
+        await self.tap(build("add_item", encode_id(self.client.tables["menu_items"][0]["id"])))
+        await self.tap("confirm_cart")
+
+    async def settle(self):
+        from src.bot.edits import get_edit_scheduler
+        from src.bot.jobs import pending_jobs
+
+        while pending_jobs() or get_edit_scheduler().stats()["pending"]:
+            await asyncio.sleep(0.05)
+
+    def dashboard_redraws(self, since: int) -> int:
+        return sum(
+            1 for message_id, text in self.request.edits[since:]
+            if message_id == PAYMENT_MESSAGE_ID and text.startswith(DASHBOARD)
+        )
+
+
+async def measure(client: FakeSupabaseClient, bot_latency: float, inline: bool) -> Tuple[float, float]:
+    """
+    Returns:
+        Tuple[float, float]: [payment handler seconds, wait of the tap sent right after it]
+    """
+    async with Bot(client, bot_latency, inline) as bot:
+        await bot.fill_cart()
+        pay = asyncio.ensure_future(bot.tap("payment:cash"))
+        await asyncio.sleep(0)
+        next_tap = await bot.tap("view_orders")
+        return await pay, next_tap
+
+
+async def stale_checks(client: FakeSupabaseClient, bot_latency: float) -> List[Tuple[str, int, int]]:
+    """
+    Returns:
+        List[Tuple[str, int, int]]: [check, dashboard redraws after it, redraws expected]
+    """
+    results = []
+
+    async def interrupted(name: str, action):
+        async with Bot(client, bot_latency, inline=False) as bot:
+            await bot.fill_cart()
+            await bot.tap("payment:cash")
+            mark = len(bot.request.edits)
+            await asyncio.sleep(0.2)
+            await action(bot)
+            await bot.settle()
+            results.append((name, bot.dashboard_redraws(mark), 0))
+
+    await interrupted("tap on another screen", lambda bot: bot.tap("view_orders"))
+    await interrupted("/start", lambda bot: bot.command("/start"))
+
+    async with Bot(client, bot_latency, inline=False) as bot:
+        await bot.fill_cart()
+        mark = len(bot.request.edits)
+        await bot.tap("payment:cash")
+        await asyncio.sleep(0.2)
+        await bot.tap("payment:cash")
+        await bot.settle()
+        results.append(("repeated payment tap", bot.dashboard_redraws(mark), 1))
+
+    return results
+
+
+async def main(bot_latency: float) -> int:
+    from src.database.models import get_database
+
+    client = install(FakeSupabaseClient())
+    seed(client, orders=0)
+    await get_database().warm_caches()
+    failures = []
+
+    print(f"{'dashboard return':<18} {'payment handler':>16} {'next tap waits':>15}")
+    for name, inline in (("inline (sleep)", True), ("scheduled", False)):
+        handler, next_tap = await measure(client, bot_latency, inline)
+        print(f"{name:<18} {handler * 1000:>13.0f} ms {next_tap * 1000:>12.0f} ms")
+        if not inline and handler > 1:
+            failures.append(f"payment handler still runs {handler:.2f}s with the scheduled return")
+
+    print()
+    print(f"{'during the 2 s window':<24} {'dashboard redraws':>18} {'expected':>9}")
+    for name, redraws, expected in await stale_checks(client, bot_latency):
+        print(f"{name:<24} {redraws:>18} {expected:>9}")
+        if redraws != expected:
+            failures.append(f"{name}: {redraws} dashboard redraws of the payment message, expected {expected}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bot-latency", type=float, default=0.05, help="seconds per simulated Bot API call")
+    sys.exit(asyncio.run(main(parser.parse_args().bot_latency)))
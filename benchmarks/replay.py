@@ -0,0 +1,374 @@
+"""
+End-to-end replay of a busy session through the webhook and polling paths
+
+Generates realistic Telegram updates for several cashiers working one
+session at the same time (opening the dashboard, starting orders, tapping
+items, paying by cash or PayNow, looking up past orders) and replays them:
+
+- webhook: POSTed as JSON to the Flask webhook route, from a few threads
+  like the Gunicorn workers' threads, each waiting for its response
+- polling: served by getUpdates to the application's real Updater
+
+Both paths run against the in-memory Supabase fake and Bot API stand-in,
+each with an injected round-trip latency. Reports throughput, p50/p95/p99
+per handler (from the handler spans of the traces) and per update, and
+memory growth over a second replay measured with tracemalloc (kept out of
+the timed run, since tracing allocations slows everything down).
+
+Run from the project root:
+    python -m benchmarks.replay [--cashiers 4] [--orders 10] [--db-latency 5] [--bot-latency 10]
+"""
+import os
+import gc
+import sys
+import time
+import random
+import asyncio
+import argparse
+import threading
+import tracemalloc
+from collections import defaultdict
+from itertools import count
+from typing import Dict, List, Optional
+
+# Before anything reads its configuration: no webhook init at import, and traces
+# stay in memory rather than being written to a file
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:fake")
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("TRACE_EXPORTER", "none")
+
+from benchmarks.fakes import FakeSupabaseClient, FakeBotRequest, install, seed, callback_update, message_update
+
+FIRST_CASHIER_ID = 1000
+
+# Share of orders paid by PayNow rather than cash
+PAYNOW_SHARE = 0.3
+
+# Every Nth order, the cashier looks up an earlier order afterwards
+VIEW_ORDERS_EVERY = 3
+
+# Top allocation sites listed for memory growth
+MEMORY_TOP = 5
+
+
+class Collector:
+    """Trace exporter that keeps the durations of updates and handler spans"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.updates: List[float] = []
+        self.handlers: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+
+    def export(self, root):
+        self.updates.append(root.duration_ms)
+        if root.error:
+            self.errors += 1
+        for span in root.walk():
+            if span.name.startswith("handler.") and span.duration_ms is not None:
+                self.handlers[span.name[len("handler."):]].append(span.duration_ms)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+class Workload:
+    """
+    Builds the updates each cashier sends during the session
+
+    Update IDs come from one counter so that every replay (and path) gets
+    fresh IDs and the dedupe store never drops them.
+    """
+
+    def __init__(self, client: FakeSupabaseClient, cashiers: int, orders: int, rng: random.Random):
+        from src.bot.callback_data import build, encode_id
+
+        self.cashiers = cashiers
+        self.orders = orders
+        self.rng = rng
+        self.build = build
+        self.menu_ids = [encode_id(item["id"]) for item in client.tables["menu_items"]]
+        self.order_ids = [encode_id(order["id"]) for order in client.tables["orders"]]
+        self.update_ids = count(1)
+
+    def cashier(self, index: int) -> List[Dict]:
+        """All updates of one cashier, in the order they tap"""
+        telegram_id = FIRST_CASHIER_ID + index
+        message_id = 500 + index
+
+        def tap(data: str) -> Dict:
+            return callback_update(next(self.update_ids), data, telegram_id=telegram_id, message_id=message_id)
+
+        updates = [message_update(next(self.update_ids), "/start", telegram_id=telegram_id), tap("join_session")]
+
+        for n in range(self.orders):
+            updates.append(tap("new_order"))
+            for _ in range(self.rng.randint(1, 4)):
+                item = self.rng.choice(self.menu_ids)
+                if self.rng.random() < 0.2:
+                    updates.append(tap(self.build("add_item", item, self.rng.randint(2, 3))))
+                else:
+                    updates.append(tap(self.build("add_item", item)))
+                    # Impatient double tap on the same button
+                    if self.rng.random() < 0.15:
+                        updates.append(tap(self.build("add_item", item)))
+
+            updates.append(tap("confirm_cart"))
+            updates.append(tap("payment:paynow" if self.rng.random() < PAYNOW_SHARE else "payment:cash"))
+
+            if n % VIEW_ORDERS_EVERY == VIEW_ORDERS_EVERY - 1:
+                updates.append(tap("view_orders"))
+                updates.append(tap(self.build("view_order", self.rng.choice(self.order_ids))))
+                updates.append(tap("back_to_dashboard"))
+
+        return updates
+
+    def scripts(self) -> List[List[Dict]]:
+        return [self.cashier(index) for index in range(self.cashiers)]
+
+
+def interleave(scripts: List[List[Dict]]) -> List[Dict]:
+    """Merge per-cashier scripts round robin, keeping each cashier's own order"""
+    merged = []
+    for step in range(max(len(script) for script in scripts)):
+        merged.extend(script[step] for script in scripts if step < len(script))
+    return merged
+
+
+def build_application(bot_latency: float, updates_request: Optional[FakeBotRequest] = None):
+    from telegram.ext import Application
+    from src.main import setup_handlers
+    from src.bot.instrumentation import InstrumentedApplication
+
+    application = (
+        Application.builder()
+        .token(os.environ["TELEGRAM_BOT_TOKEN"])
+        .application_class(InstrumentedApplication)
+        .request(FakeBotRequest(bot_latency))
+        .get_updates_request(updates_request or FakeBotRequest(bot_latency))
+        .build()
+    )
+    setup_handlers(application)
+    return application
+
+
+async def settle():
+    """Wait for debounced edits and delayed jobs (e.g., back to the dashboard after payment)"""
+    from src.bot.edits import get_edit_scheduler
+    from src.bot.jobs import pending_jobs
+
+    while pending_jobs() or get_edit_scheduler().stats()["pending"]:
+        await asyncio.sleep(0.05)
+
+
+class WebhookPath:
+    """Posts updates to the Flask webhook route, the way Gunicorn threads would"""
+
+    name = "webhook"
+
+    def __init__(self, bot_latency: float, threads: int):
+        import src.main
+
+        self.main = src.main
+        self.threads = threads
+        self.application = build_application(bot_latency)
+        self.main.application = self.application
+        asyncio.run_coroutine_threadsafe(self.application.initialize(), src.main.get_bot_loop()).result()
+        self.requests: List[float] = []
+        self.failures = 0
+
+    def run(self, scripts: List[List[Dict]]):
+        # Each thread serves some cashiers; a cashier's updates arrive in order
+        groups = [interleave(scripts[i::self.threads]) for i in range(min(self.threads, len(scripts)))]
+        lock = threading.Lock()
+        route = f"/{self.main.BOT_TOKEN}"
+
+        def worker(updates: List[Dict]):
+            client = self.main.app.test_client()
+            for update in updates:
+                started = time.perf_counter()
+                response = client.post(route, json=update)
+                elapsed = (time.perf_counter() - started) * 1e3
+                with lock:
+                    self.requests.append(elapsed)
+                    if response.status_code != 200:
+                        self.failures += 1
+
+        workers = [threading.Thread(target=worker, args=(group,)) for group in groups]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    def settle(self):
+        asyncio.run_coroutine_threadsafe(settle(), self.main.get_bot_loop()).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.application.shutdown(), self.main.get_bot_loop()).result()
+
+
+class PollingPath:
+    """Serves updates through getUpdates to the application's Updater"""
+
+    name = "polling"
+
+    def __init__(self, bot_latency: float, collector: Collector):
+        self.collector = collector
+        self.updates_request = FakeBotRequest(bot_latency)
+        self.application = build_application(bot_latency, self.updates_request)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self._start())
+        self.requests: List[float] = []
+        self.failures = 0
+
+    async def _start(self):
+        await self.application.initialize()
+        await self.application.start()
+        await self.application.updater.start_polling(poll_interval=0.0)
+
+    def run(self, scripts: List[List[Dict]]):
+        updates = interleave(scripts)
+        expected = len(self.collector.updates) + len(updates)
+
+        async def replay():
+            self.updates_request.queue_updates(updates)
+            while len(self.collector.updates) < expected:
+                await asyncio.sleep(0.005)
+
+        self.loop.run_until_complete(replay())
+
+    def settle(self):
+        self.loop.run_until_complete(settle())
+
+    def close(self):
+        async def stop():
+            await self.application.updater.stop()
+            await self.application.stop()
+            await self.application.shutdown()
+
+        self.loop.run_until_complete(stop())
+        self.loop.close()
+
+
+def report_latency(path, scripts: List[List[Dict]], elapsed: float, collector: Collector):
+    updates = sum(len(script) for script in scripts)
+    print(f"\n== {path.name}: {updates} updates from {len(scripts)} cashiers in {elapsed:.2f} s "
+          f"({updates / elapsed:.0f} updates/s)")
+    if collector.errors or path.failures:
+        print(f"   errors: {collector.errors} updates raised, {path.failures} webhook responses not 200")
+
+    print(f"   {'':<34} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    def row(name: str, values: List[float]):
+        print(f"   {name:<34} {len(values):>6} {percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f} "
+              f"{percentile(values, 99):>8.1f} {max(values):>8.1f}")
+
+    if path.requests:
+        row("(webhook request)", path.requests)
+    row("(update)", collector.updates)
+    for name, values in sorted(collector.handlers.items(), key=lambda item: -sum(item[1])):
+        row(name, values)
+
+
+def report_memory(path, updates: int, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot):
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(f"   memory: {growth / 1024:+.0f} KiB over {updates} updates "
+          f"({growth / updates:+.0f} B/update), peak {tracemalloc.get_traced_memory()[1] / 1024:.0f} KiB")
+
+    for stat in after.compare_to(before, "lineno")[:MEMORY_TOP]:
+        frame = stat.traceback[0]
+        filename = os.path.relpath(frame.filename) if frame.filename.startswith(os.getcwd()) else frame.filename
+        print(f"      {stat.size_diff / 1024:+8.1f} KiB  {filename}:{frame.lineno}")
+
+
+def replay(path, workload: Workload, collector: Collector, memory: bool):
+    # Timed run
+    scripts = workload.scripts()
+    collector.reset()
+    started = time.perf_counter()
+    path.run(scripts)
+    elapsed = time.perf_counter() - started
+    # Follow-up work (debounced edits, back to the dashboard after payment) is not part of the throughput
+    path.settle()
+    report_latency(path, scripts, elapsed, collector)
+
+    if not memory:
+        return
+
+    # Same workload again with fresh update IDs, measured after the timed run warmed everything up
+    scripts = workload.scripts()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    path.run(scripts)
+    path.settle()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    report_memory(path, sum(len(script) for script in scripts), before, after)
+    tracemalloc.stop()
+
+
+def main(cashiers: int, orders: int, db_latency: float, bot_latency: float, threads: int,
+         paths: List[str], memory: bool, seed_value: Optional[int]) -> int:
+    client = install(FakeSupabaseClient())
+    seed(client, orders=30, telegram_id=FIRST_CASHIER_ID)
+    for index in range(1, cashiers):
+        client.insert_row("authorized_users", {
+            "telegram_id": FIRST_CASHIER_ID + index,
+            "username": "cashier",
+            "full_name": "Cashier"
+        })
+    client.reset_calls()
+
+    from src.utils.tracing import RECENT_TRACES, get_tracer
+    from src.database.models import get_database
+
+    collector = Collector()
+    get_tracer().exporter = collector
+
+    # Steady state: the boot warm-up has already filled the caches
+    asyncio.run(get_database().warm_caches())
+    client.latency = db_latency
+
+    workload = Workload(client, cashiers, orders, random.Random(seed_value))
+    print(f"db latency {db_latency * 1e3:.0f} ms, bot api latency {bot_latency * 1e3:.0f} ms, "
+          f"{cashiers} cashiers x {orders} orders")
+    print(f"memory growth includes the last {RECENT_TRACES} traces kept for /trace (TRACE_RECENT_LIMIT)")
+
+    for name in paths:
+        path = WebhookPath(bot_latency, threads) if name == "webhook" else PollingPath(bot_latency, collector)
+        try:
+            replay(path, workload, collector, memory)
+        finally:
+            path.close()
+
+    return 1 if collector.errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cashiers", type=int, default=4, help="cashiers tapping at the same time")
+    parser.add_argument("--orders", type=int, default=10, help="orders per cashier")
+    parser.add_argument("--db-latency", type=float, default=5, help="Supabase round-trip time in ms")
+    parser.add_argument("--bot-latency", type=float, default=10, help="Bot API round-trip time in ms")
+    parser.add_argument("--threads", type=int, default=2, help="webhook threads (gunicorn --threads)")
+    parser.add_argument("--path", choices=["webhook", "polling", "both"], default="both")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc replay")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated session")
+    args = parser.parse_args()
+
+    sys.exit(main(
+        args.cashiers,
+        args.orders,
+        args.db_latency / 1e3,
+        args.bot_latency / 1e3,
+        args.threads,
+        ["webhook", "polling"] if args.path == "both" else [args.path],
+        not args.no_memory,
+        args.seed
+    ))
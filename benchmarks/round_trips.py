@@ -0,0 +1,183 @@
+"""
+DB round-trip budgets per user flow
+
+Drives each flow (start, end and start a session, add items, pay, view
+orders, purge) through a real Application, with the Supabase client and the
+Bot API replaced by in-memory fakes. Round trips are counted by the same
+per-update counters the bot reports in production. Fails if a flow exceeds
+its budget, so handlers cannot quietly accumulate queries.
+
+Run from the project root:
+    python -m benchmarks.round_trips [--verbose]
+"""
+import sys
+import asyncio
+import argparse
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fakes import FakeSupabaseClient, FakeBotRequest, install, seed, callback_update, message_update
+
+# Flow -> maximum Supabase round trips for the whole flow (follow-up jobs included).
+# Set to the current counts: raise one only together with the change that needs it.
+BUDGETS = {
+    "control panel (/start)": 1,
+    "end session": 5,
+    "start session (skip inventory)": 5,
+    "new order + 3 item taps": 6,
+    "confirm + pay cash": 5,
+    "view orders + order detail": 5,
+    "purge ended sessions": 12
+}
+
+
+class FlowRunner:
+    """Feeds updates to the application and waits for their follow-up work"""
+
+    def __init__(self, application):
+        self.application = application
+        self.update_id = 0
+        self.per_update: List[Tuple[str, int]] = []
+
+    async def send(self, update: Dict, label: str):
+        from telegram import Update
+        from src.database.round_trips import track_round_trips
+
+        with track_round_trips() as trips:
+            await self.application.process_update(Update.de_json(update, self.application.bot))
+        self.per_update.append((label, trips.count))
+
+    async def tap(self, data: str):
+        self.update_id += 1
+        await self.send(callback_update(self.update_id, data), data.partition(":")[0])
+
+    async def command(self, text: str):
+        self.update_id += 1
+        await self.send(message_update(self.update_id, text), text.split()[0])
+
+    async def settle(self):
+        """Wait for debounced edits and delayed jobs (e.g., back to the dashboard after payment)"""
+        from src.bot.edits import get_edit_scheduler
+        from src.bot.jobs import pending_jobs
+
+        while pending_jobs() or get_edit_scheduler().stats()["pending"]:
+            await asyncio.sleep(0.05)
+
+
+def flows(client: FakeSupabaseClient) -> List[Tuple[str, Callable]]:
+    from src.bot.callback_data import build, encode_id
+
+    def menu_item(index: int) -> str:
+        return encode_id(client.tables["menu_items"][index]["id"])
+
+    def latest_order() -> str:
+        return encode_id(client.tables["orders"][-1]["id"])
+
+    async def control_panel(run: FlowRunner):
+        await run.command("/start")
+
+    async def end_session(run: FlowRunner):
+        await run.tap("end_session")
+        await run.tap("confirm_end_session")
+
+    async def start_session(run: FlowRunner):
+        await run.tap("start_session")
+        await run.tap("skip_inventory")
+
+    async def add_items(run: FlowRunner):
+        await run.tap("new_order")
+        await run.tap(build("add_item", menu_item(0)))
+        await run.tap(build("add_item", menu_item(0)))
+        await run.tap(build("add_item", menu_item(4), 2))
+
+    async def pay(run: FlowRunner):
+        await run.tap("confirm_cart")
+        await run.tap("payment:cash")
+
+    async def view_orders(run: FlowRunner):
+        await run.tap("view_orders")
+        await run.tap(build("view_order", latest_order()))
+
+    async def purge(run: FlowRunner):
+        await run.tap("cleanup_menu")
+        await run.tap("confirm_purge_all")
+        await run.tap("purge_all_confirmed")
+
+    return [
+        ("control panel (/start)", control_panel),
+        ("end session", end_session),
+        ("start session (skip inventory)", start_session),
+        ("new order + 3 item taps", add_items),
+        ("confirm + pay cash", pay),
+        ("view orders + order detail", view_orders),
+        ("purge ended sessions", purge)
+    ]
+
+
+def summarize_calls(calls: List[str]) -> str:
+    """Collapse a call list into "select orders ×2, rpc create_order_idempotent" form"""
+    counts = Counter(calls)
+    return ", ".join(f"{call} ×{count}" if count > 1 else call for call, count in counts.items())
+
+
+async def main(verbose: bool = False) -> int:
+    client = install(FakeSupabaseClient())
+    seed(client, orders=30)
+
+    from telegram.ext import Application
+    from src.main import setup_handlers
+    from src.bot.instrumentation import InstrumentedApplication
+    from src.database.models import get_database
+    from src.database.round_trips import track_round_trips
+
+    application = (
+        Application.builder()
+        .token("1:fake")
+        .application_class(InstrumentedApplication)
+        .request(FakeBotRequest())
+        .get_updates_request(FakeBotRequest())
+        .build()
+    )
+    setup_handlers(application)
+    await application.initialize()
+
+    # Steady state: the boot warm-up has already filled the caches
+    await get_database().warm_caches()
+
+    failures = []
+    print(f"{'flow':<34} {'updates':>7} {'round trips':>12} {'budget':>7} {'max/update':>11}")
+
+    # One runner for all flows: update and callback query IDs must stay unique (dedupe)
+    run = FlowRunner(application)
+
+    for name, flow in flows(client):
+        run.per_update = []
+        with track_round_trips() as trips:
+            await flow(run)
+            await run.settle()
+
+        budget = BUDGETS[name]
+        worst = max(run.per_update, key=lambda item: item[1])
+        status = "" if trips.count <= budget else "  OVER BUDGET"
+        print(f"{name:<34} {len(run.per_update):>7} {trips.count:>12} {budget:>7} {worst[1]:>6} ({worst[0]}){status}")
+        print(f"    {summarize_calls(trips.calls)}")
+        if verbose:
+            for label, count in run.per_update:
+                print(f"      {label:<24} {count}")
+
+        if trips.count > budget:
+            failures.append(f"{name}: {trips.count} round trips, budget {budget}")
+
+    await application.shutdown()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="also list round trips per update")
+    sys.exit(asyncio.run(main(parser.parse_args().verbose)))
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: menu search lookups at 5,000 items
+
+Times building the MenuSearchIndex and answering typical inline queries,
+compared with a linear scan of the menu.
+
+Run from the project root:
+    python -m benchmarks.search
+"""
+import random
+import timeit
+import uuid
+
+from src.utils.search import MenuSearchIndex, normalize
+
+WORDS = [
+    "latte", "mocha", "americano", "cappuccino", "flat", "white", "iced", "hot", "matcha", "chai",
+    "lemon", "tea", "honey", "oat", "caramel", "vanilla", "hazelnut", "espresso", "milk", "chocolate"
+]
+SIZES = ["S", "M", "L", "XL", "Regular", "Large"]
+QUERIES = ["lat", "iced mocha", "van l", "m", "chocolate oat xl", "zzz"]
+
+
+def generate_menu(items: int = 5000, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": " ".join(rng.sample(WORDS, 2)).title() + f" {n}",
+            "size": rng.choice(SIZES),
+            "price": round(rng.uniform(2, 9), 2)
+        }
+        for n in range(items)
+    ]
+
+
+def linear_search(menu_items, query, limit=50):
+    words = normalize(query).split()
+    matches = []
+    for item in menu_items:
+        text = normalize(f"{item['name']} {item['size']}")
+        if all(word in text for word in words):
+            matches.append(item)
+            if len(matches) == limit:
+                break
+    return matches
+
+
+def main(number: int = 200):
+    menu_items = generate_menu()
+
+    build_ms = timeit.timeit(lambda: MenuSearchIndex(menu_items), number=3) / 3 * 1e3
+    index = MenuSearchIndex(menu_items)
+    print(f"{len(menu_items)} menu items, index built in {build_ms:.1f} ms")
+    print(f"{'query':<20} {'results':>8} {'index (ms)':>12} {'scan (ms)':>12}")
+
+    for query in QUERIES:
+        results = len(index.search(query))
+        indexed = timeit.timeit(lambda: index.search(query), number=number) / number * 1e3
+        scanned = timeit.timeit(lambda: linear_search(menu_items, query), number=max(1, number // 10)) / max(1, number // 10) * 1e3
+        print(f"{query:<20} {results:>8} {indexed:>12.3f} {scanned:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
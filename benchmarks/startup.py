@@ -0,0 +1,95 @@
+"""
+Startup benchmark: cold import and handler setup within a time budget
+
+Each run starts a fresh interpreter, imports src.main and builds the
+application with all handlers registered (no network calls), like a worker
+boot before it initializes against Telegram. Fails if the median exceeds the
+budget or if a module meant to load lazily was imported.
+
+Run from the project root:
+    python -m benchmarks.startup [--runs N] [--budget-ms MS]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from benchmarks.import_profile import DUMMY_ENV
+
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", 1000))
+
+# Modules that must not be imported until they are needed
+DEFERRED_MODULES = [
+    "supabase",
+    "postgrest",
+    "src.bot.handlers.setup",
+    "src.bot.handlers.users",
+    "src.bot.handlers.cleanup",
+    "src.bot.handlers.diagnostics"
+]
+
+CHILD = """
+import sys, json, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+application = src.main.application_builder().build()
+src.main.setup_handlers(application)
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1e3,
+    "total_ms": (ready - started) * 1e3,
+    "modules": sorted(sys.modules)
+}))
+"""
+
+
+def measure_once() -> dict:
+    """Time one cold start in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        capture_output=True,
+        text=True,
+        env={**DUMMY_ENV, **os.environ}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    total_ms = statistics.median(run["total_ms"] for run in runs)
+
+    print(f"{args.runs} cold starts (median)")
+    print(f"  import src.main:          {import_ms:7.1f} ms")
+    print(f"  + build app and handlers: {total_ms:7.1f} ms")
+    print(f"  budget:                   {args.budget_ms:7.1f} ms")
+
+    loaded = set(runs[0]["modules"])
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"startup took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    if eager:
+        failures.append(f"deferred modules imported at startup: {', '.join(eager)}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
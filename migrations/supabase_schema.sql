@@ -66,9 +66,13 @@ CREATE TABLE IF NOT EXISTS orders (
     total_amount DECIMAL(10, 2) NOT NULL,
     payment_method TEXT NOT NULL CHECK (payment_method IN ('cash', 'paynow')),
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    created_by BIGINT NOT NULL
+    created_by BIGINT NOT NULL,
+    idempotency_key TEXT
 );
 
+-- Add idempotency_key to orders tables created before it existed
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+
 -- Index for getting orders by session
 CREATE INDEX IF NOT EXISTS idx_orders_session_id ON orders(session_id, order_number);
 
@@ -78,6 +82,9 @@ CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at DESC);
 -- Unique constraint for order_number per session
 CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_session_order_number ON orders(session_id, order_number);
 
+-- Unique idempotency key so a retried order submission can never insert twice
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_idempotency_key ON orders(idempotency_key);
+
 -- Comments for documentation
 COMMENT ON TABLE authorized_users IS 'Users authorized to access the POS bot';
 COMMENT ON TABLE menu_items IS 'Menu items with sizes and prices';
@@ -90,6 +97,7 @@ COMMENT ON COLUMN menu_items.display_order IS 'Order in which items appear in me
 COMMENT ON COLUMN sale_sessions.status IS 'Session status: active or ended';
 COMMENT ON COLUMN orders.items IS 'JSONB array of order items with quantities';
 COMMENT ON COLUMN orders.order_number IS 'Incremental order number per session';
+COMMENT ON COLUMN orders.idempotency_key IS 'Client-derived key that makes order creation safe to retry';
 
 -- Sample data: Insert your authorized Telegram ID here
 -- Replace 123456789 with your actual Telegram ID
@@ -113,6 +121,46 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to create an order exactly once per idempotency key
+-- Returns the existing order if the key was already used, so retries cost one round trip
+CREATE OR REPLACE FUNCTION create_order_idempotent(
+    p_session_id UUID,
+    p_items JSONB,
+    p_total_amount DECIMAL(10, 2),
+    p_payment_method TEXT,
+    p_created_by BIGINT,
+    p_idempotency_key TEXT
+)
+RETURNS SETOF orders AS $$
+BEGIN
+    IF p_idempotency_key IS NOT NULL THEN
+        RETURN QUERY SELECT * FROM orders WHERE idempotency_key = p_idempotency_key;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO orders (session_id, order_number, items, total_amount, payment_method, created_by, idempotency_key)
+    VALUES (
+        p_session_id,
+        get_next_order_number(p_session_id),
+        p_items,
+        p_total_amount,
+        p_payment_method,
+        p_created_by,
+        p_idempotency_key
+    )
+    ON CONFLICT (idempotency_key) DO NOTHING
+    RETURNING *;
+
+    -- Lost a race with a concurrent submission of the same key
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT * FROM orders WHERE idempotency_key = p_idempotency_key;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Function to update session total when orders change
 CREATE OR REPLACE FUNCTION update_session_total()
 RETURNS TRIGGER AS $$
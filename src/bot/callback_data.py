@@ -0,0 +1,80 @@
+"""
+Compact callback data: short UUID tokens and a size-checked builder
+
+Telegram limits callback data to 64 bytes. A UUID in its 36-character text
+form leaves little room for anything else, so record IDs are sent as the
+22-character base64url encoding of their 16 bytes instead.
+"""
+import uuid
+import base64
+import binascii
+from functools import lru_cache
+
+# Separator between the action and its arguments (see CallbackRouter)
+SEPARATOR = ":"
+
+# Telegram's limit on callback_data, in bytes
+MAX_CALLBACK_DATA_BYTES = 64
+
+SHORT_ID_LENGTH = 22
+
+
+@lru_cache(maxsize=4096)
+def encode_id(record_id: str) -> str:
+    """
+    Encode a UUID as a 22-character base64url token
+
+    Values that are not UUIDs are returned unchanged.
+
+    Args:
+        record_id: UUID string (e.g., a menu item, order or session ID)
+
+    Returns:
+        str: Short token for use in callback data
+    """
+    try:
+        raw = uuid.UUID(record_id).bytes
+    except (ValueError, AttributeError, TypeError):
+        return record_id
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@lru_cache(maxsize=4096)
+def decode_id(token: str) -> str:
+    """
+    Decode a short token back into the canonical UUID string
+
+    Also accepts the full 36-character UUID form, so buttons sent before
+    short IDs were introduced keep working.
+
+    Raises:
+        ValueError: If the token is neither a short ID nor a UUID
+    """
+    if len(token) == SHORT_ID_LENGTH:
+        try:
+            raw = base64.urlsafe_b64decode(token + "==")
+        except (binascii.Error, ValueError):
+            raise ValueError(f"Invalid short ID: {token}")
+        return str(uuid.UUID(bytes=raw))
+
+    return str(uuid.UUID(token))
+
+
+def build(action: str, *args) -> str:
+    """
+    Build callback data for an action and its arguments
+
+    Args:
+        action: Callback action registered with the router
+        *args: Arguments, already encoded (use encode_id for record IDs)
+
+    Returns:
+        str: Callback data
+
+    Raises:
+        ValueError: If the result exceeds Telegram's 64-byte limit
+    """
+    data = SEPARATOR.join([action, *map(str, args)])
+    if len(data.encode("utf-8")) > MAX_CALLBACK_DATA_BYTES:
+        raise ValueError(f"Callback data too long ({len(data.encode('utf-8'))} bytes): {data}")
+    return data
@@ -0,0 +1,40 @@
+"""
+Conversation state for the manual, text-driven flows
+"""
+from typing import Dict, Optional
+
+# Each text-driven flow keeps its current step in its own user_data key
+FLOW_STATE_KEYS = {
+    'menu': 'menu_state',
+    'inventory': 'inventory_state',
+    'users': 'user_mgmt_state'
+}
+
+
+def enter_flow(user_data: Dict, flow: str):
+    """
+    Mark a flow as the one receiving the user's text messages
+
+    Clears the step of every other flow, so an abandoned flow can never
+    claim text meant for the new one.
+
+    Args:
+        user_data: The user's context.user_data
+        flow: Flow name (a key of FLOW_STATE_KEYS)
+    """
+    for other_flow, state_key in FLOW_STATE_KEYS.items():
+        if other_flow != flow:
+            user_data.pop(state_key, None)
+
+
+def get_active_flow(user_data: Dict) -> Optional[str]:
+    """
+    Get the flow currently waiting for text input
+
+    Returns:
+        Optional[str]: Flow name, or None if no flow is waiting for text
+    """
+    for flow, state_key in FLOW_STATE_KEYS.items():
+        if user_data.get(state_key):
+            return flow
+    return None
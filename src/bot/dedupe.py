@@ -0,0 +1,222 @@
+"""
+Duplicate update detection for webhook redeliveries and double taps
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class MemoryDedupeBackend:
+    """
+    In-process LRU of seen keys with a TTL
+
+    Entries are kept in expiry order, so eviction of expired or excess keys
+    only ever looks at the oldest entry (O(1) per insert).
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str, now: float) -> bool:
+        """Record a key, returning False if it was already seen and not expired"""
+        with self._lock:
+            expires_at = self._entries.get(key)
+            is_new = expires_at is None or expires_at <= now
+
+            # Refresh expiry and move to the newest end
+            self._entries[key] = now + self.ttl
+            self._entries.move_to_end(key)
+
+            # Evict from the oldest end
+            while self._entries:
+                oldest_key, oldest_expiry = next(iter(self._entries.items()))
+                if len(self._entries) > self.max_entries or oldest_expiry <= now:
+                    self._entries.popitem(last=False)
+                else:
+                    break
+
+            return is_new
+
+    def remove(self, key: str):
+        """Forget a key, so it is new again"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteDedupeBackend:
+    """
+    Seen keys in a SQLite file, shared by every worker process on the host
+
+    The insert-or-refresh is a single statement, so two workers racing on the
+    same key can never both see it as new.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._adds = 0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_updates ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_updates_expires_at ON seen_updates(expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, key: str, now: float) -> bool:
+        """Record a key, returning False if it was already seen and not expired"""
+        conn = self._connection()
+        cursor = conn.execute(
+            "INSERT INTO seen_updates (key, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE seen_updates.expires_at <= ?",
+            (key, now + self.ttl, now)
+        )
+
+        self._adds += 1
+        if self._adds % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM seen_updates WHERE expires_at <= ?", (now,))
+
+        return cursor.rowcount == 1
+
+    def remove(self, key: str):
+        """Forget a key, so it is new again"""
+        self._connection().execute("DELETE FROM seen_updates WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM seen_updates").fetchone()[0]
+
+
+class DedupeStore:
+    """Duplicate detector for update IDs and callback query IDs with hit counters"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def seen(self, key: str) -> bool:
+        """
+        Check and record a key in one step
+
+        Returns:
+            bool: True if the key was already recorded (a duplicate)
+        """
+        try:
+            is_new = self.backend.add(key, time.time())
+        except Exception as e:
+            # Never drop an update because the dedupe store is unavailable
+            self.errors += 1
+            logger.warning(f"Dedupe backend error for {key}: {e}")
+            return False
+
+        if is_new:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def forget(self, key: str):
+        """
+        Remove a recorded key after its processing failed
+
+        Keys are recorded before processing, so that concurrent redeliveries
+        never both run; when processing fails, the mark is removed so that the
+        redelivery is processed instead of being dropped as a duplicate.
+        """
+        try:
+            self.backend.remove(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Dedupe backend error forgetting {key}: {e}")
+
+    def seen_update(self, update_id: int) -> bool:
+        """Check and record a Telegram update ID"""
+        return self.seen(f"update:{update_id}")
+
+    def forget_update(self, update_id: int):
+        """Forget a Telegram update ID whose processing failed"""
+        self.forget(f"update:{update_id}")
+
+    def seen_callback_query(self, query_id: str) -> bool:
+        """Check and record a callback query ID"""
+        return self.seen(f"callback:{query_id}")
+
+    def forget_callback_query(self, query_id: str):
+        """Forget a callback query ID whose handler failed"""
+        self.forget(f"callback:{query_id}")
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "size": len(self.backend)
+        }
+
+
+_store: Optional[DedupeStore] = None
+_store_lock = threading.Lock()
+
+
+def create_backend():
+    """
+    Create the dedupe backend configured by environment variables
+
+    DEDUPE_BACKEND: "memory" (default, per process) or "sqlite" (shared by workers)
+    DEDUPE_SQLITE_PATH: SQLite file for the shared backend
+    DEDUPE_TTL_SECONDS: How long a seen key is remembered
+    """
+    backend = os.getenv("DEDUPE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("DEDUPE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+
+    if backend == "sqlite":
+        path = os.getenv("DEDUPE_SQLITE_PATH", "/tmp/kori_pos_dedupe.sqlite3")
+        return SQLiteDedupeBackend(path, ttl=ttl)
+
+    if backend != "memory":
+        logger.warning(f"Unknown DEDUPE_BACKEND '{backend}', using in-memory store")
+
+    return MemoryDedupeBackend(ttl=ttl)
+
+
+def get_dedupe_store() -> DedupeStore:
+    """Get the process-wide dedupe store"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DedupeStore(create_backend())
+
+    return _store
@@ -0,0 +1,278 @@
+"""
+Message edit helpers: debounced edits for rapidly changing screens (e.g., the
+cart) and skipping of edits that would not change the message
+"""
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+from telegram import InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = float(os.getenv("EDIT_DEBOUNCE_SECONDS", 0.3))
+RENDER_CACHE_SIZE = 2048
+
+
+def render_fingerprint(text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                       parse_mode: Optional[str] = None) -> str:
+    """Get a fingerprint of a rendered screen (text, keyboard and parse mode)"""
+    markup = json.dumps(reply_markup.to_dict(), sort_keys=True) if reply_markup else ""
+    raw = f"{parse_mode}\x00{text}\x00{markup}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """
+    Last render we sent for each message
+
+    An entry stores the fingerprint together with the edit_date Telegram
+    returned for our edit. A new render is only skipped when its fingerprint
+    matches and the message still carries that edit_date, i.e. nothing else
+    has edited the message since.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[str, object]]" = OrderedDict()
+
+        self.skipped = 0
+        self.not_modified = 0
+        self.sent = 0
+
+    def is_current(self, message, fingerprint: str) -> bool:
+        """Check if a message already shows the given render"""
+        if message is None:
+            return False
+
+        entry = self._entries.get((message.chat_id, message.message_id))
+        if entry is None:
+            return False
+
+        cached_fingerprint, edit_date = entry
+        return cached_fingerprint == fingerprint and edit_date is not None and message.edit_date == edit_date
+
+    def record(self, chat_id: int, message_id: int, fingerprint: str, edited_message):
+        """Remember the render just sent for a message"""
+        key = (chat_id, message_id)
+        edit_date = getattr(edited_message, "edit_date", None)
+
+        self._entries[key] = (fingerprint, edit_date)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, chat_id: int, message_id: int):
+        """Drop the cached render of a message"""
+        self._entries.pop((chat_id, message_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get render cache counters"""
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "not_modified": self.not_modified,
+            "size": len(self._entries)
+        }
+
+
+class _PendingEdit:
+    """Latest render waiting to be sent for one message"""
+
+    __slots__ = ("text", "kwargs", "task")
+
+    def __init__(self, text: str, kwargs: Dict):
+        self.text = text
+        self.kwargs = kwargs
+        self.task: Optional[asyncio.Task] = None
+
+
+class EditScheduler:
+    """
+    Collapses edits of the same message within a short window
+
+    Each (chat_id, message_id) has at most one pending edit. Scheduling a new
+    render while one is pending replaces it, so a burst of cart taps costs one
+    Bot API call. Flood-wait (429) responses are honored by sleeping for
+    retry_after and then sending the newest render.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW_SECONDS):
+        self.window = window
+        self._pending: Dict[Tuple[int, int], _PendingEdit] = {}
+        self._inflight: Dict[Tuple[int, int], asyncio.Task] = {}
+
+        self.requested = 0
+        self.sent = 0
+        self.saved = 0
+        self.retry_after_waits = 0
+
+    def schedule(self, bot, chat_id: int, message_id: int, text: str, **kwargs):
+        """
+        Schedule an edit of a message, replacing any render still pending for it
+
+        Args:
+            bot: Bot used to send the edit
+            chat_id: Chat of the message
+            message_id: Message to edit
+            text: New message text
+            **kwargs: Extra edit_message_text arguments (reply_markup, parse_mode)
+        """
+        key = (chat_id, message_id)
+        self.requested += 1
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.text = text
+            pending.kwargs = kwargs
+            self.saved += 1
+            return
+
+        pending = _PendingEdit(text, kwargs)
+        self._pending[key] = pending
+        pending.task = asyncio.get_running_loop().create_task(self._flush(bot, key, pending))
+
+    async def cancel(self, chat_id: int, message_id: int):
+        """
+        Drop the pending render of a message and wait for any edit in flight
+
+        Called before a handler edits the message directly, so a late
+        debounced render can never overwrite the newer screen.
+        """
+        key = (chat_id, message_id)
+
+        pending = self._pending.pop(key, None)
+        if pending is not None and pending.task is not None:
+            pending.task.cancel()
+            self.saved += 1
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight is not asyncio.current_task():
+            try:
+                await asyncio.shield(inflight)
+            except Exception:
+                pass
+
+    async def _flush(self, bot, key: Tuple[int, int], pending: _PendingEdit):
+        await asyncio.sleep(self.window)
+
+        while self._pending.get(key) is pending:
+            del self._pending[key]
+            self._inflight[key] = asyncio.current_task()
+
+            try:
+                edited = await bot.edit_message_text(
+                    chat_id=key[0],
+                    message_id=key[1],
+                    text=pending.text,
+                    **pending.kwargs
+                )
+                self.sent += 1
+                get_render_cache().record(
+                    key[0],
+                    key[1],
+                    render_fingerprint(pending.text, pending.kwargs.get('reply_markup'), pending.kwargs.get('parse_mode')),
+                    edited
+                )
+                return
+            except RetryAfter as e:
+                self.retry_after_waits += 1
+                if key in self._pending:
+                    # A newer render was scheduled meanwhile and will be sent instead
+                    self.saved += 1
+                    return
+
+                # Put the render back so new taps merge into it while we wait
+                self._pending[key] = pending
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"Flood control on message {key}, retrying in {retry_after}s")
+                await asyncio.sleep(retry_after)
+            except BadRequest as e:
+                if "not modified" not in str(e).lower():
+                    logger.error(f"Failed to edit message {key}: {e}")
+                return
+            except Exception as e:
+                logger.error(f"Failed to edit message {key}: {e}", exc_info=True)
+                return
+            finally:
+                if self._inflight.get(key) is asyncio.current_task():
+                    del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Get edit counters"""
+        return {
+            "requested": self.requested,
+            "sent": self.sent,
+            "saved": self.saved,
+            "retry_after_waits": self.retry_after_waits,
+            "pending": len(self._pending)
+        }
+
+
+_scheduler: Optional[EditScheduler] = None
+_render_cache: Optional[RenderCache] = None
+
+
+def get_edit_scheduler() -> EditScheduler:
+    """Get the process-wide edit scheduler"""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = EditScheduler()
+
+    return _scheduler
+
+
+def get_render_cache() -> RenderCache:
+    """Get the process-wide render cache"""
+    global _render_cache
+
+    if _render_cache is None:
+        _render_cache = RenderCache()
+
+    return _render_cache
+
+
+async def edit_message(query, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                       parse_mode: Optional[str] = None):
+    """
+    Edit the message of a callback query, skipping edits that change nothing
+
+    Refresh and back/cancel flows often re-render the exact screen already
+    shown; those edits are answered locally instead of costing a Bot API
+    round trip and a "message is not modified" error.
+
+    Args:
+        query: Callback query whose message is edited
+        text: New message text
+        reply_markup: Optional inline keyboard
+        parse_mode: Optional parse mode
+    """
+    cache = get_render_cache()
+    message = query.message
+    fingerprint = render_fingerprint(text, reply_markup, parse_mode)
+
+    if cache.is_current(message, fingerprint):
+        cache.skipped += 1
+        return message
+
+    try:
+        edited = await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+        cache.not_modified += 1
+        return message
+
+    cache.sent += 1
+    if message is not None:
+        cache.record(message.chat_id, message.message_id, fingerprint, edited)
+
+    return edited
@@ -2,10 +2,12 @@
 Cleanup handlers for deleting past sales and inventory
 """
 import logging
+from functools import partial
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.bot.middleware import require_auth_callback
-from src.database.models import Database
+from src.bot.jobs import run_later
+from src.database.models import get_database
 from src.bot.keyboards import (
     get_cleanup_menu_keyboard,
     get_past_sales_cleanup_keyboard,
@@ -16,10 +18,21 @@ from src.bot.keyboards import (
 )
 from src.utils.timezone import format_full_datetime
 
-db = Database()
+db = get_database()
 logger = logging.getLogger(__name__)
 
 
+async def show_cleanup_menu(query):
+    """Show the cleanup menu on the query's message (helper function, no auth decorator needed)"""
+    await query.edit_message_text(
+        "🗑 *Cleanup Menu*\n\n"
+        "Select what you want to clean up:\n\n"
+        "⚠️ *Warning:* Deleted data cannot be recovered!",
+        reply_markup=get_cleanup_menu_keyboard(),
+        parse_mode="Markdown"
+    )
+
+
 @require_auth_callback
 async def cleanup_menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show cleanup menu"""
@@ -40,14 +53,12 @@ async def cleanup_sales_callback(update: Update, context: ContextTypes.DEFAULT_T
     query = update.callback_query
 
     # Extract page number from callback data if present
-    page = 0
-    if ':' in query.data:
-        page = int(query.data.split(':')[1])
+    page = context.args[0] if context.args else 0
 
     # Get past sessions (not active)
     limit = 10
     offset = page * limit
-    sessions = db.get_past_sessions(limit=limit, offset=offset)
+    sessions = await db.run(db.get_past_sessions, limit=limit, offset=offset)
 
     # Filter out active sessions
     sessions = [s for s in sessions if s.get('status') == 'ended']
@@ -83,14 +94,12 @@ async def cleanup_inventory_callback(update: Update, context: ContextTypes.DEFAU
     query = update.callback_query
 
     # Extract page number from callback data if present
-    page = 0
-    if ':' in query.data:
-        page = int(query.data.split(':')[1])
+    page = context.args[0] if context.args else 0
 
     # Get sessions with inventory
     limit = 10
     offset = page * limit
-    sessions = db.get_sessions_with_inventory(limit=limit, offset=offset)
+    sessions = await db.run(db.get_sessions_with_inventory, limit=limit, offset=offset)
 
     if not sessions:
         await query.edit_message_text(
@@ -123,10 +132,14 @@ async def confirm_delete_session_callback(update: Update, context: ContextTypes.
     query = update.callback_query
 
     # Extract session ID from callback data
-    session_id = query.data.split(':')[1]
+    session_id = context.args[0]
 
-    # Get session details
-    session = db.get_session_by_id(session_id)
+    # Get session details, order count and inventory together
+    session, order_count, inventory = await db.gather(
+        partial(db.get_session_by_id, session_id),
+        partial(db.get_order_count_by_session, session_id),
+        partial(db.get_inventory_by_session, session_id)
+    )
     if not session:
         await query.edit_message_text(
             "❌ Session not found.",
@@ -134,11 +147,6 @@ async def confirm_delete_session_callback(update: Update, context: ContextTypes.
         )
         return
 
-    # Get order count
-    order_count = db.get_order_count_by_session(session_id)
-
-    # Get inventory count
-    inventory = db.get_inventory_by_session(session_id)
     inventory_count = len(inventory) if inventory else 0
 
     # Format session info
@@ -170,10 +178,10 @@ async def delete_session_callback(update: Update, context: ContextTypes.DEFAULT_
     query = update.callback_query
 
     # Extract session ID from callback data
-    session_id = query.data.split(':')[1]
+    session_id = context.args[0]
 
     # Get session details before deletion
-    session = db.get_session_by_id(session_id)
+    session = await db.run(db.get_session_by_id, session_id)
     if not session:
         await query.edit_message_text(
             "❌ Session not found.",
@@ -182,7 +190,7 @@ async def delete_session_callback(update: Update, context: ContextTypes.DEFAULT_
         return
 
     # Delete session (cascade will delete orders and inventory)
-    success = db.delete_session(session_id)
+    success = await db.run(db.delete_session, session_id)
 
     if success:
         started_at = format_full_datetime(session.get('started_at'))
@@ -194,16 +202,8 @@ async def delete_session_callback(update: Update, context: ContextTypes.DEFAULT_
             parse_mode="Markdown"
         )
 
-        # Wait a moment then show cleanup menu
-        import asyncio
-        await asyncio.sleep(1.5)
-        await query.edit_message_text(
-            "🗑 *Cleanup Menu*\n\n"
-            "Select what you want to clean up:\n\n"
-            "⚠️ *Warning:* Deleted data cannot be recovered!",
-            reply_markup=get_cleanup_menu_keyboard(),
-            parse_mode="Markdown"
-        )
+        # Show cleanup menu after a moment (scheduled, so the handler returns now)
+        run_later(1.5, show_cleanup_menu, query, query=query)
     else:
         await query.edit_message_text(
             "❌ Failed to delete session. Please try again.",
@@ -231,7 +231,7 @@ async def confirm_purge_all_callback(update: Update, context: ContextTypes.DEFAU
     query = update.callback_query
 
     # Get count of past sessions
-    all_sessions = db.get_past_sessions(limit=10000, offset=0)
+    all_sessions = await db.run(db.get_past_sessions, limit=10000, offset=0)
     ended_sessions = [s for s in all_sessions if s.get('status') == 'ended']
 
     if not ended_sessions:
@@ -249,8 +249,8 @@ async def confirm_purge_all_callback(update: Update, context: ContextTypes.DEFAU
     total_inventory = 0
 
     for session in ended_sessions:
-        total_orders += db.get_order_count_by_session(session['id'])
-        inventory = db.get_inventory_by_session(session['id'])
+        total_orders += await db.run(db.get_order_count_by_session, session['id'])
+        inventory = await db.run(db.get_inventory_by_session, session['id'])
         total_inventory += len(inventory) if inventory else 0
 
     text = f"⚠️ *PURGE ALL PAST DATA*\n\n"
@@ -282,7 +282,7 @@ async def purge_all_confirmed_callback(update: Update, context: ContextTypes.DEF
     )
 
     # Execute purge
-    result = db.purge_all_past_sessions()
+    result = await db.run(db.purge_all_past_sessions)
 
     if result['sessions'] > 0:
         await query.edit_message_text(
@@ -295,16 +295,8 @@ async def purge_all_confirmed_callback(update: Update, context: ContextTypes.DEF
             parse_mode="Markdown"
         )
 
-        # Wait a moment then show cleanup menu
-        import asyncio
-        await asyncio.sleep(2)
-        await query.edit_message_text(
-            "🗑 *Cleanup Menu*\n\n"
-            "Select what you want to clean up:\n\n"
-            "⚠️ *Warning:* Deleted data cannot be recovered!",
-            reply_markup=get_cleanup_menu_keyboard(),
-            parse_mode="Markdown"
-        )
+        # Show cleanup menu after a moment (scheduled, so the handler returns now)
+        run_later(2, show_cleanup_menu, query, query=query)
     else:
         await query.edit_message_text(
             "❌ No data was purged.\n\n"
@@ -4,34 +4,32 @@ Control panel handlers
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.bot.middleware import require_auth
-from src.database.models import Database
+from src.bot.handlers.sales import clear_order_screen
+from src.database.models import get_database
 from src.bot.keyboards import get_control_panel_keyboard, get_pagination_keyboard
-from src.utils.formatters import format_session_summary, format_inventory_list, format_user_display_name
+from src.utils.formatters import format_session_summary, format_inventory_list
 from src.utils.timezone import format_full_datetime
 import math
 
-db = Database()
+db = get_database()
 
 
 @require_auth
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command"""
     user = update.effective_user
+    clear_order_screen(context.user_data)
 
     # Check if there's an active session
-    active_session = db.get_active_session()
+    active_session = await db.run(db.get_active_session)
 
     if active_session:
         # Show control panel with active session info
         started_by_id = active_session.get('started_by')
         started_at = format_full_datetime(active_session.get('started_at'))
 
-        # Get user info for display name
-        user_info = db.get_user_by_telegram_id(started_by_id) if started_by_id else None
-        started_by_name = format_user_display_name(
-            started_by_id,
-            user_info.get('full_name') if user_info else None
-        )
+        # Resolve display name (from the cached user directory)
+        started_by_name = await db.run(db.resolve_user_name, started_by_id)
 
         await update.message.reply_text(
             f"👋 Welcome back, {user.first_name}!\n\n"
@@ -59,15 +57,16 @@ async def control_panel_callback(update: Update, context: ContextTypes.DEFAULT_T
 
     user = update.effective_user
     user_name = user.first_name
+    clear_order_screen(context.user_data)
 
     # Check if there's an active session
-    active_session = db.get_active_session()
+    active_session = await db.run(db.get_active_session)
 
     if active_session:
         # Show active session stats
         started_at = format_full_datetime(active_session.get('started_at'))
         total_sales = active_session.get('total_sales', 0)
-        order_count = db.get_order_count_by_session(active_session['id'])
+        order_count = await db.run(db.get_order_count_by_session, active_session['id'])
 
         await query.edit_message_text(
             f"🏠 *Control Panel*\n\n"
@@ -82,13 +81,13 @@ async def control_panel_callback(update: Update, context: ContextTypes.DEFAULT_T
         return
 
     # No active session - check for last ended session
-    last_session = db.get_last_ended_session()
+    last_session = await db.run(db.get_last_ended_session)
 
     if last_session:
         # Show last ended session summary
         ended_at = format_full_datetime(last_session.get('ended_at'))
         total_sales = last_session.get('total_sales', 0)
-        order_count = db.get_order_count_by_session(last_session['id'])
+        order_count = await db.run(db.get_order_count_by_session, last_session['id'])
 
         await query.edit_message_text(
             f"🏠 *Control Panel*\n\n"
@@ -119,19 +118,17 @@ async def view_past_sales_callback(update: Update, context: ContextTypes.DEFAULT
     await query.answer()
 
     # Check if there's an active session
-    active_session = db.get_active_session()
+    active_session = await db.run(db.get_active_session)
 
     # Get page number from callback data if present
-    page = 0
-    if ':' in query.data:
-        page = int(query.data.split(':')[1])
+    page = context.args[0] if context.args else 0
 
     # Pagination settings
     per_page = 10
     offset = page * per_page
 
     # Get past sessions
-    sessions = db.get_past_sessions(limit=per_page, offset=offset)
+    sessions = await db.run(db.get_past_sessions, limit=per_page, offset=offset)
 
     if not sessions:
         await query.edit_message_text(
@@ -182,19 +179,17 @@ async def view_past_inventory_callback(update: Update, context: ContextTypes.DEF
     await query.answer()
 
     # Check if there's an active session
-    active_session = db.get_active_session()
+    active_session = await db.run(db.get_active_session)
 
     # Get page number from callback data if present
-    page = 0
-    if ':' in query.data:
-        page = int(query.data.split(':')[1])
+    page = context.args[0] if context.args else 0
 
     # Pagination settings
     per_page = 5  # Reduced per page since we're showing detailed items
     offset = page * per_page
 
     # Get sessions with inventory
-    sessions = db.get_sessions_with_inventory(limit=per_page, offset=offset)
+    sessions = await db.run(db.get_sessions_with_inventory, limit=per_page, offset=offset)
 
     if not sessions:
         await query.edit_message_text(
@@ -221,7 +216,7 @@ async def view_past_inventory_callback(update: Update, context: ContextTypes.DEF
         lines.append(f"{status}\n{time_info}")
 
         # Get and display individual inventory items
-        inventory = db.get_inventory_by_session(session['id'])
+        inventory = await db.run(db.get_inventory_by_session, session['id'])
         if inventory:
             lines.append(format_inventory_list(inventory))
         else:
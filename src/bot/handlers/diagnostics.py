@@ -0,0 +1,104 @@
+"""
+Diagnostics commands: where the time of slow updates went (/trace)
+"""
+import time
+from typing import Dict, List, Tuple
+from telegram import Update
+from telegram.ext import ContextTypes
+from src.bot.middleware import require_auth
+from src.utils.tracing import Span, get_tracer
+
+DEFAULT_TRACES = 5
+MAX_TRACES = 15
+
+# Span name prefix -> label in the breakdown
+SPAN_CATEGORIES = {
+    "db.": "db",
+    "bot_api.": "telegram",
+    "user_queue.": "queue"
+}
+
+
+def summarize_trace(root: Span) -> Tuple[Dict[str, Tuple[float, int]], List[Span]]:
+    """
+    Break a trace down into time per category and its slowest leaf spans
+
+    A span nested in a span of the same category (a Database method calling
+    another one) is not counted twice.
+
+    Returns:
+        Tuple: ({category: (total ms, span count)}, leaf spans slowest first)
+    """
+    parents = {span.span_id: span for span in root.walk()}
+    totals: Dict[str, Tuple[float, int]] = {}
+    leaves: List[Span] = []
+
+    for span in root.walk():
+        if span is root or span.duration_ms is None:
+            continue
+        if not span.children:
+            leaves.append(span)
+
+        for prefix, category in SPAN_CATEGORIES.items():
+            parent = parents.get(span.parent_id)
+            if span.name.startswith(prefix) and not (parent and parent.name.startswith(prefix)):
+                total, count = totals.get(category, (0.0, 0))
+                totals[category] = (total + span.duration_ms, count + 1)
+
+    leaves.sort(key=lambda span: span.duration_ms, reverse=True)
+    return totals, leaves
+
+
+def format_age(seconds: float) -> str:
+    """Format an age as e.g. "45s", "12m" or "3h" """
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.0f}h"
+
+
+def format_trace(index: int, root: Span, now: float) -> str:
+    """Format one trace for the /trace reply"""
+    action = root.attributes.get('action') or root.attributes.get('type', 'update')
+    lines = [f"{index}. {root.duration_ms:.0f} ms · {action} · {format_age(now - root.started_at)} ago"]
+
+    totals, leaves = summarize_trace(root)
+    breakdown = [f"{category} {total:.0f} ms ({count})" for category, (total, count) in totals.items()]
+    if root.attributes.get('db_round_trips') is not None:
+        breakdown.append(f"{root.attributes['db_round_trips']} round trips")
+    if breakdown:
+        lines.append("   " + " · ".join(breakdown))
+    if leaves:
+        lines.append("   slowest: " + ", ".join(f"{span.name} {span.duration_ms:.0f} ms" for span in leaves[:2]))
+    if root.error:
+        lines.append(f"   error: {root.error[:80]}")
+
+    return "\n".join(lines)
+
+
+@require_auth
+async def trace_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the slowest recent updates and where their time went (/trace [count])"""
+    try:
+        limit = min(max(int(context.args[0]), 1), MAX_TRACES) if context.args else DEFAULT_TRACES
+    except ValueError:
+        limit = DEFAULT_TRACES
+
+    tracer = get_tracer()
+    if not tracer.enabled:
+        await update.message.reply_text("ℹ️ Tracing is disabled (TRACING_ENABLED=false).")
+        return
+
+    recent = tracer.recent()
+    if not recent:
+        await update.message.reply_text("ℹ️ No traced updates yet.")
+        return
+
+    now = time.time()
+    text = f"🐢 Slowest of the last {len(recent)} updates\n\n"
+    text += "\n\n".join(
+        format_trace(index, root, now) for index, root in enumerate(tracer.slowest(limit), start=1)
+    )
+
+    await update.message.reply_text(text)
@@ -4,8 +4,9 @@ Inventory input handlers - Manual state management
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.bot.middleware import require_auth
-from src.database.models import Database
-from src.utils.formatters import format_inventory_list, format_currency, format_user_display_name
+from src.bot.conversation import enter_flow
+from src.database.models import get_database
+from src.utils.formatters import format_inventory_list, format_currency
 from src.utils.timezone import format_full_datetime
 from src.bot.keyboards import (
     get_inventory_start_keyboard,
@@ -15,7 +16,7 @@ from src.bot.keyboards import (
     get_sales_dashboard_keyboard
 )
 
-db = Database()
+db = get_database()
 
 
 @require_auth
@@ -25,7 +26,7 @@ async def start_session_callback(update: Update, context: ContextTypes.DEFAULT_T
     await query.answer()
 
     # Check if there's already an active session
-    active_session = db.get_active_session()
+    active_session = await db.run(db.get_active_session)
     if active_session:
         await query.edit_message_text(
             "⚠️ There is already an active session!\n\n"
@@ -53,6 +54,7 @@ async def start_adding_inventory_callback(update: Update, context: ContextTypes.
     await query.answer()
 
     # Set state to expect item name
+    enter_flow(context.user_data, 'inventory')
     context.user_data['inventory_state'] = 'AWAITING_ITEM_NAME'
 
     inventory = context.user_data.get('inventory', [])
@@ -108,11 +110,12 @@ async def cancel_session_start_callback(update: Update, context: ContextTypes.DE
 async def add_another_inventory_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle 'add another inventory item?' yes/no buttons"""
     query = update.callback_query
-    response = query.data.split(':')[1]  # 'yes' or 'no'
+    response = context.args[0]  # 'yes' or 'no'
     await query.answer()
 
     if response == 'yes':
         # Set state to expect item name
+        enter_flow(context.user_data, 'inventory')
         context.user_data['inventory_state'] = 'AWAITING_ITEM_NAME'
 
         inventory = context.user_data.get('inventory', [])
@@ -158,7 +161,6 @@ async def skip_inventory_price_callback(update: Update, context: ContextTypes.DE
     )
 
 
-@require_auth
 async def handle_inventory_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle text messages during inventory input flow"""
     state = context.user_data.get('inventory_state')
@@ -263,7 +265,7 @@ async def finish_inventory_input(update: Update, context: ContextTypes.DEFAULT_T
 
     # Create session
     telegram_id = update.effective_user.id
-    session = db.create_session(telegram_id)
+    session = await db.run(db.create_session, telegram_id)
 
     if not session:
         # Handle both callback query and message
@@ -279,7 +281,7 @@ async def finish_inventory_input(update: Update, context: ContextTypes.DEFAULT_T
 
     # Save inventory logs
     for inv_item in inventory:
-        db.add_inventory_log(
+        await db.run(db.add_inventory_log,
             session['id'],
             inv_item['item_name'],
             inv_item['quantity'],
@@ -313,19 +315,15 @@ async def finish_inventory_input(update: Update, context: ContextTypes.DEFAULT_T
 
     # Show dashboard directly after session creation
     # Get session details for dashboard
-    session_refreshed = db.get_active_session()
+    session_refreshed = await db.run(db.get_active_session)
     if session_refreshed:
-        order_count = db.get_order_count_by_session(session_refreshed['id'])
+        order_count = await db.run(db.get_order_count_by_session, session_refreshed['id'])
         total_sales = session_refreshed.get('total_sales', 0)
         started_at = format_full_datetime(session_refreshed.get('started_at'))
         started_by_id = session_refreshed.get('started_by')
 
-        # Get user info for display name
-        user_info = db.get_user_by_telegram_id(started_by_id) if started_by_id else None
-        started_by_name = format_user_display_name(
-            started_by_id,
-            user_info.get('full_name') if user_info else None
-        )
+        # Resolve display name (from the cached user directory)
+        started_by_name = await db.run(db.resolve_user_name, started_by_id)
 
         dashboard_text = (
             f"💰 *Sales Dashboard*\n\n"
@@ -340,6 +338,6 @@ async def finish_inventory_input(update: Update, context: ContextTypes.DEFAULT_T
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text=dashboard_text,
-            reply_markup=get_sales_dashboard_keyboard(total_sales),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
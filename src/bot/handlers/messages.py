@@ -0,0 +1,31 @@
+"""
+Text message router for the manual state flows
+"""
+from telegram import Update
+from telegram.ext import ContextTypes
+from src.bot.middleware import require_auth
+from src.bot.conversation import get_active_flow
+from src.bot.lazy import lazy_handler
+from src.bot.handlers.inventory import handle_inventory_message
+from src.bot.handlers.sales import search_menu_message
+
+# Flow name -> handler that consumes the text for that flow's current step
+FLOW_HANDLERS = {
+    'menu': lazy_handler("src.bot.handlers.setup", "handle_menu_message"),
+    'inventory': handle_inventory_message,
+    'users': lazy_handler("src.bot.handlers.users", "handle_user_message")
+}
+
+
+@require_auth
+async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Route a text message to the flow waiting for input (one auth check per message)"""
+    flow = get_active_flow(context.user_data)
+
+    if not flow:
+        if context.user_data.get('cart_message'):
+            # Building an order: typed text searches the menu
+            await search_menu_message(update, context)
+        return  # Otherwise not in any text-driven flow, ignore
+
+    await FLOW_HANDLERS[flow](update, context)
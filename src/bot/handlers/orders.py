@@ -1,20 +1,22 @@
 """
 Order management handlers
 """
+from functools import partial
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.bot.middleware import require_auth_callback
-from src.database.models import Database
+from src.database.models import get_database
 from src.bot.keyboards import (
     get_orders_list_keyboard,
     get_order_detail_keyboard,
     get_confirm_delete_keyboard,
     get_sales_dashboard_keyboard
 )
+from src.bot.edits import edit_message
 from src.utils.formatters import format_order_summary
 import math
 
-db = Database()
+db = get_database()
 
 
 @require_auth_callback
@@ -24,40 +26,43 @@ async def view_orders_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
 
     # Get active session
-    session = db.get_active_session()
+    session = await db.run(db.get_active_session)
     if not session:
-        await query.edit_message_text(
+        await edit_message(
+            query,
             "⚠️ No active session found."
         )
         return
 
     # Get page number from callback data if present
-    page = 0
-    if ':' in query.data:
-        page = int(query.data.split(':')[1])
+    page = context.args[0] if context.args else 0
 
     # Pagination settings
     per_page = 5
     offset = page * per_page
 
-    # Get orders
-    orders = db.get_orders_by_session(session['id'], limit=per_page, offset=offset)
+    # Get orders and the total count together
+    orders, total_orders = await db.gather(
+        partial(db.get_orders_by_session, session['id'], limit=per_page, offset=offset),
+        partial(db.get_order_count_by_session, session['id'])
+    )
 
     if not orders and page == 0:
-        await query.edit_message_text(
+        await edit_message(
+            query,
             "📝 *Orders*\n\n"
             "No orders yet.",
-            reply_markup=get_sales_dashboard_keyboard(session.get('total_sales', 0)),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
         return
 
     # Calculate total pages
-    total_orders = db.get_order_count_by_session(session['id'])
     total_pages = math.ceil(total_orders / per_page)
 
     # Show orders list
-    await query.edit_message_text(
+    await edit_message(
+        query,
         f"📝 *Orders* (Page {page + 1}/{total_pages})\n\n"
         "Select an order to view details:",
         reply_markup=get_orders_list_keyboard(orders, page, total_pages),
@@ -72,17 +77,18 @@ async def view_order_detail_callback(update: Update, context: ContextTypes.DEFAU
     query = update.callback_query
 
     # Extract order ID from callback data
-    order_id = query.data.split(':')[1]
+    order_id = context.args[0]
 
     # Get order
-    order = db.get_order_by_id(order_id)
+    order = await db.run(db.get_order_by_id, order_id)
 
     if not order:
         # Note: Can't show alert since query was already answered
         return
 
     # Format and show order details
-    order_text = format_order_summary(order)
+    created_by_name = await db.run(db.resolve_user_name, order['created_by']) if order.get('created_by') else None
+    order_text = format_order_summary(order, created_by_name)
 
     await query.edit_message_text(
         order_text,
@@ -98,10 +104,10 @@ async def delete_order_callback(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
 
     # Extract order ID from callback data
-    order_id = query.data.split(':')[1]
+    order_id = context.args[0]
 
     # Get order
-    order = db.get_order_by_id(order_id)
+    order = await db.run(db.get_order_by_id, order_id)
 
     if not order:
         # Note: Can't show alert since query was already answered
@@ -123,13 +129,17 @@ async def confirm_delete_order_callback(update: Update, context: ContextTypes.DE
     query = update.callback_query
 
     # Extract order ID from callback data
-    order_id = query.data.split(':')[1]
+    order_id = context.args[0]
 
     # Get order before deletion
-    order = db.get_order_by_id(order_id)
+    order = await db.run(db.get_order_by_id, order_id)
 
     if not order:
-        # Note: Can't show alert since query was already answered
+        # The order ID is the deletion key: a repeated confirm finds the order already gone
+        await query.edit_message_text(
+            "ℹ️ This order has already been deleted.",
+            reply_markup=get_sales_dashboard_keyboard()
+        )
         return
 
     order_number = order['order_number']
@@ -137,10 +147,7 @@ async def confirm_delete_order_callback(update: Update, context: ContextTypes.DE
     payment_method = order['payment_method']
 
     # Delete order
-    success = db.delete_order(order_id)
-
-    # Get active session to show dashboard keyboard
-    session = db.get_active_session()
+    success = await db.run(db.delete_order, order_id)
 
     if success:
         from src.utils.formatters import format_currency
@@ -150,7 +157,7 @@ async def confirm_delete_order_callback(update: Update, context: ContextTypes.DE
             f"Amount: {format_currency(total_amount)}\n"
             f"Payment: {payment_method.title()}\n\n"
             "The session total has been updated.",
-            reply_markup=get_sales_dashboard_keyboard(session.get('total_sales', 0) if session else 0),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
     else:
@@ -158,6 +165,6 @@ async def confirm_delete_order_callback(update: Update, context: ContextTypes.DE
             f"❌ *Failed to Delete Order*\n\n"
             f"Order #{order_number} could not be deleted.\n"
             "Please try again.",
-            reply_markup=get_sales_dashboard_keyboard(session.get('total_sales', 0) if session else 0),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
@@ -1,27 +1,212 @@
 """
 Active sale session handlers
 """
+import hashlib
+import uuid
+from functools import partial
 from telegram import Update
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 from src.bot.middleware import require_auth, require_auth_callback
-from src.database.models import Database
+from src.bot.user_queue import pop_cart_deltas
+from src.bot.edits import get_edit_scheduler, edit_message
+from src.bot.jobs import run_later
+from src.database.models import get_database
 from src.bot.keyboards import (
     get_sales_dashboard_keyboard,
     get_menu_items_keyboard,
     get_payment_method_keyboard,
     get_confirm_end_session_keyboard,
-    get_control_panel_keyboard
+    get_control_panel_keyboard,
+    QTY_STEPS,
+    QUICK_ADD_ITEMS
 )
-from src.utils.formatters import format_currency, format_cart, format_session_summary, format_user_display_name
+from src.utils.formatters import (
+    format_currency,
+    format_cart,
+    format_order_items,
+    format_session_summary
+)
+from src.utils.quick_order import parse_quick_order, QUICK_ORDER_USAGE
 from src.utils.timezone import get_singapore_time, format_full_datetime
 
-db = Database()
+db = get_database()
+
+# Longest typed text used as a menu search
+MAX_MENU_SEARCH_LENGTH = 40
+
+
+def build_order_idempotency_key(session_id: str, cart_token: str, cart: dict) -> str:
+    """
+    Derive the idempotency key for submitting a cart as an order
+
+    The key is stable for the same cart (token + contents), so a retried or
+    redelivered payment tap maps to the order that was already created,
+    while editing the cart afterwards produces a new key.
+    """
+    contents = ",".join(f"{item_id}x{cart[item_id]['quantity']}" for item_id in sorted(cart))
+    raw = f"{session_id}:{cart_token}:{contents}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+async def build_cart_screen(menu_items: list, user_data: dict):
+    """
+    Build the ordering screen (cart, then the current menu page)
+
+    The page, typed search text and quantity step are kept in user_data
+    ('menu_page', 'menu_search', 'qty_step') so every re-render of the cart
+    stays where the user is.
+
+    Returns:
+        Tuple[str, InlineKeyboardMarkup]: Message text and keyboard
+    """
+    cart = user_data.get('cart', {})
+    search = user_data.get('menu_search')
+    step = user_data.get('qty_step', 1)
+
+    text = f"{format_cart(cart)}\n\n📋 *Select items to add to cart:*"
+    if step < 0:
+        text += f"\n➖ Tapping an item removes {-step}"
+    elif step > 1:
+        text += f"\n✖️ Tapping an item adds {step}"
+    if search:
+        # Strip Markdown control characters from the echoed user text
+        shown = search.translate({ord(c): None for c in "*_`["})
+        text += f"\n🔍 Showing matches for \"{shown}\""
+    else:
+        text += "\n_Type a name to search the menu_"
+
+    # Quick-add row: most ordered items of this session (then of today)
+    session_id = user_data.get('session_id')
+    top_items = []
+    if session_id:
+        menu_dict = {item['id']: item for item in menu_items}
+        popular_ids = await db.run(db.get_popular_item_ids, session_id, QUICK_ADD_ITEMS + 2)
+        top_items = [menu_dict[item_id] for item_id in popular_ids if item_id in menu_dict][:QUICK_ADD_ITEMS]
+
+    keyboard = get_menu_items_keyboard(
+        menu_items,
+        cart,
+        page=user_data.get('menu_page', 0),
+        search=search,
+        step=step,
+        top_items=top_items,
+        can_repeat=bool(user_data.get('last_cart'))
+    )
+    return text, keyboard
+
+
+def apply_cart_deltas(user_data: dict, menu_items: list, deltas: dict) -> int:
+    """
+    Add quantities to the cart in user_data
+
+    Negative quantities remove items; an item whose quantity drops to zero
+    or below leaves the cart.
+
+    Args:
+        user_data: The user's context.user_data (holds the cart)
+        menu_items: Current menu items
+        deltas: Quantity to add per menu item ID
+
+    Returns:
+        int: Number of items applied (items not on the menu cannot be added)
+    """
+    menu_dict = {item['id']: item for item in menu_items}
+
+    # Get or initialize cart
+    cart = user_data.get('cart', {})
+
+    applied = 0
+    for item_id, quantity in deltas.items():
+        if item_id in cart:
+            # Increment, decrement or remove item
+            cart[item_id]['quantity'] += quantity
+            if cart[item_id]['quantity'] <= 0:
+                del cart[item_id]
+        elif quantity <= 0 or item_id not in menu_dict:
+            continue
+        else:
+            item = menu_dict[item_id]
+            cart[item_id] = {
+                'name': item['name'],
+                'size': item['size'],
+                'price': item['price'],
+                'quantity': quantity
+            }
+        applied += 1
+
+    user_data['cart'] = cart
+    return applied
+
+
+def cart_to_order_items(cart: dict) -> list:
+    """Convert a cart into the items list stored on an order"""
+    return [
+        {
+            'menu_item_id': item_id,
+            'name': item_data['name'],
+            'size': item_data['size'],
+            'price': float(item_data['price']),
+            'quantity': item_data['quantity']
+        }
+        for item_id, item_data in cart.items()
+    ]
+
+
+def remember_last_cart(user_data: dict, cart: dict):
+    """Keep the quantities of a submitted cart for the "repeat last" button"""
+    user_data['last_cart'] = {item_id: item['quantity'] for item_id, item in cart.items()}
+
+
+def remember_created_order(user_data: dict, message, idempotency_key: str, order: dict):
+    """
+    Keep the order just created from a payment message, to answer repeated taps on it
+
+    Everything shown comes from the stored order: a repeated tap on the other
+    payment button returns the order created by the first tap, cash or card.
+    """
+    user_data['last_order'] = {
+        'message': (message.chat_id, message.message_id),
+        'idempotency_key': idempotency_key,
+        'order_number': order['order_number'],
+        'total_amount': order['total_amount'],
+        'payment_method': order['payment_method']
+    }
+
+
+def format_order_created(last_order: dict) -> str:
+    """Confirmation shown after paying for an order"""
+    return (
+        f"✅ *Order Created!*\n\n"
+        f"Order #{last_order['order_number']}\n"
+        f"Total: {format_currency(last_order['total_amount'])}\n"
+        f"Payment: {last_order['payment_method'].title()}\n\n"
+        f"Returning to dashboard..."
+    )
+
+
+def clear_order_screen(user_data: dict):
+    """
+    Forget the ordering screen (its message, page, search and quantity step)
+    once the user leaves it, so typed text no longer redraws that message
+    """
+    for key in ('cart_message', 'menu_page', 'menu_search', 'qty_step'):
+        user_data.pop(key, None)
+
+
+def clear_order_state(user_data: dict):
+    """Forget the cart and everything tied to the order being built"""
+    clear_order_screen(user_data)
+    for key in ('cart', 'cart_token'):
+        user_data.pop(key, None)
 
 
 async def show_sales_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show the active sales dashboard (helper function, no auth decorator needed)"""
+    clear_order_screen(context.user_data)
+
     # Get active session
-    session = db.get_active_session()
+    session = await db.run(db.get_active_session)
 
     if not session:
         if update.callback_query:
@@ -39,17 +224,13 @@ async def show_sales_dashboard(update: Update, context: ContextTypes.DEFAULT_TYP
         return
 
     # Get order count for session
-    order_count = db.get_order_count_by_session(session['id'])
+    order_count = await db.run(db.get_order_count_by_session, session['id'])
     total_sales = session.get('total_sales', 0)
     started_at = format_full_datetime(session.get('started_at'))
     started_by_id = session.get('started_by')
 
-    # Get user info for display name
-    user_info = db.get_user_by_telegram_id(started_by_id) if started_by_id else None
-    started_by_name = format_user_display_name(
-        started_by_id,
-        user_info.get('full_name') if user_info else None
-    )
+    # Resolve display name (from the cached user directory)
+    started_by_name = await db.run(db.resolve_user_name, started_by_id)
 
     text = (
         f"💰 *Sales Dashboard*\n\n"
@@ -61,15 +242,16 @@ async def show_sales_dashboard(update: Update, context: ContextTypes.DEFAULT_TYP
     )
 
     if update.callback_query:
-        await update.callback_query.edit_message_text(
+        await edit_message(
+            update.callback_query,
             text,
-            reply_markup=get_sales_dashboard_keyboard(total_sales),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
     else:
         await update.message.reply_text(
             text,
-            reply_markup=get_sales_dashboard_keyboard(total_sales),
+            reply_markup=get_sales_dashboard_keyboard(),
             parse_mode="Markdown"
         )
 
@@ -95,7 +277,7 @@ async def new_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
 
     # Get active session
-    session = db.get_active_session()
+    session = await db.run(db.get_active_session)
     if not session:
         await query.edit_message_text(
             "⚠️ No active session found.",
@@ -103,28 +285,30 @@ async def new_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return
 
-    # Initialize cart in context
+    # Initialize cart in context (a new order on this message ends repeated-tap answers for the last one)
+    clear_order_state(context.user_data)
+    context.user_data.pop('last_order', None)
     context.user_data['cart'] = {}
+    context.user_data['cart_token'] = uuid.uuid4().hex
     context.user_data['session_id'] = session['id']
 
+    # The ordering screen replaces this message; typed searches edit it in place
+    context.user_data['cart_message'] = (query.message.chat_id, query.message.message_id)
+
     # Get menu items
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
 
     if not menu_items:
         await query.edit_message_text(
             "❌ No menu items found.\n\n"
             "Please add menu items first.",
-            reply_markup=get_sales_dashboard_keyboard(session.get('total_sales', 0))
+            reply_markup=get_sales_dashboard_keyboard()
         )
         return
 
     # Show menu with cart
-    cart_display = format_cart(context.user_data['cart'])
-    await query.edit_message_text(
-        f"{cart_display}\n\n📋 *Select items to add to cart:*",
-        reply_markup=get_menu_items_keyboard(menu_items, context.user_data['cart']),
-        parse_mode="Markdown"
-    )
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await query.edit_message_text(text, reply_markup=keyboard, parse_mode="Markdown")
 
 
 @require_auth_callback
@@ -133,39 +317,27 @@ async def add_item_to_cart_callback(update: Update, context: ContextTypes.DEFAUL
     # Note: query.answer() is already called by @require_auth_callback middleware
     query = update.callback_query
 
-    # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    # Extract item ID (and optional quantity) from callback data
+    item_id = context.args[0]
+    quantity = context.args[1] if len(context.args) > 1 else 1
 
-    # Get menu items
-    menu_items = db.get_menu_items()
-    menu_dict = {item['id']: item for item in menu_items}
-
-    if item_id not in menu_dict:
-        # Note: Can't show alert since query was already answered by middleware
-        return
+    # Taps queued during a burst were coalesced into deltas by the middleware
+    deltas = pop_cart_deltas(context.user_data) or {item_id: quantity}
 
-    # Get or initialize cart
-    cart = context.user_data.get('cart', {})
-
-    # Add or increment item
-    if item_id in cart:
-        cart[item_id]['quantity'] += 1
-    else:
-        item = menu_dict[item_id]
-        cart[item_id] = {
-            'name': item['name'],
-            'size': item['size'],
-            'price': item['price'],
-            'quantity': 1
-        }
-
-    context.user_data['cart'] = cart
-
-    # Update display
-    cart_display = format_cart(cart)
-    await query.edit_message_text(
-        f"{cart_display}\n\n📋 *Select items to add to cart:*",
-        reply_markup=get_menu_items_keyboard(menu_items, cart),
+    # Get menu items
+    menu_items = await db.run(db.get_menu_items)
+
+    # Note: Unknown items are skipped; can't show alert since query was already answered by middleware
+    apply_cart_deltas(context.user_data, menu_items, deltas)
+
+    # Update display (debounced: rapid taps collapse into one edit)
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    get_edit_scheduler().schedule(
+        context.bot,
+        query.message.chat_id,
+        query.message.message_id,
+        text,
+        reply_markup=keyboard,
         parse_mode="Markdown"
     )
 
@@ -180,13 +352,97 @@ async def clear_cart_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     context.user_data['cart'] = {}
 
     # Get menu items
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
 
     # Update display
-    cart_display = format_cart(context.user_data['cart'])
-    await query.edit_message_text(
-        f"{cart_display}\n\n📋 *Select items to add to cart:*",
-        reply_markup=get_menu_items_keyboard(menu_items, context.user_data['cart']),
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await query.edit_message_text(text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+@require_auth_callback
+async def menu_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show another page of the ordering keyboard"""
+    # Note: query.answer() is already called by @require_auth_callback middleware
+    query = update.callback_query
+
+    context.user_data['menu_page'] = context.args[0]
+
+    menu_items = await db.run(db.get_menu_items)
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await edit_message(query, text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+@require_auth_callback
+async def set_qty_step_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Choose how many units one tap on an item adds (or removes)"""
+    # Note: query.answer() is already called by @require_auth_callback middleware
+    query = update.callback_query
+
+    step = context.args[0]
+    if step not in QTY_STEPS:
+        return
+
+    context.user_data['qty_step'] = step
+
+    menu_items = await db.run(db.get_menu_items)
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await edit_message(query, text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+@require_auth_callback
+async def repeat_last_order_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Replace the cart with the previous order's items (current menu prices)"""
+    # Note: query.answer() is already called by @require_auth_callback middleware
+    query = update.callback_query
+
+    last_cart = context.user_data.get('last_cart')
+    if not last_cart:
+        return
+
+    menu_items = await db.run(db.get_menu_items)
+    context.user_data['cart'] = {}
+    apply_cart_deltas(context.user_data, menu_items, last_cart)
+
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await edit_message(query, text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+@require_auth_callback
+async def clear_menu_search_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Clear the typed search and show the full menu again"""
+    # Note: query.answer() is already called by @require_auth_callback middleware
+    query = update.callback_query
+
+    context.user_data.pop('menu_search', None)
+    context.user_data['menu_page'] = 0
+
+    menu_items = await db.run(db.get_menu_items)
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await edit_message(query, text, reply_markup=keyboard, parse_mode="Markdown")
+
+
+async def search_menu_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Filter the ordering keyboard by typed text (helper function, called by the
+    text message router while an order is being built)
+    """
+    cart_message = context.user_data.get('cart_message')
+    if not cart_message:
+        return
+
+    context.user_data['menu_search'] = update.message.text.strip()[:MAX_MENU_SEARCH_LENGTH]
+    context.user_data['menu_page'] = 0
+
+    menu_items = await db.run(db.get_menu_items)
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+
+    chat_id, message_id = cart_message
+    get_edit_scheduler().schedule(
+        context.bot,
+        chat_id,
+        message_id,
+        text,
+        reply_markup=keyboard,
         parse_mode="Markdown"
     )
 
@@ -203,6 +459,9 @@ async def confirm_cart_callback(update: Update, context: ContextTypes.DEFAULT_TY
         # Note: Can't show alert since query was already answered
         return
 
+    # The payment screen replaces the ordering screen until payment is cancelled
+    context.user_data.pop('cart_message', None)
+
     # Show payment method selection
     cart_display = format_cart(cart)
     await query.edit_message_text(
@@ -219,56 +478,51 @@ async def payment_method_callback(update: Update, context: ContextTypes.DEFAULT_
     query = update.callback_query
 
     # Extract payment method
-    payment_method = query.data.split(':')[1]
+    payment_method = context.args[0]
 
     cart = context.user_data.get('cart', {})
     session_id = context.user_data.get('session_id')
 
+    # A repeated tap on the payment buttons after the order was created: the
+    # cart is already cleared, so show the same order again
+    last_order = context.user_data.get('last_order')
+    if not cart and last_order and last_order['message'] == (query.message.chat_id, query.message.message_id):
+        await edit_message(query, format_order_created(last_order), parse_mode="Markdown")
+        # Replaces the dashboard job scheduled by the first tap, so it is shown once
+        run_later(2, show_sales_dashboard, update, context, query=query)
+        return
+
     if not cart or not session_id:
         await query.edit_message_text(
             "❌ Something went wrong. Please try again.",
-            reply_markup=get_sales_dashboard_keyboard(0)
+            reply_markup=get_sales_dashboard_keyboard()
         )
         return
 
     # Convert cart to items list
-    items = [
-        {
-            'menu_item_id': item_id,
-            'name': item_data['name'],
-            'size': item_data['size'],
-            'price': float(item_data['price']),
-            'quantity': item_data['quantity']
-        }
-        for item_id, item_data in cart.items()
-    ]
+    items = cart_to_order_items(cart)
 
-    # Create order
+    # Create order (idempotent: a repeated tap returns the order already created)
+    cart_token = context.user_data.get('cart_token') or f"{query.message.chat_id}:{query.message.message_id}"
+    idempotency_key = build_order_idempotency_key(session_id, cart_token, cart)
     telegram_id = update.effective_user.id
-    order = db.create_order(session_id, items, payment_method, telegram_id)
+    order = await db.run(db.create_order, session_id, items, payment_method, telegram_id, idempotency_key=idempotency_key)
 
     if order:
-        # Clear cart
-        context.user_data.pop('cart', None)
+        # Remember the cart for "repeat last order" and the order for repeated taps, then clear the cart
+        remember_last_cart(context.user_data, cart)
+        remember_created_order(context.user_data, query.message, idempotency_key, order)
+        clear_order_state(context.user_data)
 
         # Show success message
-        await query.edit_message_text(
-            f"✅ *Order Created!*\n\n"
-            f"Order #{order['order_number']}\n"
-            f"Total: {format_currency(order['total_amount'])}\n"
-            f"Payment: {payment_method.title()}\n\n"
-            f"Returning to dashboard...",
-            parse_mode="Markdown"
-        )
+        await edit_message(query, format_order_created(context.user_data['last_order']), parse_mode="Markdown")
 
-        # Wait a moment then show dashboard
-        import asyncio
-        await asyncio.sleep(2)
-        await show_sales_dashboard(update, context)
+        # Show dashboard after a moment (scheduled, so the handler returns now)
+        run_later(2, show_sales_dashboard, update, context, query=query)
     else:
         await query.edit_message_text(
             "❌ Failed to create order. Please try again.",
-            reply_markup=get_sales_dashboard_keyboard(0)
+            reply_markup=get_sales_dashboard_keyboard()
         )
 
 
@@ -279,7 +533,7 @@ async def cancel_order_callback(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
 
     # Clear cart
-    context.user_data.pop('cart', None)
+    clear_order_state(context.user_data)
 
     # Return to dashboard
     await show_sales_dashboard(update, context)
@@ -291,17 +545,15 @@ async def cancel_payment_callback(update: Update, context: ContextTypes.DEFAULT_
     # Note: query.answer() is already called by @require_auth_callback middleware
     query = update.callback_query
 
-    # Get menu items and cart
-    menu_items = db.get_menu_items()
-    cart = context.user_data.get('cart', {})
+    # Back on the ordering screen; typed searches edit it again
+    context.user_data['cart_message'] = (query.message.chat_id, query.message.message_id)
+
+    # Get menu items
+    menu_items = await db.run(db.get_menu_items)
 
     # Show cart again
-    cart_display = format_cart(cart)
-    await query.edit_message_text(
-        f"{cart_display}\n\n📋 *Select items to add to cart:*",
-        reply_markup=get_menu_items_keyboard(menu_items, cart),
-        parse_mode="Markdown"
-    )
+    text, keyboard = await build_cart_screen(menu_items, context.user_data)
+    await edit_message(query, text, reply_markup=keyboard, parse_mode="Markdown")
 
 
 @require_auth_callback
@@ -311,7 +563,7 @@ async def end_session_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
 
     # Get active session
-    session = db.get_active_session()
+    session = await db.run(db.get_active_session)
     if not session:
         await query.edit_message_text(
             "⚠️ No active session found.",
@@ -338,7 +590,7 @@ async def confirm_end_session_callback(update: Update, context: ContextTypes.DEF
     query = update.callback_query
 
     # Get active session
-    session = db.get_active_session()
+    session = await db.run(db.get_active_session)
     if not session:
         await query.edit_message_text(
             "⚠️ No active session found.",
@@ -349,8 +601,10 @@ async def confirm_end_session_callback(update: Update, context: ContextTypes.DEF
     session_id = session['id']
 
     # Get session statistics
-    order_count = db.get_order_count_by_session(session_id)
-    orders = db.get_orders_by_session(session_id, limit=1000)
+    order_count, orders = await db.gather(
+        partial(db.get_order_count_by_session, session_id),
+        partial(db.get_orders_by_session, session_id, limit=1000)
+    )
 
     # Calculate items sold
     items_sold = {}
@@ -360,7 +614,7 @@ async def confirm_end_session_callback(update: Update, context: ContextTypes.DEF
             items_sold[item_key] = items_sold.get(item_key, 0) + item['quantity']
 
     # End session
-    success = db.end_session(session_id)
+    success = await db.run(db.end_session, session_id)
 
     if success:
         summary = format_session_summary(session, order_count, items_sold)
@@ -372,7 +626,7 @@ async def confirm_end_session_callback(update: Update, context: ContextTypes.DEF
     else:
         await query.edit_message_text(
             "❌ Failed to end session. Please try again.",
-            reply_markup=get_sales_dashboard_keyboard(session.get('total_sales', 0))
+            reply_markup=get_sales_dashboard_keyboard()
         )
 
 
@@ -381,3 +635,63 @@ async def back_to_dashboard_callback(update: Update, context: ContextTypes.DEFAU
     """Return to sales dashboard"""
     # Note: query.answer() is already called by @require_auth_callback middleware
     await show_sales_dashboard(update, context)
+
+
+@require_auth
+async def quick_order_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Create an order from one message (/o 2 latte L, 1 mocha cash)"""
+    message = update.message
+
+    if not context.args:
+        await message.reply_text(QUICK_ORDER_USAGE, parse_mode="Markdown")
+        return
+
+    # Get active session
+    session = await db.run(db.get_active_session)
+    if not session:
+        await message.reply_text(
+            "⚠️ No active session found.\n\n"
+            "Please start a new session from the control panel.",
+            reply_markup=get_control_panel_keyboard()
+        )
+        return
+
+    menu_items = await db.run(db.get_menu_items)
+    parsed = parse_quick_order(" ".join(context.args), menu_items)
+
+    if parsed['errors']:
+        # Errors repeat what the user typed; escape it so the Markdown reply still parses
+        errors = "\n".join(f"• {escape_markdown(error)}" for error in parsed['errors'])
+        await message.reply_text(f"❌ Order not created:\n{errors}\n\n{QUICK_ORDER_USAGE}", parse_mode="Markdown")
+        return
+
+    order_data = {}
+    apply_cart_deltas(order_data, menu_items, parsed['quantities'])
+    cart = order_data['cart']
+    payment_method = parsed['payment_method']
+
+    # Create order (idempotent: a redelivered message returns the order already created)
+    idempotency_key = build_order_idempotency_key(session['id'], f"{message.chat_id}:{message.message_id}", cart)
+    order = await db.run(db.create_order,
+        session['id'],
+        cart_to_order_items(cart),
+        payment_method,
+        update.effective_user.id,
+        idempotency_key=idempotency_key
+    )
+
+    if not order:
+        await message.reply_text("❌ Failed to create order. Please try again.")
+        return
+
+    remember_last_cart(context.user_data, cart)
+
+    await message.reply_text(
+        f"✅ *Order Created!*\n\n"
+        f"Order #{order['order_number']}\n"
+        f"{format_order_items(order.get('items') or cart_to_order_items(cart))}\n\n"
+        f"Total: {format_currency(order['total_amount'])}\n"
+        f"Payment: {payment_method.title()}",
+        reply_markup=get_sales_dashboard_keyboard(),
+        parse_mode="Markdown"
+    )
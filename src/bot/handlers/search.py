@@ -0,0 +1,88 @@
+"""
+Inline menu search handlers (@bot <text>) and adding the chosen item to the cart
+"""
+import logging
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import ContextTypes
+from src.bot.middleware import require_auth
+from src.bot.user_queue import user_turn
+from src.bot.edits import get_edit_scheduler
+from src.bot.callback_data import encode_id, decode_id
+from src.database.models import get_database
+from src.utils.formatters import format_currency
+from src.utils.search import get_menu_index
+from src.bot.handlers.sales import build_cart_screen, apply_cart_deltas
+
+db = get_database()
+logger = logging.getLogger(__name__)
+
+
+async def inline_menu_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer an inline query with matching menu items"""
+    inline_query = update.inline_query
+
+    # Inline queries have no chat to reply in, so authorization is checked
+    # here and unauthorized users simply get no results. Every keystroke is
+    # a query, so check against the cached user directory (the /add command
+    # the chosen result sends is still checked by require_auth)
+    if update.effective_user.id not in await db.run(db.get_user_directory):
+        await inline_query.answer([], cache_time=0, is_personal=True)
+        return
+
+    menu_items = await db.run(db.get_menu_items)
+    matches = get_menu_index(menu_items).search(inline_query.query)
+
+    results = [
+        InlineQueryResultArticle(
+            id=encode_id(item['id']),
+            title=f"{item['name']} ({item['size']})",
+            description=format_currency(item['price']),
+            input_message_content=InputTextMessageContent(f"/add {encode_id(item['id'])}")
+        )
+        for item in matches
+    ]
+
+    await inline_query.answer(results, cache_time=0, is_personal=True)
+
+
+@require_auth
+async def add_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Add a menu item to the open order (/add <item>, sent by choosing an inline search result)"""
+    try:
+        item_id = decode_id(context.args[0])
+    except (IndexError, ValueError):
+        await update.message.reply_text("❌ Unknown menu item. Use 🔍 Search on the order screen.")
+        return
+
+    # Same queue as the cart buttons, so the cart is never updated concurrently
+    async with user_turn(update.effective_user.id):
+        # Read in the user's turn: a tap queued before this command may have left the ordering screen
+        cart_message = context.user_data.get('cart_message')
+        if not cart_message:
+            await update.message.reply_text(
+                "ℹ️ No order in progress.\n\n"
+                "Tap ➕ New Order on the sales dashboard first."
+            )
+            return
+
+        menu_items = await db.run(db.get_menu_items)
+        if not apply_cart_deltas(context.user_data, menu_items, {item_id: 1}):
+            await update.message.reply_text("❌ This item is no longer on the menu.")
+            return
+
+        text, keyboard = await build_cart_screen(menu_items, context.user_data)
+        chat_id, message_id = cart_message
+        get_edit_scheduler().schedule(
+            context.bot,
+            chat_id,
+            message_id,
+            text,
+            reply_markup=keyboard,
+            parse_mode="Markdown"
+        )
+
+    # The cart message shows the change; remove the /add message to keep the chat tidy
+    try:
+        await update.message.delete()
+    except Exception as e:
+        logger.debug(f"Could not delete /add message: {e}")
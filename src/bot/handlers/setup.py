@@ -5,7 +5,8 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.bot.middleware import require_auth
-from src.database.models import Database
+from src.bot.conversation import enter_flow
+from src.database.models import get_database
 from src.bot.keyboards import (
     get_menu_management_keyboard,
     get_back_button,
@@ -18,14 +19,14 @@ from src.bot.keyboards import (
 )
 from src.utils.formatters import format_menu_list
 
-db = Database()
+db = get_database()
 logger = logging.getLogger(__name__)
 
 
 @require_auth
 async def manage_menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show menu management interface"""
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
 
     if not menu_items:
         text = "📋 *Menu Management*\n\nNo menu items found. Let's add your first item!"
@@ -46,6 +47,7 @@ async def start_add_menu_item(update: Update, context: ContextTypes.DEFAULT_TYPE
     logger.info(f"start_add_menu_item called by user {update.effective_user.id}")
 
     # Set state to expect menu name
+    enter_flow(context.user_data, 'menu')
     context.user_data['menu_state'] = 'MENU_NAME'
     context.user_data['new_menu_item'] = {}
 
@@ -107,7 +109,7 @@ async def handle_has_sizes_callback(update: Update, context: ContextTypes.DEFAUL
     await query.answer()
 
     # Extract response from callback data
-    response = query.data.split(':')[1]  # "yes" or "no"
+    response = context.args[0]  # "yes" or "no"
     item_name = context.user_data['new_menu_item']['name']
 
     if response == 'yes':
@@ -208,7 +210,7 @@ async def handle_add_more_sizes_callback(update: Update, context: ContextTypes.D
     await query.answer()
 
     # Extract response from callback data
-    response = query.data.split(':')[1]  # "yes" or "no"
+    response = context.args[0]  # "yes" or "no"
 
     if response == 'yes':
         # Add another size
@@ -262,7 +264,7 @@ async def save_menu_items(update: Update, context: ContextTypes.DEFAULT_TYPE, qu
         # Save each size as a separate menu item
         sizes = item_data.get('sizes', [])
         for size_data in sizes:
-            result = db.add_menu_item(name, size_data['size'], size_data['price'])
+            result = await db.run(db.add_menu_item, name, size_data['size'], size_data['price'])
             if result:
                 success_count += 1
             else:
@@ -287,7 +289,7 @@ async def save_menu_items(update: Update, context: ContextTypes.DEFAULT_TYPE, qu
         # Single size item
         size = item_data.get('size', 'Standard')
         price = item_data.get('price')
-        result = db.add_menu_item(name, size, price)
+        result = await db.run(db.add_menu_item, name, size, price)
 
         if result:
             await send_func(
@@ -337,10 +339,10 @@ async def edit_menu_item_callback(update: Update, context: ContextTypes.DEFAULT_
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Get item details from database
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -368,14 +370,15 @@ async def edit_name_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Store item ID in context
     context.user_data['editing_item_id'] = item_id
+    enter_flow(context.user_data, 'menu')
     context.user_data['menu_state'] = 'EDIT_NAME'
 
     # Get item details
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -403,14 +406,15 @@ async def edit_size_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Store item ID in context
     context.user_data['editing_item_id'] = item_id
+    enter_flow(context.user_data, 'menu')
     context.user_data['menu_state'] = 'EDIT_SIZE'
 
     # Get item details
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -438,14 +442,15 @@ async def edit_price_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Store item ID in context
     context.user_data['editing_item_id'] = item_id
+    enter_flow(context.user_data, 'menu')
     context.user_data['menu_state'] = 'EDIT_PRICE'
 
     # Get item details
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -481,11 +486,11 @@ async def receive_edited_name(update: Update, context: ContextTypes.DEFAULT_TYPE
     item_id = context.user_data.get('editing_item_id')
 
     # Get old item details for comparison
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     old_item = next((i for i in menu_items if i['id'] == item_id), None)
 
     # Update name in database
-    success = db.update_menu_item_name(item_id, new_name)
+    success = await db.run(db.update_menu_item_name, item_id, new_name)
 
     if success:
         await update.message.reply_text(
@@ -523,11 +528,11 @@ async def receive_edited_size(update: Update, context: ContextTypes.DEFAULT_TYPE
     item_id = context.user_data.get('editing_item_id')
 
     # Get old item details for comparison
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     old_item = next((i for i in menu_items if i['id'] == item_id), None)
 
     # Update size in database
-    success = db.update_menu_item_size(item_id, new_size)
+    success = await db.run(db.update_menu_item_size, item_id, new_size)
 
     if success:
         await update.message.reply_text(
@@ -569,11 +574,11 @@ async def receive_edited_price(update: Update, context: ContextTypes.DEFAULT_TYP
     item_id = context.user_data.get('editing_item_id')
 
     # Get old item details for comparison
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     old_item = next((i for i in menu_items if i['id'] == item_id), None)
 
     # Update price in database
-    success = db.update_menu_item_price(item_id, price)
+    success = await db.run(db.update_menu_item_price, item_id, price)
 
     if success:
         await update.message.reply_text(
@@ -603,10 +608,10 @@ async def confirm_delete_menu_item_callback(update: Update, context: ContextType
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Get item details
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -635,10 +640,10 @@ async def delete_menu_item_callback(update: Update, context: ContextTypes.DEFAUL
     await query.answer()
 
     # Extract item ID from callback data
-    item_id = query.data.split(':')[1]
+    item_id = context.args[0]
 
     # Get item details before deletion
-    menu_items = db.get_menu_items()
+    menu_items = await db.run(db.get_menu_items)
     item = next((i for i in menu_items if i['id'] == item_id), None)
 
     if not item:
@@ -649,7 +654,7 @@ async def delete_menu_item_callback(update: Update, context: ContextTypes.DEFAUL
         return
 
     # Delete the item
-    success = db.delete_menu_item(item_id)
+    success = await db.run(db.delete_menu_item, item_id)
 
     if success:
         await query.edit_message_text(
@@ -672,7 +677,6 @@ async def delete_menu_item_callback(update: Update, context: ContextTypes.DEFAUL
         )
 
 
-@require_auth
 async def handle_menu_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Route text messages based on menu_state"""
     menu_state = context.user_data.get('menu_state')
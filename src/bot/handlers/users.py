@@ -5,8 +5,10 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.error import TelegramError
-from src.bot.middleware import require_auth, require_auth_callback
-from src.database.models import Database
+from src.bot.middleware import require_auth_callback
+from src.bot.jobs import run_later
+from src.bot.conversation import enter_flow
+from src.database.models import get_database
 from src.bot.keyboards import (
     get_user_management_keyboard,
     get_add_user_keyboard,
@@ -16,10 +18,21 @@ from src.bot.keyboards import (
 )
 from src.utils.formatters import format_user_display_name
 
-db = Database()
+db = get_database()
 logger = logging.getLogger(__name__)
 
 
+async def show_user_list(query):
+    """Show the authorized user list on the query's message (helper function, no auth decorator needed)"""
+    users = await db.run(db.get_all_authorized_users)
+    await query.edit_message_text(
+        f"👥 *Manage Users* ({len(users)} total)\n\n"
+        "Select a user to remove, or add a new user:",
+        reply_markup=get_user_management_keyboard(users),
+        parse_mode="Markdown"
+    )
+
+
 @require_auth_callback
 async def manage_users_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show list of authorized users"""
@@ -27,7 +40,7 @@ async def manage_users_callback(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
 
     # Get all authorized users
-    users = db.get_all_authorized_users()
+    users = await db.run(db.get_all_authorized_users)
 
     if not users:
         await query.edit_message_text(
@@ -58,6 +71,7 @@ async def add_user_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
 
     # Set state
+    enter_flow(context.user_data, 'users')
     context.user_data['user_mgmt_state'] = 'AWAITING_TELEGRAM_ID'
 
     await query.edit_message_text(
@@ -80,7 +94,7 @@ async def cancel_user_mgmt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data.pop('pending_user_data', None)
 
     # Get all authorized users
-    users = db.get_all_authorized_users()
+    users = await db.run(db.get_all_authorized_users)
 
     if not users:
         await query.edit_message_text(
@@ -104,7 +118,6 @@ async def cancel_user_mgmt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
-@require_auth
 async def handle_user_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle text messages during user management flow"""
     state = context.user_data.get('user_mgmt_state')
@@ -132,7 +145,7 @@ async def receive_telegram_id(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     # Check if user already exists
-    existing_user = db.get_user_by_telegram_id(telegram_id)
+    existing_user = await db.run(db.get_user_by_telegram_id, telegram_id)
     if existing_user:
         await update.message.reply_text(
             f"⚠️ This user is already authorized!\n\n"
@@ -208,7 +221,7 @@ async def confirm_add_user_callback(update: Update, context: ContextTypes.DEFAUL
     if not user_data:
         await query.edit_message_text(
             "❌ Error: User data not found. Please try again.",
-            reply_markup=get_user_management_keyboard(db.get_all_authorized_users())
+            reply_markup=get_user_management_keyboard(await db.run(db.get_all_authorized_users))
         )
         return
 
@@ -217,7 +230,7 @@ async def confirm_add_user_callback(update: Update, context: ContextTypes.DEFAUL
     full_name = user_data.get('full_name')
 
     # Add user to database
-    success = db.add_authorized_user(telegram_id, username, full_name)
+    success = await db.run(db.add_authorized_user, telegram_id, username, full_name)
 
     # Clear pending data
     context.user_data.pop('pending_user_data', None)
@@ -231,20 +244,12 @@ async def confirm_add_user_callback(update: Update, context: ContextTypes.DEFAUL
             parse_mode="Markdown"
         )
 
-        # Wait a moment then show user list
-        import asyncio
-        await asyncio.sleep(1.5)
-        users = db.get_all_authorized_users()
-        await query.edit_message_text(
-            f"👥 *Manage Users* ({len(users)} total)\n\n"
-            "Select a user to remove, or add a new user:",
-            reply_markup=get_user_management_keyboard(users),
-            parse_mode="Markdown"
-        )
+        # Show user list after a moment (scheduled, so the handler returns now)
+        run_later(1.5, show_user_list, query, query=query)
     else:
         await query.edit_message_text(
             "❌ Failed to authorize user. Please try again.",
-            reply_markup=get_user_management_keyboard(db.get_all_authorized_users())
+            reply_markup=get_user_management_keyboard(await db.run(db.get_all_authorized_users))
         )
 
 
@@ -255,14 +260,14 @@ async def delete_user_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
 
     # Extract telegram ID from callback data
-    telegram_id = int(query.data.split(':')[1])
+    telegram_id = context.args[0]
 
     # Get user info
-    user = db.get_user_by_telegram_id(telegram_id)
+    user = await db.run(db.get_user_by_telegram_id, telegram_id)
     if not user:
         await query.edit_message_text(
             "❌ User not found.",
-            reply_markup=get_user_management_keyboard(db.get_all_authorized_users())
+            reply_markup=get_user_management_keyboard(await db.run(db.get_all_authorized_users))
         )
         return
 
@@ -286,21 +291,21 @@ async def confirm_delete_user_callback(update: Update, context: ContextTypes.DEF
     query = update.callback_query
 
     # Extract telegram ID from callback data
-    telegram_id = int(query.data.split(':')[1])
+    telegram_id = context.args[0]
 
     # Get user info before deletion
-    user = db.get_user_by_telegram_id(telegram_id)
+    user = await db.run(db.get_user_by_telegram_id, telegram_id)
     if not user:
         await query.edit_message_text(
             "❌ User not found.",
-            reply_markup=get_user_management_keyboard(db.get_all_authorized_users())
+            reply_markup=get_user_management_keyboard(await db.run(db.get_all_authorized_users))
         )
         return
 
     display_name = format_user_display_name(telegram_id, user.get('full_name'))
 
     # Delete user
-    success = db.delete_authorized_user(telegram_id)
+    success = await db.run(db.delete_authorized_user, telegram_id)
 
     if success:
         await query.edit_message_text(
@@ -310,18 +315,10 @@ async def confirm_delete_user_callback(update: Update, context: ContextTypes.DEF
             parse_mode="Markdown"
         )
 
-        # Wait a moment then show user list
-        import asyncio
-        await asyncio.sleep(1.5)
-        users = db.get_all_authorized_users()
-        await query.edit_message_text(
-            f"👥 *Manage Users* ({len(users)} total)\n\n"
-            "Select a user to remove, or add a new user:",
-            reply_markup=get_user_management_keyboard(users),
-            parse_mode="Markdown"
-        )
+        # Show user list after a moment (scheduled, so the handler returns now)
+        run_later(1.5, show_user_list, query, query=query)
     else:
         await query.edit_message_text(
             "❌ Failed to remove user. Please try again.",
-            reply_markup=get_user_management_keyboard(db.get_all_authorized_users())
+            reply_markup=get_user_management_keyboard(await db.run(db.get_all_authorized_users))
         )
@@ -0,0 +1,171 @@
+"""
+Metrics and tracing hooks for the bot: Bot API requests, update processing
+and handler latency, plus scrape-time gauges for caches and queues
+"""
+import os
+import inspect
+import logging
+from functools import wraps
+from typing import Callable, Dict, Optional
+from telegram.ext import Application
+from telegram.request import HTTPXRequest
+from src.utils.metrics import (
+    Counter,
+    Gauge,
+    HANDLER_SECONDS,
+    BOT_API_SECONDS,
+    BOT_API_REQUESTS,
+    BOT_API_RETRY_AFTER,
+    UPDATE_SECONDS,
+    DB_ROUND_TRIPS,
+    UPDATES_IN_FLIGHT
+)
+from src.utils.tracing import Span, get_tracer, span
+from src.database.round_trips import RoundTrips, track_round_trips
+from src.bot.callback_data import SEPARATOR
+from src.database.models import menu_cache, active_session_cache, user_directory_cache
+from src.bot.edits import get_edit_scheduler, get_render_cache
+from src.bot.jobs import pending_jobs
+from src.bot.user_queue import queued_handlers
+
+logger = logging.getLogger(__name__)
+
+# Updates that make more Supabase round trips than this are logged with their calls
+DB_ROUND_TRIPS_WARN = int(os.getenv("DB_ROUND_TRIPS_WARN", 8))
+
+# Update fields checked in order to label an update by its type
+UPDATE_TYPES = ("callback_query", "message", "inline_query", "chosen_inline_result", "edited_message")
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that counts and times every Bot API call, including 429 responses"""
+
+    async def do_request(self, url: str, method: str, request_data=None, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+
+        with BOT_API_SECONDS.time(api_method), span(f"bot_api.{api_method}"):
+            try:
+                code, payload = await super().do_request(url, method, request_data, *args, **kwargs)
+            except Exception:
+                BOT_API_REQUESTS.inc(api_method, "error")
+                raise
+
+        BOT_API_REQUESTS.inc(api_method, code)
+        if code == 429:
+            BOT_API_RETRY_AFTER.inc(api_method)
+
+        return code, payload
+
+
+class InstrumentedApplication(Application):
+    """
+    Application that traces every update, counts its Supabase round trips,
+    tracks in-flight updates and times every handler callback
+    """
+
+    async def process_update(self, update: object) -> None:
+        kind = update_type(update)
+        attributes = update_attributes(update)
+        with UPDATES_IN_FLIGHT.track_inprogress(), UPDATE_SECONDS.time(kind), \
+                get_tracer().trace("update", type=kind, **attributes) as root, track_round_trips() as trips:
+            try:
+                await super().process_update(update)
+            finally:
+                record_round_trips(kind, attributes, trips, root)
+
+    def add_handler(self, handler, group: int = 0) -> None:
+        # Plain handler functions are timed here; the callback router times each action itself
+        callback = getattr(handler, "callback", None)
+        if inspect.isfunction(callback):
+            handler.callback = timed_handler(callback)
+        super().add_handler(handler, group)
+
+
+def update_type(update: object) -> str:
+    """Get the kind of a Telegram update (e.g., "callback_query", "message")"""
+    for field in UPDATE_TYPES:
+        if getattr(update, field, None) is not None:
+            return field
+    return "other"
+
+
+def record_round_trips(kind: str, attributes: Dict, trips: RoundTrips, root: Optional[Span]):
+    """Report the round trips of a finished update to metrics, its trace and (over budget) the log"""
+    DB_ROUND_TRIPS.observe(trips.count, kind)
+
+    if root is not None:
+        root.set(db_round_trips=trips.count)
+
+    if trips.count > DB_ROUND_TRIPS_WARN:
+        logger.warning(
+            f"Update {attributes.get('update_id')} ({attributes.get('action', kind)}) made "
+            f"{trips.count} DB round trips: {', '.join(trips.calls)}"
+        )
+
+
+def update_attributes(update: object) -> Dict:
+    """
+    Get trace attributes identifying an update
+
+    Only the callback action and command name are recorded, never message text.
+    """
+    attributes = {"update_id": getattr(update, "update_id", None)}
+
+    user = getattr(update, "effective_user", None)
+    if user is not None:
+        attributes["user_id"] = user.id
+
+    query = getattr(update, "callback_query", None)
+    message = getattr(update, "message", None)
+    if query is not None:
+        attributes["action"] = (query.data or "").partition(SEPARATOR)[0]
+    elif message is not None and (message.text or "").startswith("/"):
+        attributes["action"] = message.text.split(maxsplit=1)[0]
+
+    return attributes
+
+
+def timed_handler(func: Callable) -> Callable:
+    """Wrap an async handler so its duration is observed (and traced) under its function name"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with HANDLER_SECONDS.time(func.__name__), span(f"handler.{func.__name__}"):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def _cache_stats() -> Dict[str, Dict[str, int]]:
+    render_stats = get_render_cache().stats()
+    return {
+        "menu": menu_cache.stats(),
+        "active_session": active_session_cache.stats(),
+        "user_directory": user_directory_cache.stats(),
+        "render": {"hits": render_stats["skipped"], "misses": render_stats["sent"]}
+    }
+
+
+def _cache_counts(field: str) -> Callable[[], Dict]:
+    return lambda: {(cache,): stats[field] for cache, stats in _cache_stats().items()}
+
+
+def _cache_hit_ratios() -> Dict:
+    return {
+        (cache,): stats["hits"] / (stats["hits"] + stats["misses"])
+        for cache, stats in _cache_stats().items()
+        if stats["hits"] + stats["misses"]
+    }
+
+
+CACHE_HITS = Counter("cache_hits_total", "Cache lookups answered from the cache, by cache", ["cache"],
+                     sampler=_cache_counts("hits"))
+CACHE_MISSES = Counter("cache_misses_total", "Cache lookups that had to load or send, by cache", ["cache"],
+                       sampler=_cache_counts("misses"))
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Share of cache lookups answered from the cache since start, by cache",
+                        ["cache"], sampler=_cache_hit_ratios)
+
+QUEUED_HANDLERS = Gauge("queued_handlers", "Handlers waiting for an earlier handler of the same user to finish",
+                        sampler=lambda: {(): queued_handlers()})
+PENDING_EDITS = Gauge("pending_edits", "Debounced message edits waiting to be sent",
+                      sampler=lambda: {(): get_edit_scheduler().stats()["pending"]})
+SCHEDULED_JOBS = Gauge("scheduled_jobs", "Delayed follow-up jobs that have not run yet",
+                       sampler=lambda: {(): pending_jobs()})
@@ -0,0 +1,98 @@
+"""
+Lightweight scheduling of delayed follow-up work (e.g., "returning to dashboard...")
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Set, Tuple
+from src.bot.user_queue import user_turn
+
+logger = logging.getLogger(__name__)
+
+# Strong references so scheduled tasks are not garbage collected while sleeping
+_tasks: Set[asyncio.Task] = set()
+
+# Jobs that redraw a message, by (chat_id, message_id), until they start running
+_screen_jobs: Dict[Tuple[int, int], asyncio.Task] = {}
+
+
+def run_later(delay: float, callback: Callable[..., Awaitable], *args, query=None) -> asyncio.Task:
+    """
+    Run a coroutine function after a delay without holding up the caller
+
+    Handlers use this for screen transitions that should happen a moment
+    after a confirmation, so the handler (and the per-user queue) is released
+    immediately instead of sleeping.
+
+    With query, the job redraws that callback query's message, so it must
+    never overwrite a newer screen:
+        - it replaces any job already scheduled for the same message
+        - it is cancelled by the user's next tap or command (cancel_jobs(),
+          called by the auth middleware) if it has not started yet
+        - it runs in the user's turn, after any handler already running for them
+
+    Args:
+        delay: Seconds to wait before running the callback
+        callback: Coroutine function to run
+        *args: Arguments passed to the callback
+        query: Callback query whose message the callback redraws
+
+    Returns:
+        asyncio.Task: The scheduled task
+    """
+    key = (query.message.chat_id, query.message.message_id) if query is not None and query.message else None
+
+    async def call():
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.error(f"Error in scheduled {getattr(callback, '__name__', callback)}: {e}", exc_info=True)
+
+    async def run():
+        await asyncio.sleep(delay)
+        if key is None:
+            await call()
+            return
+
+        async with user_turn(query.from_user.id):
+            # From here on the job is running and is no longer cancelled by new taps
+            _forget_screen_job(key, task)
+            await call()
+
+    task = asyncio.get_running_loop().create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+    if key is not None:
+        previous = _screen_jobs.get(key)
+        if previous is not None:
+            previous.cancel()
+        _screen_jobs[key] = task
+        task.add_done_callback(lambda done: _forget_screen_job(key, done))
+
+    return task
+
+
+def _forget_screen_job(key: Tuple[int, int], task: asyncio.Task):
+    if _screen_jobs.get(key) is task:
+        del _screen_jobs[key]
+
+
+def cancel_jobs(chat_id: int) -> int:
+    """
+    Cancel the screen jobs of a chat that have not started yet
+
+    Called before handling a user's tap or command, so a delayed "back to
+    the dashboard" cannot overwrite what that tap shows.
+
+    Returns:
+        int: Number of jobs cancelled
+    """
+    keys = [key for key in _screen_jobs if key[0] == chat_id]
+    for key in keys:
+        _screen_jobs.pop(key).cancel()
+    return len(keys)
+
+
+def pending_jobs() -> int:
+    """Get the number of scheduled jobs that have not finished yet"""
+    return len(_tasks)
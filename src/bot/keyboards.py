@@ -1,15 +1,40 @@
 """
 Inline keyboard layouts for the bot
+
+Keyboards without arguments are built once and shared (InlineKeyboardMarkup
+is immutable); the paged ordering grid is cached per menu.
 """
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
+from src.bot.callback_data import build, encode_id
+from src.utils.search import filter_menu_items, menu_signature
+
+# Distinct menus (or search results) whose paged ordering layout is kept
+MENU_LAYOUT_CACHE_SIZE = 32
+
+# Telegram limits: buttons per row, and item buttons per ordering page (well
+# under the 100 buttons per keyboard, leaving room for navigation and controls)
+MAX_ROW_BUTTONS = 8
+MENU_PAGE_BUTTONS = 48
+
+# Quantity steps offered on the ordering keyboard (-1 removes one)
+QTY_STEPS = (1, 2, 5, 10, -1)
+
+# Most ordered items shown in the quick-add row of the ordering keyboard
+QUICK_ADD_ITEMS = 4
 
 
 def get_control_panel_keyboard(active_session=None) -> InlineKeyboardMarkup:
     """Get the main control panel keyboard"""
+    return _control_panel_keyboard(bool(active_session))
+
+
+@lru_cache(maxsize=None)
+def _control_panel_keyboard(has_active_session: bool) -> InlineKeyboardMarkup:
     keyboard = []
 
-    if active_session:
+    if has_active_session:
         # Show "Join Session" button if there's an active session
         keyboard.append([InlineKeyboardButton("📱 Join Active Session", callback_data="join_session")])
     else:
@@ -26,13 +51,9 @@ def get_control_panel_keyboard(active_session=None) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_sales_dashboard_keyboard(total_sales: float) -> InlineKeyboardMarkup:
-    """
-    Get the active sales dashboard keyboard
-
-    Args:
-        total_sales: Current session total sales
-    """
+@lru_cache(maxsize=None)
+def get_sales_dashboard_keyboard() -> InlineKeyboardMarkup:
+    """Get the active sales dashboard keyboard (the same buttons every time, built once)"""
     keyboard = [
         [
             InlineKeyboardButton("🔄 Refresh", callback_data="refresh_dashboard"),
@@ -44,53 +65,173 @@ def get_sales_dashboard_keyboard(total_sales: float) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_menu_items_keyboard(menu_items: List[Dict], cart: Dict = None) -> InlineKeyboardMarkup:
+@lru_cache(maxsize=MENU_LAYOUT_CACHE_SIZE)
+def _menu_pages(signature: Tuple, step: int = 1) -> Tuple:
+    """
+    Paged ordering layout for a menu and quantity step, without quantity badges
+
+    Items are grouped into one row per name (split if a name has more sizes
+    than fit in a row) and rows are packed into pages of at most
+    MENU_PAGE_BUTTONS buttons, so a page never exceeds Telegram's limits.
+
+    Returns:
+        Tuple: Pages of rows; a row is (name button, ((item_id, label, button), ...))
+    """
+    # Group items by name
+    items_by_name = {}
+    for item_id, name, size, price in signature:
+        items_by_name.setdefault(name, []).append((item_id, size, price))
+
+    rows = []
+    for item_name, variants in items_by_name.items():
+        # Item name button (non-clickable, just for display)
+        name_button = InlineKeyboardButton(f"📦 {item_name}", callback_data="noop")
+
+        # Size buttons sorted by price
+        size_buttons = []
+        for item_id, size, price in sorted(variants, key=lambda x: x[2]):
+            label = f"{size} ${price:.2f}"
+            if step == 1:
+                callback_data = build("add_item", encode_id(item_id))
+            else:
+                callback_data = build("add_item", encode_id(item_id), step)
+            size_buttons.append((item_id, label, InlineKeyboardButton(label, callback_data=callback_data)))
+
+        per_row = MAX_ROW_BUTTONS - 1
+        for i in range(0, len(size_buttons), per_row):
+            rows.append((name_button, tuple(size_buttons[i:i + per_row])))
+
+    pages = []
+    page = []
+    page_buttons = 0
+    for row in rows:
+        row_buttons = 1 + len(row[1])
+        if page and page_buttons + row_buttons > MENU_PAGE_BUTTONS:
+            pages.append(tuple(page))
+            page = []
+            page_buttons = 0
+        page.append(row)
+        page_buttons += row_buttons
+
+    pages.append(tuple(page))
+    return tuple(pages)
+
+
+# Control rows under the ordering grid
+_CART_CONTROL_ROWS = (
+    (
+        InlineKeyboardButton("🗑 Clear Cart", callback_data="clear_cart"),
+        InlineKeyboardButton("✅ Confirm", callback_data="confirm_cart")
+    ),
+    (
+        # Opens "@bot " in the input field for an inline search of the menu
+        InlineKeyboardButton("🔍 Search", switch_inline_query_current_chat=""),
+        InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")
+    )
+)
+
+_SHOW_ALL_ROW = (InlineKeyboardButton("✖️ Clear Search", callback_data="menu_all"),)
+
+
+@lru_cache(maxsize=MENU_LAYOUT_CACHE_SIZE)
+def _quick_add_row(top_items: Tuple, step: int, can_repeat: bool) -> Tuple:
+    """Quick-add buttons for the most ordered items, plus the "repeat last" button"""
+    row = []
+    for item_id, name, size in top_items:
+        if step == 1:
+            callback_data = build("add_item", encode_id(item_id))
+        else:
+            callback_data = build("add_item", encode_id(item_id), step)
+        row.append(InlineKeyboardButton(f"⭐ {name} {size}", callback_data=callback_data))
+
+    if can_repeat:
+        row.append(InlineKeyboardButton("🔁 Repeat last", callback_data="repeat_last"))
+
+    return tuple(row)
+
+
+@lru_cache(maxsize=None)
+def _qty_step_row(step: int) -> Tuple:
+    """Quantity step buttons, with the selected step marked"""
+    row = []
+    for option in QTY_STEPS:
+        label = f"x{option}" if option > 0 else f"−{-option}"
+        if option == step:
+            label = f"• {label}"
+        row.append(InlineKeyboardButton(label, callback_data=f"set_qty:{option}"))
+    return tuple(row)
+
+
+def get_menu_items_keyboard(menu_items: List[Dict], cart: Dict = None, page: int = 0,
+                            search: str = None, step: int = 1, top_items: List[Dict] = None,
+                            can_repeat: bool = False) -> InlineKeyboardMarkup:
     """
     Get keyboard with menu items for ordering in grid layout
     Format: [Item Name] [Size 1] [Size 2] [Size 3]
 
+    Large menus are split into pages with ⬅️/➡️ buttons. The paged layout is
+    cached per menu signature; only the buttons of items in the cart are
+    rebuilt to show their quantity.
+
     Args:
         menu_items: List of menu item dictionaries
         cart: Optional cart dictionary to show selected items
+        page: Page to show (0-indexed, clamped to the available pages)
+        search: Optional typed text; only matching items are shown
+        step: Quantity one tap on an item adds (negative removes)
+        top_items: Optional most ordered items, shown as a quick-add row on top
+        can_repeat: Show the "repeat last order" button
     """
-    keyboard = []
+    if search:
+        menu_items = filter_menu_items(menu_items, search)
 
-    # Group items by name
-    items_by_name = {}
-    for item in menu_items:
-        name = item['name']
-        if name not in items_by_name:
-            items_by_name[name] = []
-        items_by_name[name].append(item)
+    pages = _menu_pages(menu_signature(menu_items), step)
+    page = max(0, min(page, len(pages) - 1))
 
-    # Build grid layout
-    for item_name, variants in items_by_name.items():
-        row = []
+    keyboard = []
 
-        # Add item name button (non-clickable, just for display)
-        row.append(InlineKeyboardButton(f"📦 {item_name}", callback_data="noop"))
+    # Quick-add row (hidden while searching)
+    if not search and (top_items or can_repeat):
+        top = tuple((item['id'], item['name'], item['size']) for item in (top_items or [])[:QUICK_ADD_ITEMS])
+        keyboard.append(_quick_add_row(top, step, can_repeat))
 
-        # Add size buttons
-        for variant in sorted(variants, key=lambda x: x['price']):  # Sort by price
-            qty_indicator = ""
-            if cart and variant['id'] in cart:
-                qty_indicator = f" ({cart[variant['id']]['quantity']})"
+    for name_button, size_buttons in pages[page]:
+        row = [name_button]
 
-            button_text = f"{variant['size']} ${variant['price']:.2f}{qty_indicator}"
-            row.append(InlineKeyboardButton(button_text, callback_data=f"add_item:{variant['id']}"))
+        for item_id, label, button in size_buttons:
+            if cart and item_id in cart:
+                # Overlay the quantity badge
+                button = InlineKeyboardButton(
+                    f"{label} ({cart[item_id]['quantity']})",
+                    callback_data=button.callback_data
+                )
+            row.append(button)
 
         keyboard.append(row)
 
-    # Add control buttons
-    keyboard.append([
-        InlineKeyboardButton("🗑 Clear Cart", callback_data="clear_cart"),
-        InlineKeyboardButton("✅ Confirm", callback_data="confirm_cart")
-    ])
-    keyboard.append([InlineKeyboardButton("❌ Cancel", callback_data="cancel_order")])
+    if search and not pages[page]:
+        keyboard.append([InlineKeyboardButton("No matching items", callback_data="noop")])
+
+    # Add pagination if needed
+    if len(pages) > 1:
+        nav_row = []
+        if page > 0:
+            nav_row.append(InlineKeyboardButton("⬅️", callback_data=f"menu_page:{page - 1}"))
+        nav_row.append(InlineKeyboardButton(f"{page + 1}/{len(pages)}", callback_data="noop"))
+        if page < len(pages) - 1:
+            nav_row.append(InlineKeyboardButton("➡️", callback_data=f"menu_page:{page + 1}"))
+        keyboard.append(nav_row)
+
+    if search:
+        keyboard.append(_SHOW_ALL_ROW)
+
+    keyboard.append(_qty_step_row(step))
+    keyboard.extend(_CART_CONTROL_ROWS)
 
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_payment_method_keyboard() -> InlineKeyboardMarkup:
     """Get payment method selection keyboard"""
     keyboard = [
@@ -117,7 +258,7 @@ def get_orders_list_keyboard(orders: List[Dict], page: int = 0, total_pages: int
     # Add order buttons
     for order in orders:
         button_text = f"Order #{order['order_number']} - ${order['total_amount']:.2f}"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"view_order:{order['id']}")])
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=build("view_order", encode_id(order['id'])))])
 
     # Add pagination if needed
     if total_pages > 1:
@@ -143,7 +284,7 @@ def get_order_detail_keyboard(order_id: str) -> InlineKeyboardMarkup:
         order_id: Order ID
     """
     keyboard = [
-        [InlineKeyboardButton("🗑 Delete Order", callback_data=f"delete_order:{order_id}")],
+        [InlineKeyboardButton("🗑 Delete Order", callback_data=build("delete_order", encode_id(order_id)))],
         [InlineKeyboardButton("🔙 Back to Orders", callback_data="view_orders")]
     ]
     return InlineKeyboardMarkup(keyboard)
@@ -158,13 +299,14 @@ def get_confirm_delete_keyboard(order_id: str) -> InlineKeyboardMarkup:
     """
     keyboard = [
         [
-            InlineKeyboardButton("✅ Yes, Delete", callback_data=f"confirm_delete:{order_id}"),
-            InlineKeyboardButton("❌ No, Cancel", callback_data=f"view_order:{order_id}")
+            InlineKeyboardButton("✅ Yes, Delete", callback_data=build("confirm_delete", encode_id(order_id))),
+            InlineKeyboardButton("❌ No, Cancel", callback_data=build("view_order", encode_id(order_id)))
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_confirm_end_session_keyboard() -> InlineKeyboardMarkup:
     """Get confirmation keyboard for ending session"""
     keyboard = [
@@ -188,7 +330,7 @@ def get_menu_management_keyboard(menu_items: List[Dict]) -> InlineKeyboardMarkup
     # Add menu items for editing/deletion
     for item in menu_items:
         button_text = f"{item['name']} ({item['size']}) - ${item['price']:.2f}"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"edit_menu_item:{item['id']}")])
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=build("edit_menu_item", encode_id(item['id'])))])
 
     # Add control buttons
     keyboard.append([InlineKeyboardButton("➕ Add New Item", callback_data="add_menu_item")])
@@ -230,16 +372,19 @@ def get_pagination_keyboard(page: int, total_pages: int, prefix: str, active_ses
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_back_button() -> InlineKeyboardMarkup:
     """Simple back to control panel button"""
     return InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Control Panel", callback_data="control_panel")]])
 
 
+@lru_cache(maxsize=None)
 def get_cancel_button() -> InlineKeyboardMarkup:
     """Cancel button for conversation handlers"""
     return InlineKeyboardMarkup([[InlineKeyboardButton("❌ Cancel", callback_data="cancel_menu_setup")]])
 
 
+@lru_cache(maxsize=None)
 def get_add_another_menu_item_keyboard() -> InlineKeyboardMarkup:
     """Keyboard after adding a menu item"""
     keyboard = [
@@ -265,10 +410,10 @@ def get_yes_no_keyboard(yes_callback: str, no_callback: str) -> InlineKeyboardMa
 def get_edit_menu_item_keyboard(item_id: str) -> InlineKeyboardMarkup:
     """Keyboard for editing a specific menu item"""
     keyboard = [
-        [InlineKeyboardButton("📝 Edit Name", callback_data=f"edit_name:{item_id}")],
-        [InlineKeyboardButton("📏 Edit Size", callback_data=f"edit_size:{item_id}")],
-        [InlineKeyboardButton("💰 Edit Price", callback_data=f"edit_price:{item_id}")],
-        [InlineKeyboardButton("🗑 Delete Item", callback_data=f"confirm_delete_menu_item:{item_id}")],
+        [InlineKeyboardButton("📝 Edit Name", callback_data=build("edit_name", encode_id(item_id)))],
+        [InlineKeyboardButton("📏 Edit Size", callback_data=build("edit_size", encode_id(item_id)))],
+        [InlineKeyboardButton("💰 Edit Price", callback_data=build("edit_price", encode_id(item_id)))],
+        [InlineKeyboardButton("🗑 Delete Item", callback_data=build("confirm_delete_menu_item", encode_id(item_id)))],
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="manage_menu")]
     ]
     return InlineKeyboardMarkup(keyboard)
@@ -278,13 +423,14 @@ def get_confirm_delete_menu_item_keyboard(item_id: str) -> InlineKeyboardMarkup:
     """Keyboard for confirming menu item deletion"""
     keyboard = [
         [
-            InlineKeyboardButton("✅ Yes, Delete", callback_data=f"delete_menu_item:{item_id}"),
-            InlineKeyboardButton("❌ Cancel", callback_data=f"edit_menu_item:{item_id}")
+            InlineKeyboardButton("✅ Yes, Delete", callback_data=build("delete_menu_item", encode_id(item_id))),
+            InlineKeyboardButton("❌ Cancel", callback_data=build("edit_menu_item", encode_id(item_id)))
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_back_to_menu_keyboard() -> InlineKeyboardMarkup:
     """Back to menu management button"""
     keyboard = [
@@ -294,6 +440,7 @@ def get_back_to_menu_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_skip_inventory_keyboard() -> InlineKeyboardMarkup:
     """Skip button for inventory input"""
     keyboard = [
@@ -302,6 +449,7 @@ def get_skip_inventory_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_inventory_start_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for starting inventory input with cancel option"""
     keyboard = [
@@ -312,6 +460,7 @@ def get_inventory_start_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_add_another_inventory_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for asking if user wants to add another inventory item"""
     keyboard = [
@@ -324,6 +473,7 @@ def get_add_another_inventory_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_inventory_skip_price_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for skipping cost price during inventory input"""
     keyboard = [
@@ -368,6 +518,7 @@ def get_user_management_keyboard(users: List[Dict]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_add_user_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for add user flow"""
     keyboard = [
@@ -408,6 +559,7 @@ def get_confirm_delete_user_keyboard(telegram_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_cleanup_menu_keyboard() -> InlineKeyboardMarkup:
     """Get cleanup menu keyboard"""
     keyboard = [
@@ -438,7 +590,7 @@ def get_past_sales_cleanup_keyboard(sessions: List[Dict], page: int = 0, total_p
         session_id = session['id']
 
         button_text = f"🗑 {started_at}"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"confirm_delete_session:{session_id}")])
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=build("confirm_delete_session", encode_id(session_id)))])
 
     # Add pagination if needed
     if total_pages > 1:
@@ -476,7 +628,7 @@ def get_past_inventory_cleanup_keyboard(sessions: List[Dict], page: int = 0, tot
         inventory_count = session.get('inventory_count', 0)
 
         button_text = f"📦 {started_at} ({inventory_count} items)"
-        keyboard.append([InlineKeyboardButton(button_text, callback_data=f"confirm_delete_session:{session_id}")])
+        keyboard.append([InlineKeyboardButton(button_text, callback_data=build("confirm_delete_session", encode_id(session_id)))])
 
     # Add pagination if needed
     if total_pages > 1:
@@ -503,13 +655,14 @@ def get_confirm_delete_session_keyboard(session_id: str) -> InlineKeyboardMarkup
     """
     keyboard = [
         [
-            InlineKeyboardButton("✅ Yes, Delete", callback_data=f"delete_session:{session_id}"),
+            InlineKeyboardButton("✅ Yes, Delete", callback_data=build("delete_session", encode_id(session_id))),
             InlineKeyboardButton("❌ Cancel", callback_data="cancel_cleanup")
         ]
     ]
     return InlineKeyboardMarkup(keyboard)
 
 
+@lru_cache(maxsize=None)
 def get_confirm_purge_all_keyboard() -> InlineKeyboardMarkup:
     """Get confirmation keyboard for purging all past data"""
     keyboard = [
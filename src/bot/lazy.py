@@ -0,0 +1,37 @@
+"""
+Handlers whose module is imported on first use instead of at startup
+"""
+import importlib
+from typing import Callable
+from telegram import Update
+from telegram.ext import ContextTypes
+
+
+def lazy_handler(module: str, name: str) -> Callable:
+    """
+    Get a handler that imports its module the first time it is called
+
+    Rarely used flows (menu setup, user management, cleanup) are registered
+    this way so a cold start does not pay for importing them.
+
+    Usage:
+        router.register("cleanup_menu", lazy_handler("src.bot.handlers.cleanup", "cleanup_menu_callback"))
+
+    Args:
+        module: Dotted module path of the handler
+        name: Handler function name in that module
+
+    Returns:
+        Callable: Async handler with the same (update, context) signature
+    """
+    handler = None
+
+    async def call(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        nonlocal handler
+        if handler is None:
+            handler = getattr(importlib.import_module(module), name)
+        return await handler(update, context)
+
+    call.__name__ = call.__qualname__ = name
+    call.__module__ = module
+    return call
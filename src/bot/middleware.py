@@ -4,10 +4,21 @@ Authentication middleware for the bot
 from telegram import Update
 from telegram.ext import ContextTypes
 from functools import wraps
-from src.database.models import Database
+from src.database.models import get_database
+from src.bot.dedupe import get_dedupe_store
+from src.bot.edits import get_edit_scheduler
+from src.bot.jobs import cancel_jobs
+from src.bot.user_queue import (
+    user_turn,
+    parse_cart_delta,
+    record_cart_delta,
+    discard_cart_delta,
+    has_pending_cart_deltas,
+    pop_cart_deltas
+)
 import logging
 
-db = Database()
+db = get_database()
 logger = logging.getLogger(__name__)
 
 
@@ -34,64 +45,73 @@ def require_auth(func):
             query = update.callback_query
             query_id = query.id
 
-            # Initialize bot_data storage if not exists
-            if 'processed_queries' not in context.bot_data:
-                context.bot_data['processed_queries'] = set()
-
-            # LAYER 1: Check if we've already processed this exact query ID globally
-            if query_id in context.bot_data['processed_queries']:
+            # LAYER 1: Check and record this exact query ID (shared across workers
+            # when a shared dedupe backend is configured)
+            if get_dedupe_store().seen_callback_query(query_id):
                 return  # Skip duplicate queries
 
-            # Mark this query as processed immediately (before any async work)
-            context.bot_data['processed_queries'].add(query_id)
-
-            # Keep only last 100 query IDs to prevent memory growth
-            if len(context.bot_data['processed_queries']) > 100:
-                queries_list = list(context.bot_data['processed_queries'])
-                context.bot_data['processed_queries'] = set(queries_list[-100:])
-
-            # LAYER 2: Prevent duplicate processing by checking processing state
-            if context.user_data.get('processing'):
-                return  # Silently ignore if already processing
-
-            # Set processing state immediately to prevent race conditions
-            context.user_data['processing'] = True
-
-            try:
-                # Check if user is authorized
-                if not db.is_user_authorized(telegram_id):
-                    await query.answer("⛔ You are not authorized to use this bot.")
+            # LAYER 2: Queue behind any handler already running for this user.
+            # Repeatable taps (add_item) are recorded as a cart delta first, so a
+            # burst is applied by a single handler run instead of being dropped.
+            cart_delta = parse_cart_delta(query.data or "")
+            if cart_delta:
+                record_cart_delta(context.user_data, *cart_delta)
+
+            async with user_turn(telegram_id):
+                if cart_delta and not has_pending_cart_deltas(context.user_data):
+                    # Already applied by the handler run for an earlier tap in this burst
+                    try:
+                        await query.answer()
+                    except:
+                        pass
                     return
 
-                # Update user info if needed
-                db.update_user_info(telegram_id, user.username, user.full_name)
-
-                # LAYER 3: Answer the callback query immediately (unless handler does it)
-                # We'll answer it here to prevent loading indicators during rapid taps
                 try:
-                    await query.answer()
-                except:
-                    pass  # Handler might have already answered
-
-                # LAYER 4: Call the original handler
-                return await func(update, context, *args, **kwargs)
-
-            except Exception as e:
-                logger.error(f"Error in callback handler: {e}", exc_info=True)
-                try:
-                    await query.answer("❌ An error occurred. Please try again.")
-                except:
-                    pass
-                raise
-
-            finally:
-                # Always clear processing state (guaranteed cleanup)
-                context.user_data.pop('processing', None)
+                    # Check if user is authorized
+                    if not await db.run(db.is_user_authorized, telegram_id):
+                        # Taps recorded before the check must not be applied by a later run
+                        pop_cart_deltas(context.user_data)
+                        await query.answer("⛔ You are not authorized to use this bot.")
+                        return
+
+                    # Update user info if needed
+                    await db.run(db.update_user_info, telegram_id, user.username, user.full_name)
+
+                    # LAYER 3: Answer the callback query immediately (unless handler does it)
+                    # We'll answer it here to prevent loading indicators during rapid taps
+                    try:
+                        await query.answer()
+                    except:
+                        pass  # Handler might have already answered
+
+                    # A direct edit must not be overwritten by a late debounced cart render
+                    if not cart_delta and query.message:
+                        await get_edit_scheduler().cancel(query.message.chat_id, query.message.message_id)
+
+                    # Nor by a delayed screen transition scheduled by an earlier tap
+                    if query.message:
+                        cancel_jobs(query.message.chat_id)
+
+                    # LAYER 4: Call the original handler
+                    return await func(update, context, *args, **kwargs)
+
+                except Exception as e:
+                    logger.error(f"Error in callback handler: {e}", exc_info=True)
+                    # Let a redelivery of this query run again instead of being dropped as a duplicate,
+                    # without the cart delta it recorded if still pending: the redelivery records it again
+                    get_dedupe_store().forget_callback_query(query_id)
+                    if cart_delta:
+                        discard_cart_delta(context.user_data, *cart_delta)
+                    try:
+                        await query.answer("❌ An error occurred. Please try again.")
+                    except:
+                        pass
+                    raise
 
         else:
             # MESSAGE HANDLING (original behavior)
             # Check if user is authorized
-            if not db.is_user_authorized(telegram_id):
+            if not await db.run(db.is_user_authorized, telegram_id):
                 await update.message.reply_text(
                     "⛔ You are not authorized to use this bot.\n\n"
                     "Please contact the administrator to get access."
@@ -99,7 +119,11 @@ def require_auth(func):
                 return
 
             # Update user info if needed
-            db.update_user_info(telegram_id, user.username, user.full_name)
+            await db.run(db.update_user_info, telegram_id, user.username, user.full_name)
+
+            # A delayed screen transition from an earlier tap must not follow this command
+            if update.effective_chat:
+                cancel_jobs(update.effective_chat.id)
 
             # Call the original handler
             return await func(update, context, *args, **kwargs)
@@ -110,7 +134,8 @@ def require_auth(func):
 def require_auth_callback(func):
     """
     Decorator to require authentication for callback query handlers
-    Includes 4-layer duplicate prevention system to prevent double-click issues
+    Includes 4-layer duplicate prevention system to prevent double-click issues;
+    taps made while a handler is running are queued per user, not dropped
 
     Usage:
         @require_auth_callback
@@ -124,55 +149,63 @@ def require_auth_callback(func):
         telegram_id = user.id
         query_id = query.id
 
-        # Initialize bot_data storage if not exists
-        if 'processed_queries' not in context.bot_data:
-            context.bot_data['processed_queries'] = set()
-
-        # LAYER 1: Check if we've already processed this exact query ID globally
-        if query_id in context.bot_data['processed_queries']:
+        # LAYER 1: Check and record this exact query ID (shared across workers
+        # when a shared dedupe backend is configured)
+        if get_dedupe_store().seen_callback_query(query_id):
             return  # Skip duplicate queries
 
-        # Mark this query as processed immediately (before any async work)
-        context.bot_data['processed_queries'].add(query_id)
+        # LAYER 2: Queue behind any handler already running for this user.
+        # Repeatable taps (add_item) are recorded as a cart delta first, so a
+        # burst is applied by a single handler run instead of being dropped.
+        cart_delta = parse_cart_delta(query.data or "")
+        if cart_delta:
+            record_cart_delta(context.user_data, *cart_delta)
 
-        # Keep only last 100 query IDs to prevent memory growth
-        if len(context.bot_data['processed_queries']) > 100:
-            # Remove oldest items (since sets are unordered, we convert to list and slice)
-            queries_list = list(context.bot_data['processed_queries'])
-            context.bot_data['processed_queries'] = set(queries_list[-100:])
+        async with user_turn(telegram_id):
+            if cart_delta and not has_pending_cart_deltas(context.user_data):
+                # Already applied by the handler run for an earlier tap in this burst
+                try:
+                    await query.answer()
+                except:
+                    pass
+                return
 
-        # LAYER 2: Prevent duplicate processing by checking processing state
-        if context.user_data.get('processing'):
-            return  # Silently ignore if already processing
+            try:
+                # Check if user is authorized
+                if not await db.run(db.is_user_authorized, telegram_id):
+                    # Taps recorded before the check must not be applied by a later run
+                    pop_cart_deltas(context.user_data)
+                    await query.answer("⛔ You are not authorized to use this bot.")
+                    return
 
-        # Set processing state immediately to prevent race conditions
-        context.user_data['processing'] = True
+                # Update user info if needed
+                await db.run(db.update_user_info, telegram_id, user.username, user.full_name)
 
-        try:
-            # Check if user is authorized
-            if not db.is_user_authorized(telegram_id):
-                await query.answer("⛔ You are not authorized to use this bot.")
-                return
+                # LAYER 3: Answer the callback query immediately to prevent loading indicators
+                await query.answer()
 
-            # Update user info if needed
-            db.update_user_info(telegram_id, user.username, user.full_name)
+                # A direct edit must not be overwritten by a late debounced cart render
+                if not cart_delta and query.message:
+                    await get_edit_scheduler().cancel(query.message.chat_id, query.message.message_id)
 
-            # LAYER 3: Answer the callback query immediately to prevent loading indicators
-            await query.answer()
+                # Nor by a delayed screen transition scheduled by an earlier tap
+                if query.message:
+                    cancel_jobs(query.message.chat_id)
 
-            # LAYER 4: Call the original handler
-            return await func(update, context, *args, **kwargs)
+                # LAYER 4: Call the original handler
+                return await func(update, context, *args, **kwargs)
 
-        except Exception as e:
-            logger.error(f"Error in callback handler: {e}", exc_info=True)
-            try:
-                await query.answer("❌ An error occurred. Please try again.")
-            except:
-                pass
-            raise
-
-        finally:
-            # Always clear processing state (guaranteed cleanup)
-            context.user_data.pop('processing', None)
+            except Exception as e:
+                logger.error(f"Error in callback handler: {e}", exc_info=True)
+                # Let a redelivery of this query run again instead of being dropped as a duplicate,
+                # without the cart delta it recorded if still pending: the redelivery records it again
+                get_dedupe_store().forget_callback_query(query_id)
+                if cart_delta:
+                    discard_cart_delta(context.user_data, *cart_delta)
+                try:
+                    await query.answer("❌ An error occurred. Please try again.")
+                except:
+                    pass
+                raise
 
     return wrapper
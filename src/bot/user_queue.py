@@ -0,0 +1,129 @@
+"""
+Per-user queueing of callback handlers with coalescing of repeatable taps
+"""
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+from src.bot.callback_data import SEPARATOR, decode_id
+from src.utils.tracing import span
+
+# Callback actions whose taps are merged into a pending cart quantity delta
+COALESCIBLE_ACTIONS = {"add_item"}
+
+class _UserLock:
+    """A user's lock and the number of handlers holding or waiting for it"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+# One lock per user, per event loop (asyncio locks cannot be shared across loops).
+# A user's entry is removed once no handler holds or waits for it.
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, _UserLock]]" = weakref.WeakKeyDictionary()
+
+# Handlers currently waiting for their user's lock (the queue depth)
+_waiting = 0
+
+
+@asynccontextmanager
+async def user_turn(telegram_id: int):
+    """
+    Run the block while holding the user's lock, counting the wait as queued
+
+    Serializes callback handlers per user: taps that arrive while a handler
+    is running wait their turn in FIFO order instead of being dropped.
+
+    Usage:
+        async with user_turn(telegram_id):
+            await handler(update, context)
+    """
+    global _waiting
+
+    locks = _locks.setdefault(asyncio.get_running_loop(), {})
+    entry = locks.get(telegram_id)
+    if entry is None:
+        entry = locks[telegram_id] = _UserLock()
+    entry.users += 1
+
+    try:
+        _waiting += 1
+        try:
+            with span("user_queue.wait"):
+                await entry.lock.acquire()
+        finally:
+            _waiting -= 1
+
+        try:
+            yield
+        finally:
+            entry.lock.release()
+    finally:
+        entry.users -= 1
+        if not entry.users and locks.get(telegram_id) is entry:
+            del locks[telegram_id]
+
+
+def queued_handlers() -> int:
+    """Get the number of handlers waiting for another handler of the same user to finish"""
+    return _waiting
+
+
+def parse_cart_delta(callback_data: str) -> Optional[Tuple[str, int]]:
+    """
+    Parse a coalescible callback into a cart delta
+
+    Args:
+        callback_data: Callback data (e.g., "add_item:<short_id>" or "add_item:<short_id>:<qty>")
+
+    Returns:
+        Optional[Tuple[str, int]]: (item_id, quantity delta), or None if not coalescible
+    """
+    action, _, rest = callback_data.partition(SEPARATOR)
+    if action not in COALESCIBLE_ACTIONS or not rest:
+        return None
+
+    token, _, quantity = rest.partition(SEPARATOR)
+    try:
+        return decode_id(token), int(quantity) if quantity else 1
+    except ValueError:
+        return None
+
+
+def record_cart_delta(user_data: Dict, item_id: str, quantity: int):
+    """Add a quantity delta to the user's pending cart deltas"""
+    deltas = user_data.setdefault("cart_deltas", {})
+    deltas[item_id] = deltas.get(item_id, 0) + quantity
+
+
+def discard_cart_delta(user_data: Dict, item_id: str, quantity: int):
+    """
+    Take back a delta recorded by record_cart_delta() if it is still pending
+
+    Only this tap's share is removed; deltas of taps queued behind it stay.
+    """
+    deltas = user_data.get("cart_deltas")
+    if not deltas or item_id not in deltas:
+        return
+
+    remaining = deltas[item_id] - quantity
+    if remaining and (remaining > 0) == (deltas[item_id] > 0):
+        deltas[item_id] = remaining
+    else:
+        del deltas[item_id]
+
+    if not deltas:
+        user_data.pop("cart_deltas", None)
+
+
+def has_pending_cart_deltas(user_data: Dict) -> bool:
+    """Check if there are cart deltas waiting to be applied"""
+    return bool(user_data.get("cart_deltas"))
+
+
+def pop_cart_deltas(user_data: Dict) -> Dict[str, int]:
+    """Take all pending cart deltas, leaving none behind"""
+    return user_data.pop("cart_deltas", None) or {}
@@ -0,0 +1,90 @@
+"""
+Boot warm-up: open pooled connections and fill caches before reporting ready
+
+After a deploy, the first taps would otherwise pay for DNS/TLS setup to
+Supabase and for empty menu, user and session caches. (The Telegram
+connection is already opened by application.initialize(), which calls
+get_me.) Both the webhook server and polling mode run the warm-up in the
+background at boot, so an unreachable Supabase never holds up startup; the
+readiness endpoint only reports ready once it has completed.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+from src.database.models import get_database
+from src.database.supabase_client import open_supabase_client
+from src.bot.keyboards import get_menu_items_keyboard
+
+logger = logging.getLogger(__name__)
+
+FIRST_RETRY_SECONDS = 1.0
+MAX_RETRY_SECONDS = float(os.getenv("WARMUP_MAX_RETRY_SECONDS", 30))
+
+
+class WarmupState:
+    """Progress of the boot warm-up, reported by the readiness endpoint"""
+
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.loaded: Dict[str, int] = {}
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Get the state as a JSON-serializable dict"""
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "duration_ms": self.duration_ms,
+            "loaded": self.loaded,
+            "error": self.error
+        }
+
+
+_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """Get the process-wide warm-up state"""
+    return _state
+
+
+async def warm_up() -> WarmupState:
+    """
+    Warm connections and caches, retrying with backoff until it succeeds
+
+    Steps:
+        1. Create the shared Supabase client
+        2. Load the menu, user directory and active session concurrently
+        3. Build the first page of the ordering keyboard
+
+    Returns:
+        WarmupState: The completed warm-up state
+    """
+    state = get_warmup_state()
+    state.started_at = time.monotonic()
+    retry_delay = FIRST_RETRY_SECONDS
+
+    while not state.ready:
+        state.attempts += 1
+        try:
+            db = get_database()
+            await asyncio.to_thread(open_supabase_client)
+            state.loaded = await db.warm_caches()
+            get_menu_items_keyboard(await db.run(db.get_menu_items))
+
+            state.error = None
+            state.ready = True
+        except Exception as e:
+            state.error = str(e)
+            logger.warning(f"Warm-up attempt {state.attempts} failed: {e}, retrying in {retry_delay:.0f}s")
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, MAX_RETRY_SECONDS)
+
+    state.duration_ms = round((time.monotonic() - state.started_at) * 1e3, 1)
+    logger.info(f"Warm-up completed in {state.duration_ms} ms: {state.loaded}")
+    return state
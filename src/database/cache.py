@@ -0,0 +1,85 @@
+"""
+Small in-process caches for hot, rarely changing query results
+"""
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CachedValue:
+    """
+    One cached query result with a TTL and explicit invalidation
+
+    Loads are single-flight: when the value is missing or expired, one
+    thread runs the loader while the others wait for its result instead of
+    all querying the database at once. A failed load is not cached.
+
+    Usage:
+        menu_cache = CachedValue(ttl=60)
+        items = menu_cache.get(load_menu)
+        menu_cache.invalidate()  # after a write
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # (value, expires_at), replaced as a whole so a lock-free read never
+        # sees the value of one entry with the expiry of another
+        self._entry: Optional[Tuple[Any, float]] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        # Guards _version and _entry writes; unlike _lock it is never held during a load
+        self._state_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self) -> Optional[Tuple[Any, float]]:
+        entry = self._entry
+        if entry is not None and time.monotonic() < entry[1]:
+            return entry
+        return None
+
+    def get(self, loader: Callable[[], Any]) -> Any:
+        """
+        Get the cached value, loading it with loader() if missing or expired
+
+        Args:
+            loader: Function returning the fresh value; it may raise to skip caching
+        """
+        entry = self._fresh()
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            entry = self._fresh()
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            version = self._version
+            value = loader()
+
+            # Only cache if nothing invalidated the value during the load
+            with self._state_lock:
+                if version == self._version:
+                    self._entry = (value, time.monotonic() + self.ttl)
+            return value
+
+    def set(self, value: Any):
+        """Replace the cached value (e.g., after a write whose result is known)"""
+        with self._state_lock:
+            self._version += 1
+            self._entry = (value, time.monotonic() + self.ttl)
+
+    def invalidate(self):
+        """Drop the cached value so the next get() reloads it"""
+        with self._state_lock:
+            self._version += 1
+            self._entry = None
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
@@ -1,16 +1,112 @@
 """
 Database models and query functions for Supabase
 """
-from typing import List, Dict, Optional, Any
+import os
+import asyncio
+import threading
+from functools import partial
+from typing import Callable, List, Dict, Optional, Any, TYPE_CHECKING
 from datetime import datetime
 from .supabase_client import get_supabase_client
+from .cache import CachedValue
+from .popularity import PopularityTracker
+from src.utils.timezone import get_singapore_time
+from src.utils.formatters import format_user_display_name
+from src.utils.metrics import DB_QUERY_SECONDS, timed_methods
+from src.utils.tracing import traced_methods
 
+if TYPE_CHECKING:
+    from supabase import Client
 
+# Active menu, shared by every Database instance in the process. Writes through
+# Database invalidate it; the TTL bounds staleness from other worker processes.
+menu_cache = CachedValue(ttl=float(os.getenv("MENU_CACHE_TTL_SECONDS", 60)))
+
+# Per-session and per-day item rankings, updated as orders are created
+popularity = PopularityTracker()
+
+# The active sale session (or None). Session writes through Database reset it;
+# orders invalidate it so the next read picks up the trigger-maintained total.
+active_session_cache = CachedValue(ttl=float(os.getenv("ACTIVE_SESSION_CACHE_TTL_SECONDS", 30)))
+
+# authorized_users by telegram_id, for display names and profile change checks.
+# User writes through Database reset it.
+user_directory_cache = CachedValue(ttl=float(os.getenv("USER_DIRECTORY_TTL_SECONDS", 300)))
+
+
+@timed_methods(DB_QUERY_SECONDS)
+@traced_methods("db")
 class Database:
     """Database operations wrapper"""
 
-    def __init__(self):
-        self.client = get_supabase_client()
+    @property
+    def client(self) -> "Client":
+        """Shared Supabase client (created on first query, not at import)"""
+        return get_supabase_client()
+
+    async def run(self, func: Callable, /, *args, **kwargs) -> Any:
+        """
+        Run one blocking call in a worker thread
+
+        The Supabase client is synchronous; awaited on the bot event loop, a
+        query would stop every other update (and pending edit) until it
+        returns. Handlers make every Database call through this or gather().
+
+        Usage:
+            order = await db.run(db.get_order_by_id, order_id)
+
+        Args:
+            func: Database method (or any blocking callable)
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            Any: What func returned
+        """
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """
+        Run independent reads concurrently
+
+        Each call runs in a worker thread, so a handler waits for the slowest
+        query instead of the sum of all of them. Only use this for reads that
+        do not depend on each other's results.
+
+        Usage:
+            orders, count = await db.gather(
+                partial(db.get_orders_by_session, session_id, limit=5),
+                partial(db.get_order_count_by_session, session_id)
+            )
+
+        Args:
+            *calls: Zero-argument callables (e.g., functools.partial of Database methods)
+
+        Returns:
+            List[Any]: Results in the same order as the calls
+        """
+        return list(await asyncio.gather(*(asyncio.to_thread(call) for call in calls)))
+
+    async def warm_caches(self) -> Dict[str, int]:
+        """
+        Load the active menu, user directory and active session into their caches
+
+        The three loads run concurrently, which also opens that many pooled
+        connections. Unlike the getters, errors are raised so a boot
+        warm-up can tell a failed load from an empty table and retry.
+
+        Returns:
+            Dict[str, int]: Number of rows loaded per cache
+        """
+        menu_items, users, session = await self.gather(
+            partial(menu_cache.get, self._fetch_menu_items),
+            partial(user_directory_cache.get, self._fetch_user_directory),
+            partial(active_session_cache.get, self._fetch_active_session)
+        )
+        return {
+            "menu_items": len(menu_items),
+            "users": len(users),
+            "active_session": int(session is not None)
+        }
 
     # ===== AUTHENTICATION =====
 
@@ -23,7 +119,7 @@ class Database:
             return False
 
     def update_user_info(self, telegram_id: int, username: str = None, full_name: str = None):
-        """Update user information"""
+        """Update user information (skipped when the stored profile already matches)"""
         try:
             data = {}
             if username:
@@ -31,8 +127,15 @@ class Database:
             if full_name:
                 data["full_name"] = full_name
 
-            if data:
-                self.client.table("authorized_users").update(data).eq("telegram_id", telegram_id).execute()
+            if not data:
+                return
+
+            stored = self.get_user_directory().get(telegram_id)
+            if stored and all(stored.get(key) == value for key, value in data.items()):
+                return
+
+            self.client.table("authorized_users").update(data).eq("telegram_id", telegram_id).execute()
+            user_directory_cache.invalidate()
         except Exception:
             pass
 
@@ -61,6 +164,7 @@ class Database:
                 "full_name": full_name
             }
             self.client.table("authorized_users").insert(data).execute()
+            user_directory_cache.invalidate()
             return True
         except Exception:
             return False
@@ -69,23 +173,63 @@ class Database:
         """Delete an authorized user"""
         try:
             self.client.table("authorized_users").delete().eq("telegram_id", telegram_id).execute()
+            user_directory_cache.invalidate()
             return True
         except Exception:
             return False
 
+    def get_user_directory(self) -> Dict[int, Dict]:
+        """
+        Get authorized users keyed by telegram ID (telegram_id, username, full_name)
+
+        Served from a process-wide cache; the returned dict is shared and
+        must not be modified.
+        """
+        try:
+            return user_directory_cache.get(self._fetch_user_directory)
+        except Exception:
+            return {}
+
+    def _fetch_user_directory(self) -> Dict[int, Dict]:
+        response = self.client.table("authorized_users").select("telegram_id, username, full_name").execute()
+        return {row["telegram_id"]: row for row in response.data}
+
+    def resolve_user_name(self, telegram_id: int) -> str:
+        """
+        Resolve the display name of a user from the cached user directory
+        (no query per user)
+
+        Args:
+            telegram_id: Telegram ID to resolve
+
+        Returns:
+            str: Full name, or a fallback built from the ID for unknown users
+        """
+        user = self.get_user_directory().get(telegram_id)
+        return format_user_display_name(telegram_id, user.get("full_name") if user else None)
+
     # ===== MENU ITEMS =====
 
     def get_menu_items(self, active_only: bool = True) -> List[Dict]:
-        """Get all menu items"""
+        """
+        Get all menu items
+
+        The active menu is served from a process-wide cache; the returned
+        list is shared and must not be modified.
+        """
         try:
-            query = self.client.table("menu_items").select("*")
             if active_only:
-                query = query.eq("active", True)
-            response = query.order("display_order").execute()
+                return menu_cache.get(self._fetch_menu_items)
+
+            response = self.client.table("menu_items").select("*").order("display_order").execute()
             return response.data
         except Exception:
             return []
 
+    def _fetch_menu_items(self) -> List[Dict]:
+        response = self.client.table("menu_items").select("*").eq("active", True).order("display_order").execute()
+        return response.data
+
     def add_menu_item(self, name: str, size: str, price: float) -> Optional[Dict]:
         """Add a new menu item"""
         try:
@@ -99,6 +243,7 @@ class Database:
                 "price": price,
                 "display_order": next_order
             }).execute()
+            menu_cache.invalidate()
             return response.data[0] if response.data else None
         except Exception:
             return None
@@ -107,6 +252,7 @@ class Database:
         """Update the name of a menu item"""
         try:
             self.client.table("menu_items").update({"name": name}).eq("id", item_id).execute()
+            menu_cache.invalidate()
             return True
         except Exception:
             return False
@@ -115,6 +261,7 @@ class Database:
         """Update the size of a menu item"""
         try:
             self.client.table("menu_items").update({"size": size}).eq("id", item_id).execute()
+            menu_cache.invalidate()
             return True
         except Exception:
             return False
@@ -123,6 +270,7 @@ class Database:
         """Update the price of a menu item"""
         try:
             self.client.table("menu_items").update({"price": price}).eq("id", item_id).execute()
+            menu_cache.invalidate()
             return True
         except Exception:
             return False
@@ -131,6 +279,7 @@ class Database:
         """Soft delete a menu item"""
         try:
             self.client.table("menu_items").update({"active": False}).eq("id", item_id).execute()
+            menu_cache.invalidate()
             return True
         except Exception:
             return False
@@ -144,18 +293,31 @@ class Database:
                 "started_by": telegram_id,
                 "status": "active"
             }).execute()
-            return response.data[0] if response.data else None
+            session = response.data[0] if response.data else None
+            if session:
+                active_session_cache.set(session)
+            else:
+                active_session_cache.invalidate()
+            return session
         except Exception:
             return None
 
     def get_active_session(self) -> Optional[Dict]:
-        """Get the currently active session"""
+        """
+        Get the currently active session
+
+        Served from a process-wide cache; concurrent misses share one query.
+        """
         try:
-            response = self.client.table("sale_sessions").select("*").eq("status", "active").execute()
-            return response.data[0] if response.data else None
+            session = active_session_cache.get(self._fetch_active_session)
+            return dict(session) if session else None
         except Exception:
             return None
 
+    def _fetch_active_session(self) -> Optional[Dict]:
+        response = self.client.table("sale_sessions").select("*").eq("status", "active").execute()
+        return response.data[0] if response.data else None
+
     def get_last_ended_session(self) -> Optional[Dict]:
         """Get the most recently ended session"""
         try:
@@ -171,6 +333,7 @@ class Database:
                 "status": "ended",
                 "ended_at": datetime.utcnow().isoformat()
             }).eq("id", session_id).execute()
+            active_session_cache.invalidate()
             return True
         except Exception:
             return False
@@ -247,12 +410,32 @@ class Database:
 
     # ===== ORDERS =====
 
-    def create_order(self, session_id: str, items: List[Dict], payment_method: str, telegram_id: int) -> Optional[Dict]:
-        """Create a new order"""
+    def create_order(self, session_id: str, items: List[Dict], payment_method: str, telegram_id: int,
+                     idempotency_key: Optional[str] = None) -> Optional[Dict]:
+        """
+        Create a new order
+
+        When an idempotency key is given, the order is created through the
+        create_order_idempotent RPC: a repeated submission with the same key
+        returns the original order instead of inserting a duplicate.
+        """
         try:
             # Calculate total
             total = sum(item["price"] * item["quantity"] for item in items)
 
+            if idempotency_key:
+                response = self.client.rpc("create_order_idempotent", {
+                    "p_session_id": session_id,
+                    "p_items": items,
+                    "p_total_amount": total,
+                    "p_payment_method": payment_method,
+                    "p_created_by": telegram_id,
+                    "p_idempotency_key": idempotency_key
+                }).execute()
+                order = response.data[0] if response.data else None
+                self._after_order_created(session_id, order)
+                return order
+
             # Get next order number using RPC function
             response = self.client.rpc("get_next_order_number", {"p_session_id": session_id}).execute()
             order_number = response.data
@@ -267,10 +450,47 @@ class Database:
                 "created_by": telegram_id
             }).execute()
 
-            return order_response.data[0] if order_response.data else None
+            order = order_response.data[0] if order_response.data else None
+            self._after_order_created(session_id, order)
+            return order
         except Exception:
             return None
 
+    def _after_order_created(self, session_id: str, order: Optional[Dict]):
+        if order:
+            # The session's total_sales changed (updated by a database trigger)
+            active_session_cache.invalidate()
+            popularity.record_order(session_id, get_singapore_time().date().isoformat(), order)
+
+    def get_popular_item_ids(self, session_id: str, limit: int = 4) -> List[str]:
+        """
+        Get the most ordered menu item IDs in a session, topped up with today's
+
+        Rankings are kept in memory and updated as orders are created; each
+        session and day is loaded from the database only once per process.
+        """
+        now = get_singapore_time()
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        def load_session_orders():
+            response = self.client.table("orders").select("id, items").eq("session_id", session_id).execute()
+            return response.data
+
+        def load_day_orders():
+            response = self.client.table("orders").select("id, items").gte("created_at", start_of_day.isoformat()).execute()
+            return response.data
+
+        try:
+            return popularity.top_item_ids(
+                session_id,
+                now.date().isoformat(),
+                limit,
+                load_session_orders,
+                load_day_orders
+            )
+        except Exception:
+            return []
+
     def get_orders_by_session(self, session_id: str, limit: int = 10, offset: int = 0) -> List[Dict]:
         """Get orders for a session with pagination"""
         try:
@@ -291,6 +511,8 @@ class Database:
         """Delete an order"""
         try:
             self.client.table("orders").delete().eq("id", order_id).execute()
+            active_session_cache.invalidate()
+            popularity.clear()
             return True
         except Exception:
             return False
@@ -315,6 +537,8 @@ class Database:
             # Delete session
             self.client.table("sale_sessions").delete().eq("id", session_id).execute()
 
+            active_session_cache.invalidate()
+            popularity.clear()
             return True
         except Exception:
             return False
@@ -352,6 +576,7 @@ class Database:
 
             # Delete all ended sessions
             self.client.table("sale_sessions").delete().eq("status", "ended").execute()
+            popularity.clear()
 
             return {
                 "sessions": len(session_ids),
@@ -360,3 +585,19 @@ class Database:
             }
         except Exception:
             return {"sessions": 0, "orders": 0, "inventory": 0}
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """Get the process-wide Database instance"""
+    global _database
+
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database()
+
+    return _database
@@ -0,0 +1,125 @@
+"""
+Incremental popularity rankings of menu items (per session and per day)
+"""
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# Days kept in memory (today, plus a little slack around midnight)
+MAX_DAYS = 3
+
+
+class _Ranking:
+    """Quantities sold per menu item for one scope, with a cached top list"""
+
+    __slots__ = ("counts", "order_ids", "_top")
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.order_ids: Set[str] = set()
+        self._top: Optional[List[str]] = None
+
+    def add(self, order: Dict) -> bool:
+        order_id = order.get('id')
+        if order_id in self.order_ids:
+            return False  # Already counted (e.g., an idempotent retry returned it again)
+        if order_id:
+            self.order_ids.add(order_id)
+
+        for item in order.get('items') or []:
+            item_id = item.get('menu_item_id')
+            if item_id:
+                self.counts[item_id] += item.get('quantity', 1)
+        self._top = None
+        return True
+
+    def top(self) -> List[str]:
+        if self._top is None:
+            self._top = [item_id for item_id, _ in self.counts.most_common()]
+        return self._top
+
+
+class PopularityTracker:
+    """
+    Popularity of menu items within a session and within a calendar day
+
+    A scope is seeded from the database the first time it is asked for,
+    then kept up to date as orders are created, so ranking never rescans
+    orders. Deleting orders drops the affected rankings; they are reseeded
+    on next use.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, _Ranking] = {}
+        self._days: Dict[str, _Ranking] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, rankings: Dict[str, _Ranking], key: str,
+             load_orders: Callable[[], Iterable[Dict]]) -> _Ranking:
+        ranking = rankings.get(key)
+        if ranking is not None:
+            return ranking
+
+        # Seed outside the lock (it queries the database); orders recorded
+        # meanwhile are deduplicated by order ID
+        seeded = _Ranking()
+        for order in load_orders():
+            seeded.add(order)
+
+        with self._lock:
+            ranking = rankings.get(key)
+            if ranking is None:
+                ranking = rankings[key] = seeded
+                if rankings is self._days:
+                    for old_day in sorted(rankings)[:-MAX_DAYS]:
+                        del rankings[old_day]
+            return ranking
+
+    def record_order(self, session_id: str, day: str, order: Dict):
+        """
+        Count a newly created order in its session and day rankings
+
+        Only scopes already loaded are updated; others are seeded (including
+        this order) when first asked for.
+        """
+        with self._lock:
+            for rankings, key in ((self._sessions, session_id), (self._days, day)):
+                ranking = rankings.get(key)
+                if ranking is not None:
+                    ranking.add(order)
+
+    def top_item_ids(self, session_id: str, day: str, limit: int,
+                     load_session_orders: Callable[[], Iterable[Dict]],
+                     load_day_orders: Callable[[], Iterable[Dict]]) -> List[str]:
+        """
+        Get the most ordered menu item IDs, session first, then the rest of the day
+
+        Args:
+            session_id: Current sale session
+            day: Calendar day key (e.g., "2024-05-01")
+            limit: Maximum number of item IDs
+            load_session_orders: Loads the session's orders when seeding
+            load_day_orders: Loads the day's orders when seeding
+        """
+        session_ranking = self._get(self._sessions, session_id, load_session_orders)
+        # record_order() updates the counts from other threads; rank them under the lock
+        with self._lock:
+            top = session_ranking.top()[:limit]
+
+        if len(top) < limit:
+            day_ranking = self._get(self._days, day, load_day_orders)
+            with self._lock:
+                day_top = day_ranking.top()
+            for item_id in day_top:
+                if item_id not in top:
+                    top.append(item_id)
+                    if len(top) == limit:
+                        break
+
+        return top
+
+    def clear(self):
+        """Drop every ranking (after orders or sessions are deleted)"""
+        with self._lock:
+            self._sessions.clear()
+            self._days.clear()
@@ -0,0 +1,72 @@
+"""
+Counting of Supabase round trips per update (or any other block of work)
+
+Every HTTP request the shared Supabase client sends is recorded against the
+counters active in the current context. Counters nest: a flow-level counter
+also sees the round trips of the updates inside it. Worker threads started
+with asyncio.to_thread (Database.gather) and tasks created by a handler copy
+the context, so their round trips are attributed to the update that caused
+them.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+# Calls kept per counter for reports; the count itself is never truncated
+MAX_RECORDED_CALLS = 200
+
+_current: ContextVar[Optional["RoundTrips"]] = ContextVar("db_round_trips", default=None)
+
+# Database.gather records from several threads at once
+_lock = threading.Lock()
+
+
+class RoundTrips:
+    """Round trips made while a counter was active"""
+
+    __slots__ = ("count", "calls", "parent")
+
+    def __init__(self, parent: Optional["RoundTrips"] = None):
+        self.count = 0
+        self.calls: List[str] = []
+        self.parent = parent
+
+    def record(self, label: str):
+        with _lock:
+            counter = self
+            while counter is not None:
+                counter.count += 1
+                if len(counter.calls) < MAX_RECORDED_CALLS:
+                    counter.calls.append(label)
+                counter = counter.parent
+
+
+@contextmanager
+def track_round_trips() -> Iterator[RoundTrips]:
+    """
+    Count the round trips made by the block (including nested and spawned work)
+
+    Usage:
+        with track_round_trips() as trips:
+            await application.process_update(update)
+        print(trips.count, trips.calls)
+    """
+    trips = RoundTrips(_current.get())
+    token = _current.set(trips)
+    try:
+        yield trips
+    finally:
+        _current.reset(token)
+
+
+def record_round_trip(label: str):
+    """Record one round trip (e.g., "GET menu_items") against the active counters"""
+    trips = _current.get()
+    if trips is not None:
+        trips.record(label)
+
+
+def current_round_trips() -> Optional[RoundTrips]:
+    """Get the innermost active counter, if any"""
+    return _current.get()
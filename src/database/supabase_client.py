@@ -1,9 +1,21 @@
 """
 Supabase client connection and configuration
+
+The client is created on first use, not at import time, so importing the bot
+(or a benchmark, or a script) never opens network connections. The Supabase
+SDK itself is also only imported then, as it is the slowest import of the
+bot. Every Database shares the same client and its pool of keep-alive
+connections.
 """
 import os
-from supabase import create_client, Client
+import threading
+from typing import Optional, TYPE_CHECKING
+import httpx
 from dotenv import load_dotenv
+from .round_trips import record_round_trip
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load environment variables
 load_dotenv()
@@ -12,15 +24,85 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# HTTP settings for PostgREST calls
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_CONNECT_TIMEOUT_SECONDS", 5))
+READ_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_READ_TIMEOUT_SECONDS", 15))
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 20))
+KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_KEEPALIVE_CONNECTIONS", 10))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", 60))
+
+# Shared client, created by get_supabase_client()
+supabase: Optional["Client"] = None
+_http_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def _record_request(request: httpx.Request):
+    """Count each request as a round trip of the update that sent it"""
+    record_round_trip(f"{request.method} {request.url.path.rsplit('/rest/v1/', 1)[-1]}")
+
 
+def _create_http_client() -> httpx.Client:
+    """Create the pooled HTTP client used for all Supabase requests"""
+    return httpx.Client(
+        timeout=httpx.Timeout(READ_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+        ),
+        follow_redirects=True,
+        http2=True,
+        event_hooks={"request": [_record_request]}
+    )
 
-def get_supabase_client() -> Client:
+
+def open_supabase_client() -> "Client":
     """
-    Get the Supabase client instance
+    Create the shared Supabase client if it does not exist yet
 
     Returns:
         Client: Supabase client instance
     """
+    global supabase, _http_client
+
+    with _lock:
+        if supabase is None:
+            from supabase import create_client, ClientOptions
+
+            if not SUPABASE_URL or not SUPABASE_KEY:
+                raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set")
+
+            _http_client = _create_http_client()
+            supabase = create_client(
+                SUPABASE_URL,
+                SUPABASE_KEY,
+                options=ClientOptions(
+                    postgrest_client_timeout=_http_client.timeout,
+                    httpx_client=_http_client
+                )
+            )
+
     return supabase
+
+
+def get_supabase_client() -> "Client":
+    """
+    Get the Supabase client instance, creating it on first use
+
+    Returns:
+        Client: Supabase client instance
+    """
+    return supabase if supabase is not None else open_supabase_client()
+
+
+def close_supabase_client():
+    """Close the shared client's connections (a later get_supabase_client() reopens it)"""
+    global supabase, _http_client
+
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+
+        supabase = None
+        _http_client = None
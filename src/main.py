@@ -3,14 +3,17 @@ Main entry point for the Kori POS Bot
 """
 import os
 import logging
+import atexit
 import asyncio
+import threading
 from dotenv import load_dotenv
-from flask import Flask, request
+from flask import Flask, Response, request
 from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
     MessageHandler,
     ConversationHandler,
     filters
@@ -23,27 +26,13 @@ from src.bot.handlers.control_panel import (
     view_past_sales_callback,
     view_past_inventory_callback
 )
-from src.bot.handlers.setup import (
-    manage_menu_command,
-    start_add_menu_item,
-    cancel_menu_setup,
-    delete_menu_item_callback,
-    confirm_delete_menu_item_callback,
-    edit_menu_item_callback,
-    edit_name_callback,
-    edit_size_callback,
-    edit_price_callback,
-    handle_has_sizes_callback,
-    handle_add_more_sizes_callback
-)
 from src.bot.handlers.inventory import (
     start_session_callback,
     start_adding_inventory_callback,
     skip_inventory,
     cancel_session_start_callback,
     add_another_inventory_callback,
-    skip_inventory_price_callback,
-    handle_inventory_message
+    skip_inventory_price_callback
 )
 from src.bot.handlers.sales import (
     show_sales_dashboard,
@@ -51,6 +40,11 @@ from src.bot.handlers.sales import (
     refresh_dashboard_callback,
     new_order_callback,
     add_item_to_cart_callback,
+    menu_page_callback,
+    set_qty_step_callback,
+    repeat_last_order_callback,
+    quick_order_command,
+    clear_menu_search_callback,
     clear_cart_callback,
     confirm_cart_callback,
     payment_method_callback,
@@ -66,25 +60,49 @@ from src.bot.handlers.orders import (
     delete_order_callback,
     confirm_delete_order_callback
 )
-from src.bot.handlers.users import (
-    manage_users_callback,
-    add_user_callback,
-    cancel_user_mgmt,
-    handle_user_message,
-    confirm_add_user_callback,
-    delete_user_callback,
-    confirm_delete_user_callback
-)
-from src.bot.handlers.cleanup import (
-    cleanup_menu_callback,
-    cleanup_sales_callback,
-    cleanup_inventory_callback,
-    confirm_delete_session_callback,
-    delete_session_callback,
-    cancel_cleanup_callback,
-    confirm_purge_all_callback,
-    purge_all_confirmed_callback
-)
+from src.bot.handlers.messages import handle_text_message
+from src.bot.handlers.search import inline_menu_search, add_command
+
+from src.bot.router import CallbackRouter
+from src.bot.lazy import lazy_handler
+from src.database.models import menu_cache, active_session_cache, user_directory_cache
+from src.database.supabase_client import close_supabase_client
+from src.bot.callback_data import decode_id
+from src.bot.dedupe import get_dedupe_store
+from src.bot.edits import get_edit_scheduler, get_render_cache
+from src.bot.warmup import warm_up, get_warmup_state
+from src.bot.instrumentation import InstrumentedApplication, InstrumentedRequest
+from src.utils.metrics import REGISTRY, CONTENT_TYPE, start_metrics_server
+
+# Rarely used flows are imported the first time one of their handlers runs
+manage_menu_command = lazy_handler("src.bot.handlers.setup", "manage_menu_command")
+start_add_menu_item = lazy_handler("src.bot.handlers.setup", "start_add_menu_item")
+cancel_menu_setup = lazy_handler("src.bot.handlers.setup", "cancel_menu_setup")
+delete_menu_item_callback = lazy_handler("src.bot.handlers.setup", "delete_menu_item_callback")
+confirm_delete_menu_item_callback = lazy_handler("src.bot.handlers.setup", "confirm_delete_menu_item_callback")
+edit_menu_item_callback = lazy_handler("src.bot.handlers.setup", "edit_menu_item_callback")
+edit_name_callback = lazy_handler("src.bot.handlers.setup", "edit_name_callback")
+edit_size_callback = lazy_handler("src.bot.handlers.setup", "edit_size_callback")
+edit_price_callback = lazy_handler("src.bot.handlers.setup", "edit_price_callback")
+handle_has_sizes_callback = lazy_handler("src.bot.handlers.setup", "handle_has_sizes_callback")
+handle_add_more_sizes_callback = lazy_handler("src.bot.handlers.setup", "handle_add_more_sizes_callback")
+
+manage_users_callback = lazy_handler("src.bot.handlers.users", "manage_users_callback")
+add_user_callback = lazy_handler("src.bot.handlers.users", "add_user_callback")
+cancel_user_mgmt = lazy_handler("src.bot.handlers.users", "cancel_user_mgmt")
+confirm_add_user_callback = lazy_handler("src.bot.handlers.users", "confirm_add_user_callback")
+delete_user_callback = lazy_handler("src.bot.handlers.users", "delete_user_callback")
+confirm_delete_user_callback = lazy_handler("src.bot.handlers.users", "confirm_delete_user_callback")
+
+cleanup_menu_callback = lazy_handler("src.bot.handlers.cleanup", "cleanup_menu_callback")
+cleanup_sales_callback = lazy_handler("src.bot.handlers.cleanup", "cleanup_sales_callback")
+cleanup_inventory_callback = lazy_handler("src.bot.handlers.cleanup", "cleanup_inventory_callback")
+confirm_delete_session_callback = lazy_handler("src.bot.handlers.cleanup", "confirm_delete_session_callback")
+delete_session_callback = lazy_handler("src.bot.handlers.cleanup", "delete_session_callback")
+cancel_cleanup_callback = lazy_handler("src.bot.handlers.cleanup", "cancel_cleanup_callback")
+confirm_purge_all_callback = lazy_handler("src.bot.handlers.cleanup", "confirm_purge_all_callback")
+purge_all_confirmed_callback = lazy_handler("src.bot.handlers.cleanup", "purge_all_confirmed_callback")
+trace_command = lazy_handler("src.bot.handlers.diagnostics", "trace_command")
 
 # Load environment variables
 load_dotenv()
@@ -100,6 +118,8 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
 PORT = int(os.getenv("PORT", 8443))
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9464))  # Polling mode only; 0 disables
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
 # Initialize Flask app for webhook (only used in production)
@@ -108,94 +128,136 @@ app = Flask(__name__)
 # Initialize bot application
 application = None
 
+# Event loop that runs the bot in webhook mode. It lives on its own thread for
+# the lifetime of the process, so background work scheduled by handlers
+# (debounced edits, delayed transitions) keeps running between requests.
+# Every request thread shares it, so handlers must not block it: Database
+# calls go through db.run()/db.gather(), which run them in worker threads.
+bot_loop = None
+bot_loop_lock = threading.Lock()
 
-def setup_handlers(app: Application):
-    """Setup all bot handlers"""
 
-    # Command handlers
-    app.add_handler(CommandHandler("start", start_command))
-    app.add_handler(CommandHandler("resume", start_command))  # /resume acts like /start
+def application_builder():
+    """Application builder with metrics: every update, handler and Bot API call is measured"""
+    return (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .application_class(InstrumentedApplication)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedRequest(connection_pool_size=1))
+    )
 
-    # Menu setup handlers - Manual state management
-    # Entry point for adding menu items
-    app.add_handler(CallbackQueryHandler(start_add_menu_item, pattern="^add_menu_item$"))
 
-    # Cancel handlers
-    app.add_handler(CallbackQueryHandler(cancel_menu_setup, pattern="^cancel_menu_setup$"))
-    app.add_handler(CommandHandler("cancel", cancel_menu_setup))
+def get_bot_loop() -> asyncio.AbstractEventLoop:
+    """Get the long-running bot event loop, starting it on first use"""
+    global bot_loop
+
+    with bot_loop_lock:
+        if bot_loop is None:
+            bot_loop = asyncio.new_event_loop()
+            threading.Thread(target=bot_loop.run_forever, name="bot-event-loop", daemon=True).start()
+
+    return bot_loop
 
-    # Message handler for menu item setup flow (checks context.user_data['menu_state'])
-    from src.bot.handlers.setup import handle_menu_message
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_menu_message), group=1)
 
-    # Message handler for inventory flow (checks context.user_data['inventory_state'])
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_inventory_message), group=2)
+def build_callback_router() -> CallbackRouter:
+    """Build the callback router with every button action and its argument types"""
+    router = CallbackRouter()
 
-    # Message handler for user management flow (checks context.user_data['user_mgmt_state'])
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_user_message), group=3)
+    # Menu setup handlers - Manual state management
+    router.register("add_menu_item", start_add_menu_item)
+    router.register("cancel_menu_setup", cancel_menu_setup)
 
     # Inventory session start handlers - Manual state management
-    app.add_handler(CallbackQueryHandler(start_session_callback, pattern="^start_session$"))
-    app.add_handler(CallbackQueryHandler(start_adding_inventory_callback, pattern="^start_adding_inventory$"))
-    app.add_handler(CallbackQueryHandler(skip_inventory, pattern="^skip_inventory$"))
-    app.add_handler(CallbackQueryHandler(cancel_session_start_callback, pattern="^cancel_session_start$"))
-    app.add_handler(CallbackQueryHandler(add_another_inventory_callback, pattern="^add_another_inventory:"))
-    app.add_handler(CallbackQueryHandler(skip_inventory_price_callback, pattern="^skip_inventory_price$"))
+    router.register("start_session", start_session_callback)
+    router.register("start_adding_inventory", start_adding_inventory_callback)
+    router.register("skip_inventory", skip_inventory)
+    router.register("cancel_session_start", cancel_session_start_callback)
+    router.register("add_another_inventory", add_another_inventory_callback, str)
+    router.register("skip_inventory_price", skip_inventory_price_callback)
 
     # Control panel callbacks
-    app.add_handler(CallbackQueryHandler(control_panel_callback, pattern="^control_panel$"))
-    app.add_handler(CallbackQueryHandler(view_past_sales_callback, pattern="^view_sales"))
-    app.add_handler(CallbackQueryHandler(view_past_inventory_callback, pattern="^view_inventory$"))
+    router.register("control_panel", control_panel_callback)
+    router.register("view_sales", view_past_sales_callback, int, required=0)
+    router.register("view_inventory", view_past_inventory_callback, int, required=0)
 
     # Menu management callbacks
-    app.add_handler(CallbackQueryHandler(manage_menu_command, pattern="^manage_menu$"))
-    app.add_handler(CallbackQueryHandler(edit_menu_item_callback, pattern="^edit_menu_item:"))
-    app.add_handler(CallbackQueryHandler(edit_name_callback, pattern="^edit_name:"))
-    app.add_handler(CallbackQueryHandler(edit_size_callback, pattern="^edit_size:"))
-    app.add_handler(CallbackQueryHandler(edit_price_callback, pattern="^edit_price:"))
-    app.add_handler(CallbackQueryHandler(confirm_delete_menu_item_callback, pattern="^confirm_delete_menu_item:"))
-    app.add_handler(CallbackQueryHandler(delete_menu_item_callback, pattern="^delete_menu_item:"))
-    app.add_handler(CallbackQueryHandler(handle_has_sizes_callback, pattern="^has_multiple_sizes:"))
-    app.add_handler(CallbackQueryHandler(handle_add_more_sizes_callback, pattern="^add_more_sizes:"))
+    router.register("manage_menu", manage_menu_command)
+    router.register("edit_menu_item", edit_menu_item_callback, decode_id)
+    router.register("edit_name", edit_name_callback, decode_id)
+    router.register("edit_size", edit_size_callback, decode_id)
+    router.register("edit_price", edit_price_callback, decode_id)
+    router.register("confirm_delete_menu_item", confirm_delete_menu_item_callback, decode_id)
+    router.register("delete_menu_item", delete_menu_item_callback, decode_id)
+    router.register("has_multiple_sizes", handle_has_sizes_callback, str)
+    router.register("add_more_sizes", handle_add_more_sizes_callback, str)
 
     # Sales dashboard callbacks
-    app.add_handler(CallbackQueryHandler(join_session_callback, pattern="^join_session$"))
-    app.add_handler(CallbackQueryHandler(refresh_dashboard_callback, pattern="^refresh_dashboard$"))
-    app.add_handler(CallbackQueryHandler(new_order_callback, pattern="^new_order$"))
-    app.add_handler(CallbackQueryHandler(add_item_to_cart_callback, pattern="^add_item:"))
-    app.add_handler(CallbackQueryHandler(clear_cart_callback, pattern="^clear_cart$"))
-    app.add_handler(CallbackQueryHandler(confirm_cart_callback, pattern="^confirm_cart$"))
-    app.add_handler(CallbackQueryHandler(payment_method_callback, pattern="^payment:"))
-    app.add_handler(CallbackQueryHandler(cancel_order_callback, pattern="^cancel_order$"))
-    app.add_handler(CallbackQueryHandler(cancel_payment_callback, pattern="^cancel_payment$"))
-    app.add_handler(CallbackQueryHandler(end_session_callback, pattern="^end_session$"))
-    app.add_handler(CallbackQueryHandler(confirm_end_session_callback, pattern="^confirm_end_session$"))
-    app.add_handler(CallbackQueryHandler(back_to_dashboard_callback, pattern="^back_to_dashboard$"))
+    router.register("join_session", join_session_callback)
+    router.register("refresh_dashboard", refresh_dashboard_callback)
+    router.register("new_order", new_order_callback)
+    router.register("add_item", add_item_to_cart_callback, decode_id, int, required=1)
+    router.register("menu_page", menu_page_callback, int)
+    router.register("set_qty", set_qty_step_callback, int)
+    router.register("repeat_last", repeat_last_order_callback)
+    router.register("menu_all", clear_menu_search_callback)
+    router.register("clear_cart", clear_cart_callback)
+    router.register("confirm_cart", confirm_cart_callback)
+    router.register("payment", payment_method_callback, str)
+    router.register("cancel_order", cancel_order_callback)
+    router.register("cancel_payment", cancel_payment_callback)
+    router.register("end_session", end_session_callback)
+    router.register("confirm_end_session", confirm_end_session_callback)
+    router.register("back_to_dashboard", back_to_dashboard_callback)
 
     # Order management callbacks
-    app.add_handler(CallbackQueryHandler(view_orders_callback, pattern="^view_orders$"))
-    app.add_handler(CallbackQueryHandler(view_orders_callback, pattern="^orders_page:"))
-    app.add_handler(CallbackQueryHandler(view_order_detail_callback, pattern="^view_order:"))
-    app.add_handler(CallbackQueryHandler(delete_order_callback, pattern="^delete_order:"))
-    app.add_handler(CallbackQueryHandler(confirm_delete_order_callback, pattern="^confirm_delete:"))
+    router.register("view_orders", view_orders_callback)
+    router.register("orders_page", view_orders_callback, int)
+    router.register("view_order", view_order_detail_callback, decode_id)
+    router.register("delete_order", delete_order_callback, decode_id)
+    router.register("confirm_delete", confirm_delete_order_callback, decode_id)
 
     # User management callbacks
-    app.add_handler(CallbackQueryHandler(manage_users_callback, pattern="^manage_users$"))
-    app.add_handler(CallbackQueryHandler(add_user_callback, pattern="^add_user$"))
-    app.add_handler(CallbackQueryHandler(cancel_user_mgmt, pattern="^cancel_user_mgmt$"))
-    app.add_handler(CallbackQueryHandler(confirm_add_user_callback, pattern="^confirm_add_user:"))
-    app.add_handler(CallbackQueryHandler(delete_user_callback, pattern="^delete_user:"))
-    app.add_handler(CallbackQueryHandler(confirm_delete_user_callback, pattern="^confirm_delete_user:"))
+    router.register("manage_users", manage_users_callback)
+    router.register("add_user", add_user_callback)
+    router.register("cancel_user_mgmt", cancel_user_mgmt)
+    router.register("confirm_add_user", confirm_add_user_callback, int)
+    router.register("delete_user", delete_user_callback, int)
+    router.register("confirm_delete_user", confirm_delete_user_callback, int)
 
     # Cleanup callbacks
-    app.add_handler(CallbackQueryHandler(cleanup_menu_callback, pattern="^cleanup_menu$"))
-    app.add_handler(CallbackQueryHandler(cleanup_sales_callback, pattern="^cleanup_sales"))
-    app.add_handler(CallbackQueryHandler(cleanup_inventory_callback, pattern="^cleanup_inventory"))
-    app.add_handler(CallbackQueryHandler(confirm_delete_session_callback, pattern="^confirm_delete_session:"))
-    app.add_handler(CallbackQueryHandler(delete_session_callback, pattern="^delete_session:"))
-    app.add_handler(CallbackQueryHandler(cancel_cleanup_callback, pattern="^cancel_cleanup$"))
-    app.add_handler(CallbackQueryHandler(confirm_purge_all_callback, pattern="^confirm_purge_all$"))
-    app.add_handler(CallbackQueryHandler(purge_all_confirmed_callback, pattern="^purge_all_confirmed$"))
+    router.register("cleanup_menu", cleanup_menu_callback)
+    router.register("cleanup_sales", cleanup_sales_callback, int, required=0)
+    router.register("cleanup_inventory", cleanup_inventory_callback, int, required=0)
+    router.register("confirm_delete_session", confirm_delete_session_callback, decode_id)
+    router.register("delete_session", delete_session_callback, decode_id)
+    router.register("cancel_cleanup", cancel_cleanup_callback)
+    router.register("confirm_purge_all", confirm_purge_all_callback)
+    router.register("purge_all_confirmed", purge_all_confirmed_callback)
+
+    return router
+
+
+def setup_handlers(app: Application):
+    """Setup all bot handlers"""
+
+    # Command handlers
+    app.add_handler(CommandHandler("start", start_command))
+    app.add_handler(CommandHandler("resume", start_command))  # /resume acts like /start
+    app.add_handler(CommandHandler("cancel", cancel_menu_setup))
+    app.add_handler(CommandHandler("add", add_command))  # Sent by choosing an inline search result
+    app.add_handler(CommandHandler("o", quick_order_command))  # One-message order: /o 2 latte L, 1 mocha cash
+    app.add_handler(CommandHandler("trace", trace_command))  # Slowest recent updates: /trace [count]
+
+    # Inline menu search (@bot <text>)
+    app.add_handler(InlineQueryHandler(inline_menu_search))
+
+    # Text messages for the menu setup, inventory and user management flows go
+    # through one router that authorizes once and dispatches on the active flow
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message), group=1)
+
+    # All inline button taps go through a single router keyed by callback action
+    app.add_handler(CallbackQueryHandler(build_callback_router()))
 
     logger.info("All handlers registered successfully")
 
@@ -206,29 +268,26 @@ def webhook():
     if request.method == "POST":
         update_data = request.get_json(force=True)
 
-        # Process the update synchronously using asyncio.run
+        # Telegram redelivers updates it considers unacknowledged; process each update ID once
+        update_id = update_data.get('update_id')
+        if update_id is not None and get_dedupe_store().seen_update(update_id):
+            logger.info(f"Skipping duplicate update {update_id}")
+            return "OK", 200
+
+        # Process the update on the bot event loop and wait for the handler to finish
         try:
             async def process_update():
                 update = Update.de_json(update_data, application.bot)
                 await application.process_update(update)
 
-            # Get or create event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # If loop is already running, create a new one
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            # Run the async function
-            loop.run_until_complete(process_update())
+            asyncio.run_coroutine_threadsafe(process_update(), get_bot_loop()).result()
 
             return "OK", 200
         except Exception as e:
             logger.error(f"Error processing webhook: {e}", exc_info=True)
+            # Telegram redelivers after a 500; that delivery must not be dropped as a duplicate
+            if update_id is not None:
+                get_dedupe_store().forget_update(update_id)
             return "Error", 500
 
     return "Method not allowed", 405
@@ -240,9 +299,64 @@ def index():
     return "Kori POS Bot is running!"
 
 
+@app.route("/ready")
+def ready():
+    """Readiness endpoint: 503 until the boot warm-up has filled the caches"""
+    state = get_warmup_state()
+    return state.to_dict(), 200 if state.ready else 503
+
+
+@app.route("/metrics")
+def metrics():
+    """Metrics endpoint in the Prometheus text exposition format"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@app.route("/stats")
+def stats():
+    """Runtime counters endpoint"""
+    return {
+        "dedupe": get_dedupe_store().stats(),
+        "edits": get_edit_scheduler().stats(),
+        "renders": get_render_cache().stats(),
+        "menu_cache": menu_cache.stats(),
+        "active_session_cache": active_session_cache.stats(),
+        "user_directory_cache": user_directory_cache.stats()
+    }
+
+
+# Background warm-up task in polling mode (cancelled at shutdown if still retrying)
+warmup_task = None
+
+
+async def close_connections(_application: Application):
+    """Close the shared Supabase connections when the application shuts down"""
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    close_supabase_client()
+
+
+async def warm_caches(_application: Application):
+    """
+    Warm Supabase connections and caches in the background once the bot starts
+
+    Like the webhook path, polling does not wait for it: the warm-up retries
+    until Supabase is reachable, and the first updates simply load what they need.
+    """
+    global warmup_task
+    warmup_task = asyncio.create_task(warm_up())
+
+
 async def setup_webhook():
-    """Setup webhook for the bot"""
+    """Setup webhook for the bot, skipping the call when Telegram already has it"""
     webhook_url = f"{WEBHOOK_URL}/{BOT_TOKEN}"
+
+    # Every worker (re)start runs this; re-setting an unchanged webhook only adds a round trip
+    info = await application.bot.get_webhook_info()
+    if info.url == webhook_url:
+        logger.info("Webhook already set, skipping set_webhook")
+        return
+
     await application.bot.set_webhook(webhook_url)
     logger.info(f"Webhook set to: {webhook_url}")
 
@@ -253,14 +367,19 @@ def init_bot():
 
     if application is None:
         logger.info("Initializing bot application...")
-        application = Application.builder().token(BOT_TOKEN).build()
+        application = application_builder().build()
         setup_handlers(application)
 
-        # Initialize the application synchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(application.initialize())
-        loop.run_until_complete(setup_webhook())
+        # Gunicorn never runs application.shutdown(), so release connections at exit
+        atexit.register(close_supabase_client)
+
+        # Initialize the application on the bot event loop
+        loop = get_bot_loop()
+        asyncio.run_coroutine_threadsafe(application.initialize(), loop).result()
+        asyncio.run_coroutine_threadsafe(setup_webhook(), loop).result()
+
+        # Warm caches in the background; /ready reports 503 until this completes
+        asyncio.run_coroutine_threadsafe(warm_up(), loop)
         logger.info("Bot application initialized successfully")
 
     return application
@@ -271,7 +390,7 @@ def main():
     global application
 
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = application_builder().post_init(warm_caches).post_shutdown(close_connections).build()
 
     # Setup handlers
     setup_handlers(application)
@@ -287,6 +406,14 @@ def main():
         logger.info("Running in DEVELOPMENT mode with polling")
         logger.info("Bot is now running. Press Ctrl+C to stop.")
 
+        # There is no Flask app in polling mode: serve /metrics on its own port
+        if METRICS_PORT:
+            try:
+                start_metrics_server(METRICS_PORT, METRICS_HOST)
+                logger.info(f"Metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except OSError as e:
+                logger.warning(f"Could not start the metrics server on port {METRICS_PORT}: {e}")
+
         # Run with polling
         application.run_polling(allowed_updates=Update.ALL_TYPES)
 
@@ -110,18 +110,18 @@ def format_order_items(items: List[Dict]) -> str:
     return "\n".join(lines)
 
 
-def format_order_summary(order: Dict) -> str:
+def format_order_summary(order: Dict, created_by_name: Optional[str] = None) -> str:
     """
     Format a complete order summary
 
     Args:
         order: Order dictionary
+        created_by_name: Display name of the order's creator (e.g., from Database.resolve_user_name)
 
     Returns:
         str: Formatted order summary
     """
     from src.utils.timezone import format_full_datetime
-    from src.database.models import Database
 
     lines = [
         f"📝 *Order #{order['order_number']}*\n"
@@ -133,13 +133,7 @@ def format_order_summary(order: Dict) -> str:
 
     # Add created by if available
     if order.get('created_by'):
-        created_by_id = order['created_by']
-        db = Database()
-        user_info = db.get_user_by_telegram_id(created_by_id)
-        created_by_name = format_user_display_name(
-            created_by_id,
-            user_info.get('full_name') if user_info else None
-        )
+        created_by_name = created_by_name or format_user_display_name(order['created_by'])
         lines.append(f"👤 Created by: {created_by_name}\n")
     else:
         lines.append("")  # Empty line for spacing
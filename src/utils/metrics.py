@@ -0,0 +1,327 @@
+"""
+In-process metrics in the Prometheus text exposition format
+
+Counters, gauges and histograms live in a process-wide registry and are
+rendered by the /metrics endpoint (the Flask app in webhook mode, or
+start_metrics_server() in polling mode); nothing is pushed to external services.
+Metrics can also be backed by a callback that is sampled at scrape time,
+for values other modules already count (cache hits, queue sizes).
+"""
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PREFIX = "kori_pos_"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow Supabase/Telegram calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+Sampler = Callable[[], Dict[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric with optional labels and an optional scrape-time sampler"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 sampler: Optional[Sampler] = None, registry: Optional["Registry"] = None):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.sampler = sampler
+        # Unlabelled metrics start at zero so they are rendered before the first update
+        self._values: Dict[LabelValues, float] = {} if self.label_names else {(): 0}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, label_values: Sequence) -> LabelValues:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {label_values}")
+        return tuple(str(value) for value in label_values)
+
+    def samples(self) -> Iterator[Tuple[str, LabelValues, float]]:
+        """Yield (sample name, label values, value) for rendering"""
+        values = self.sampler() if self.sampler else dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, key, value
+
+    def render(self) -> List[str]:
+        """Render the metric in the text exposition format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for sample_name, key, value in self.samples():
+            lines.append(f"{sample_name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        """Increase the count for the given label values"""
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values):
+        """Set the value for the given label values"""
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *label_values, amount: float = 1):
+        """Increase the value for the given label values"""
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1):
+        """Decrease the value for the given label values"""
+        self.inc(*label_values, amount=-amount)
+
+    @contextmanager
+    def track_inprogress(self, *label_values):
+        """Count the block as in progress while it runs"""
+        self.inc(*label_values)
+        try:
+            yield
+        finally:
+            self.dec(*label_values)
+
+
+class Histogram(Metric):
+    """Distribution of observed values (e.g., latency in seconds) in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, labels, registry=registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [count per bucket..., sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *label_values):
+        """Record one observation for the given label values"""
+        key = self._key(label_values)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        """Observe the duration of the block in seconds (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def samples(self) -> Iterator[Tuple[str, LabelValues, float]]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", key, values[-1]
+            yield f"{self.name}_count", key, cumulative
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for sample_name, key, value in self.samples():
+            names = self.label_names + ("le",) if sample_name.endswith("_bucket") else self.label_names
+            lines.append(f"{sample_name}{_format_labels(names, key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        """Add a metric (names must be unique)"""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """
+    Serve GET /metrics from a background thread
+
+    For polling mode, where there is no Flask app to serve it. Scrapes only
+    render the registry, so the bot's event loop is never involved.
+
+    Args:
+        port: Port to listen on
+        host: Address to bind (localhost by default)
+
+    Returns:
+        ThreadingHTTPServer: The running server (shutdown() stops it)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # One line per scrape is noise
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def timed_methods(histogram: Histogram):
+    """
+    Class decorator that observes the duration of every public method
+
+    The histogram must have a single label, which receives the method name.
+    Properties, coroutine functions and underscore-prefixed methods are left alone.
+
+    Usage:
+        @timed_methods(DB_QUERY_SECONDS)
+        class Database: ...
+    """
+    import inspect
+
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member) or inspect.iscoroutinefunction(member):
+                continue
+            setattr(cls, name, _timed(histogram, name, member))
+        return cls
+
+    return decorate
+
+
+def _timed(histogram: Histogram, label: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with histogram.time(label):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# ===== METRICS =====
+
+HANDLER_SECONDS = Histogram(
+    "handler_duration_seconds",
+    "Time spent in a bot handler, by handler function",
+    ["handler"]
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "db_method_duration_seconds",
+    "Time spent in a Database method (cache hits included), by method",
+    ["method"]
+)
+
+BOT_API_SECONDS = Histogram(
+    "bot_api_request_duration_seconds",
+    "Time spent on a Telegram Bot API request, by API method",
+    ["method"]
+)
+
+BOT_API_REQUESTS = Counter(
+    "bot_api_requests_total",
+    "Telegram Bot API requests, by API method and HTTP status code",
+    ["method", "status"]
+)
+
+BOT_API_RETRY_AFTER = Counter(
+    "bot_api_retry_after_total",
+    "Telegram Bot API requests rejected with 429 Too Many Requests, by API method",
+    ["method"]
+)
+
+UPDATE_SECONDS = Histogram(
+    "update_duration_seconds",
+    "Time to process one Telegram update end to end, by update type",
+    ["type"]
+)
+
+DB_ROUND_TRIPS = Histogram(
+    "db_round_trips_per_update",
+    "Supabase round trips made while processing one update, by update type",
+    ["type"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24)
+)
+
+TRACES_DROPPED = Counter(
+    "traces_dropped_total",
+    "Finished traces not exported because the export queue was full"
+)
+
+UPDATES_IN_FLIGHT = Gauge(
+    "updates_in_flight",
+    "Telegram updates currently being processed"
+)
@@ -0,0 +1,135 @@
+"""
+Parser for one-message orders (e.g., "/o 2 latte L, 1 mocha cash")
+"""
+import difflib
+from typing import List, Dict, Optional, Tuple
+from src.utils.search import normalize
+
+# Accepted payment words -> payment method stored on the order
+PAYMENT_METHODS = {
+    'cash': 'cash',
+    'paynow': 'paynow',
+    'pn': 'paynow'
+}
+
+MAX_QUANTITY = 999
+
+# How close a typed name or size must be to count as a match (difflib ratio)
+FUZZY_CUTOFF = 0.6
+
+QUICK_ORDER_USAGE = (
+    "Usage: `/o 2 latte L, 1 mocha cash`\n"
+    "Separate items with commas, put the size after the name and end with "
+    "the payment method (cash or paynow)."
+)
+
+
+def _match(typed: str, choices: List[str]) -> Optional[str]:
+    """
+    Match typed text to one of the choices (already normalized)
+
+    Tries an exact match, then a unique prefix, then the closest fuzzy match.
+    """
+    if typed in choices:
+        return typed
+
+    prefixed = [choice for choice in choices if choice.startswith(typed)]
+    if len(prefixed) == 1:
+        return prefixed[0]
+
+    close = difflib.get_close_matches(typed, choices, n=1, cutoff=FUZZY_CUTOFF)
+    return close[0] if close else None
+
+
+def _parse_line(words: List[str], variants_by_name: Dict[str, List[Dict]]) -> Tuple[Optional[Dict], int, Optional[str]]:
+    """
+    Parse one comma-separated part of the order
+
+    Returns:
+        Tuple[Optional[Dict], int, Optional[str]]: (menu item, quantity, error)
+    """
+    quantity = 1
+    first = words[0].rstrip('x')
+    if len(words) > 1 and first.isdigit():
+        quantity = int(first)
+        words = words[1:]
+
+    if not 1 <= quantity <= MAX_QUANTITY:
+        return None, 0, f"Quantity must be between 1 and {MAX_QUANTITY}: {' '.join(words)}"
+
+    names = list(variants_by_name)
+
+    # Prefer reading the last word as the size ("latte l"), else no size given ("mocha")
+    attempts = []
+    if len(words) > 1:
+        attempts.append((" ".join(words[:-1]), words[-1]))
+    attempts.append((" ".join(words), None))
+
+    for typed_name, typed_size in attempts:
+        name = _match(typed_name, names)
+        if name is None:
+            continue
+
+        variants = variants_by_name[name]
+        display_name = variants[0]['name']
+
+        if typed_size is None:
+            if len(variants) == 1:
+                return variants[0], quantity, None
+            sizes = ", ".join(variant['size'] for variant in variants)
+            return None, 0, f"Which size for {display_name}? ({sizes})"
+
+        sizes = {normalize(variant['size']): variant for variant in variants}
+        size = _match(typed_size, list(sizes))
+        if size is not None:
+            return sizes[size], quantity, None
+
+    return None, 0, f"No menu item matches \"{' '.join(words)}\""
+
+
+def parse_quick_order(text: str, menu_items: List[Dict]) -> Dict:
+    """
+    Parse a one-message order against the menu
+
+    Args:
+        text: Order text without the command (e.g., "2 latte L, 1 mocha cash")
+        menu_items: Current menu items
+
+    Returns:
+        Dict: {
+            'quantities': {menu_item_id: quantity},
+            'payment_method': 'cash' / 'paynow' or None,
+            'errors': [error message, ...]
+        }
+    """
+    result = {'quantities': {}, 'payment_method': None, 'errors': []}
+
+    words = normalize(text).replace(",", " , ").split()
+
+    # The payment method is the last word
+    if words and words[-1] in PAYMENT_METHODS:
+        result['payment_method'] = PAYMENT_METHODS[words.pop()]
+    else:
+        result['errors'].append("Add the payment method at the end (cash or paynow)")
+
+    variants_by_name: Dict[str, List[Dict]] = {}
+    for item in menu_items:
+        variants_by_name.setdefault(normalize(item['name']), []).append(item)
+
+    lines = " ".join(words).split(",")
+    for line in lines:
+        line_words = line.split()
+        if not line_words:
+            continue
+
+        item, quantity, error = _parse_line(line_words, variants_by_name)
+        if error:
+            result['errors'].append(error)
+            continue
+
+        result['quantities'][item['id']] = result['quantities'].get(item['id'], 0) + quantity
+
+    if not result['quantities'] and not result['errors']:
+        result['errors'].append("No items given")
+
+    return result
@@ -0,0 +1,135 @@
+"""
+Menu search utilities
+"""
+import threading
+from typing import List, Dict, Optional, Tuple
+
+# Inline query answers are capped at 50 results by Telegram
+MAX_RESULTS = 50
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace for matching"""
+    return " ".join(str(text).lower().split())
+
+
+def menu_signature(menu_items: List[Dict]) -> Tuple:
+    """
+    Get a hashable signature of the searchable and displayed menu fields
+
+    Two menus with the same signature look the same to the ordering keyboard
+    and the search index, so it is used as their cache key (a new item,
+    rename or price change is a new key).
+    """
+    return tuple((item['id'], item['name'], item['size'], item['price']) for item in menu_items)
+
+
+class MenuSearchIndex:
+    """
+    In-memory index over menu item names and sizes
+
+    Every word of a query must match the item's name or size. Words of three
+    or more characters match anywhere ("ice" finds "Iced Mocha" and "Rice
+    Ball") and are looked up through a trigram index; shorter words match the
+    start of a word ("l" finds size "L") through a prefix index.
+
+    Usage:
+        index = MenuSearchIndex(menu_items)
+        index.search("lat l")  # -> [latte large item dict, ...]
+    """
+
+    def __init__(self, menu_items: List[Dict]):
+        self.items = list(menu_items)
+        self._source = menu_items
+        self.signature = menu_signature(self.items)
+        self._texts: List[str] = []
+        self._trigrams: Dict[str, List[int]] = {}
+        self._prefixes: Dict[str, List[int]] = {}
+
+        for position, item in enumerate(self.items):
+            text = normalize(f"{item['name']} {item['size']}")
+            self._texts.append(text)
+
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(position)
+
+            prefixes = {word[:n] for word in text.split() for n in (1, 2)}
+            for prefix in prefixes:
+                self._prefixes.setdefault(prefix, []).append(position)
+
+    def _candidates(self, word: str) -> List[int]:
+        if len(word) < 3:
+            return self._prefixes.get(word, [])
+
+        postings = []
+        for i in range(len(word) - 2):
+            positions = self._trigrams.get(word[i:i + 3])
+            if not positions:
+                return []
+            postings.append(positions)
+
+        # Start from the rarest trigram and verify the full word
+        rarest = min(postings, key=len)
+        texts = self._texts
+        return [position for position in rarest if word in texts[position]]
+
+    def search(self, query: str, limit: Optional[int] = MAX_RESULTS) -> List[Dict]:
+        """
+        Find menu items matching every word of the query
+
+        Args:
+            query: Text typed by the user
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            List[Dict]: Matching items, in menu order
+        """
+        words = sorted(set(normalize(query).split()), key=len, reverse=True)
+        if not words:
+            return self.items[:limit]
+
+        matches: Optional[set] = None
+        for word in words:
+            positions = self._candidates(word)
+            matches = set(positions) if matches is None else matches.intersection(positions)
+            if not matches:
+                return []
+
+        return [self.items[position] for position in sorted(matches)[:limit]]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+_index: Optional[MenuSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_menu_index(menu_items: List[Dict]) -> MenuSearchIndex:
+    """
+    Get the search index for a menu, rebuilding it only when the menu changed
+
+    Args:
+        menu_items: Current menu items (e.g., from Database.get_menu_items)
+    """
+    global _index
+
+    index = _index
+    if index is not None and (index._source is menu_items or index.signature == menu_signature(menu_items)):
+        return index
+
+    with _index_lock:
+        if _index is None or _index.signature != menu_signature(menu_items):
+            _index = MenuSearchIndex(menu_items)
+        return _index
+
+
+def filter_menu_items(menu_items: List[Dict], query: str) -> List[Dict]:
+    """
+    Filter menu items by typed text (all matches, in menu order)
+
+    Args:
+        menu_items: List of menu item dictionaries
+        query: Text typed by the user
+    """
+    return get_menu_index(menu_items).search(query, limit=None)
@@ -0,0 +1,291 @@
+"""
+Lightweight per-update tracing
+
+Each Telegram update gets a root span; Database calls, Bot API requests,
+handler runs and per-user queue waits inside it become child spans. The
+current span is held in a contextvar, so spans opened in worker threads
+(Database.gather) and tasks created by the handler attach to the right
+update. The most recent finished traces are kept in memory for the /trace
+command; exporting them (JSON lines in a local file) is opt-in.
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+from src.utils.metrics import TRACES_DROPPED
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+RECENT_TRACES = int(os.getenv("TRACE_RECENT_LIMIT", 500))
+DEFAULT_EXPORT_PATH = "/tmp/kori_pos_traces.jsonl"
+DEFAULT_EXPORT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_EXPORT_QUEUE_SIZE = 1000
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "started_at",
+                 "_started", "duration_ms", "error", "children", "root")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = attributes
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self.root: "Span" = parent.root if parent else self
+
+    @property
+    def finished(self) -> bool:
+        return self.duration_ms is not None
+
+    def set(self, **attributes):
+        """Add attributes to the span"""
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._started) * 1e3, 3)
+
+    def walk(self) -> Iterator["Span"]:
+        """Iterate over this span and all of its descendants"""
+        yield self
+        for child in list(self.children):
+            yield from child.walk()
+
+    def to_dict(self) -> Dict:
+        """Get the span as a JSON-serializable dict"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class JsonLinesExporter:
+    """
+    Appends each finished trace as one JSON line (root span with its spans) to a file
+
+    export() runs on the bot's event loop at the end of every update, so it
+    only queues the trace: a background thread serializes and writes it.
+    Traces are dropped (and counted in traces_dropped_total) while the queue
+    is full rather than slowing updates down.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_EXPORT_MAX_BYTES,
+                 queue_size: int = DEFAULT_EXPORT_QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, root: Span):
+        if self._thread is None:
+            self._start()
+
+        try:
+            self._queue.put_nowait(root)
+        except queue.Full:
+            TRACES_DROPPED.inc()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            root = self._queue.get()
+            try:
+                self._write(root)
+            except Exception as e:
+                logger.warning(f"Failed to export trace: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, root: Span):
+        line = json.dumps({**root.to_dict(), "spans": [span.to_dict() for span in root.walk() if span is not root]},
+                          default=str)
+        try:
+            # Keep one previous file once the current one reaches the size limit
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export trace to {self.path}: {e}")
+
+
+class NullExporter:
+    """Discards traces (they are still kept in memory for /trace)"""
+
+    def export(self, root: Span):
+        pass
+
+
+class Tracer:
+    """Creates traces, hands finished ones to the exporter and keeps the recent ones"""
+
+    def __init__(self, exporter=None, recent: int = RECENT_TRACES, enabled: bool = TRACING_ENABLED):
+        self.exporter = exporter or NullExporter()
+        self.enabled = enabled
+        self._recent: Deque[Span] = deque(maxlen=recent)
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """Run the block as the root span of a new trace"""
+        if not self.enabled:
+            yield None
+            return
+
+        root = Span(name, **attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except Exception as e:
+            root.error = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            root.finish()
+            self._recent.append(root)
+            try:
+                self.exporter.export(root)
+            except Exception as e:
+                logger.warning(f"Trace exporter failed: {e}")
+
+    def recent(self) -> List[Span]:
+        """Get the recently finished traces, oldest first"""
+        return list(self._recent)
+
+    def slowest(self, limit: int = 5) -> List[Span]:
+        """Get the slowest of the recently finished traces"""
+        return sorted(self._recent, key=lambda root: root.duration_ms, reverse=True)[:limit]
+
+
+def create_exporter():
+    """
+    Create the trace exporter configured by environment variables
+
+    TRACE_EXPORTER: "none" (default) or "jsonl". Traces hold user IDs and
+        order details, so they are only written to disk when asked for.
+    TRACE_EXPORT_PATH: JSON lines file for the jsonl exporter
+    TRACE_EXPORT_MAX_BYTES: Size at which the file is rotated to <path>.1
+    """
+    exporter = os.getenv("TRACE_EXPORTER", "none").lower()
+
+    if exporter != "jsonl":
+        if exporter != "none":
+            logger.warning(f"Unknown TRACE_EXPORTER '{exporter}', traces are not exported")
+        return NullExporter()
+
+    return JsonLinesExporter(
+        os.getenv("TRACE_EXPORT_PATH", DEFAULT_EXPORT_PATH),
+        max_bytes=int(os.getenv("TRACE_EXPORT_MAX_BYTES", DEFAULT_EXPORT_MAX_BYTES))
+    )
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer"""
+    global _tracer
+
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(create_exporter())
+
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    """Get the span of the code currently running, if it is part of a trace"""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Run the block as a child span of the current span
+
+    Outside a trace, or once the update's trace has already finished (e.g.,
+    a debounced edit sent after the handler returned), this does nothing.
+
+    Usage:
+        with span("db.get_menu_items"):
+            ...
+    """
+    parent = _current_span.get()
+    if parent is None or parent.root.finished:
+        yield None
+        return
+
+    child = Span(name, parent, **attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = repr(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+def traced_methods(prefix: str):
+    """
+    Class decorator that opens a child span around every public method
+
+    Properties, coroutine functions and underscore-prefixed methods are left alone.
+
+    Usage:
+        @traced_methods("db")
+        class Database: ...
+    """
+    import inspect
+
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member) or inspect.iscoroutinefunction(member):
+                continue
+            setattr(cls, name, _traced(f"{prefix}.{name}", member))
+        return cls
+
+    return decorate
+
+
+def _traced(name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_span.get() is None:
+            return func(*args, **kwargs)
+        with span(name):
+            return func(*args, **kwargs)
+    return wrapper